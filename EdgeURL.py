@@ -1,45 +1,70 @@
 import os
+import sys
 import time
 import random
-import hashlib
+import logging
 import argparse
+import importlib.util
+from collections import Counter
+from contextlib import nullcontext
 from colorama import init, Fore, Style
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    TimeoutException,
-    StaleElementReferenceException,
-    InvalidSelectorException
-)
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.header import Header
-from email.utils import formataddr
-import pandas as pd
 from datetime import datetime
+# selenium 和 pandas 导入较慢，放到启动浏览器/保存Excel的函数里按需导入，--help 和 --dry-run 不需要加载
+from results_db import ResultStore, DEFAULT_DB_PATH
+from domain_planner import (
+    CrawlTask,
+    PARENT_RESULT_LIMIT,
+    dedup_entries,
+    normalize_entry,
+    plan_domains,
+    registrable_domain,
+    split_by_target
+)
+from discovery import DiscoveryQueue, DISCOVERY_BUDGET, DISCOVERY_DEPTH
+from tab_pool import NEXT_TASK_DELAY, TabPool
+from compact_store import UrlList
+from url_cluster import cluster_urls
+from profiling import DomainProfiler, install_command_counter, start_tracemalloc
+from serp_replay import ReplayServer, SerpRecorder, find_archives
+from budget import BudgetScheduler, CHUNK_PAGES, INITIAL_PAGES, parse_deadline
+from page_state import PAGE_EMPTY, PAGE_LABELS, PAGE_NORMAL, ChallengeMonitor
+from proxy_pool import ProxyPool, load_proxies, normalize_proxy
+from search_backends import BACKENDS, BingBackend, DEFAULT_ENGINES, get_backends
+from warm_profiles import PROFILE_ROOT, WarmProfilePool
+from crawl_log import ProgressView, default_log_file, log_event, setup_logging, shutdown_logging
+from notifier import NOTIFY_CONFIG, build_notifier, load_notify_config
+from tuning import AUTOTUNE_POLL, CONTENT_TIMEOUT_BOUNDS, DEFAULT_PRESET, PRESETS, LatencyTuner, load_tuning
+from page_pipeline import PagePipeline, PageSnapshot, StageTimer
+from work_queue import Heartbeat, LEASE_TIMEOUT, MAX_ATTEMPTS, default_worker_id, open_broker
 
 init(autoreset=True)
 
 # ====================== 核心配置 ======================
 MAX_PAGES = 999  # 最大爬取页数
 SCROLL_PAUSE = 1  # 滚动等待时间
+SCROLL_SETTLE = 1  # 滚动到底后的稳定等待时间
 RETRY_LIMIT = 10  # 元素重试次数
-VERIFICATION_TIME = 1  # 延长验证码处理时间（秒）
+VERIFICATION_TIME = 1  # 验证码通过后等待页面跳转完成的时间（秒）
 CONSECUTIVE_SAME_LIMIT = 99  # 降低连续相同页面阈值，避免无效循环
 CONTENT_TIMEOUT = 10  # 延长内容加载超时时间
+PAGE_DELAY = (2, 5)  # 翻页后的随机等待区间（秒）
+QUEUE_IDLE_POLL = 30  # 队列暂无可领取任务、但仍有其他节点在执行时的轮询间隔（秒）
+SHOW_URLS = False  # 是否在控制台逐条输出每页新增的 URL 和标题（--show-urls）
 # 文档类型扩展名
 DOC_EXTENSIONS = ('.pdf', '.docx', '.doc', '.rar', '.inc', '.txt', '.sql',
                   '.conf', '.xlsx', '.xls', '.csv', '.ppt', '.pptx')
 # 需过滤的扩展名
 FILTER_EXTENSIONS = ('.apk',)
+# HTML扩展名（HTML_BUCKET 开启时单独保存到 爬取的HTML/）
+HTML_EXTENSIONS = ('.htm', '.html')
+HTML_BUCKET = False
+# Excel 中模板汇总表的名称
+CLUSTER_SHEET = '模板汇总'
 
 
 # ====================== 新增配置 ======================
 
-def print_banner():
+def print_banner(preset=DEFAULT_PRESET):
     """打印程序的横幅信息"""
     banner = r"""
                     /|\ 
@@ -80,18 +105,42 @@ def print_banner():
             '  ,_____,  ' 
                  `·..·´ 
     """
+    if preset == 'fast':
+        # 提速优化版（EdgeURL(Quickly).py）保留原有的横幅
+        banner = r"""
+  ¸ ,.__¸                         ¸…,¸_
+  ¨'´ˆ¨˜¯¯ ·¸`.          ¸, — ·'¸/*˜¨ ˆ¨¨
+               '\ \     ¸-·´.·´ˆ¯¯   ¸,·———.,¸
+   ¸, . - .,¸   ', ',  ; (   ¸,. -ˆ.¯. ·´ˆ¨¨ˆ´ˆ¯¯˜ˆ ˜ˆ
+ ,ª:::        '·,'  (_', ' -'   'ˆ¨– ´¯¯`·,¸
+ ;:::                                    ¸·.    `·.
+ ',::        _                  ¸,      '·¸,'      ';
+   `·. . -·´   ) ,ˆ˜¨', ',¨\  ¸'  `·,  ¸.·ˆ ·,  ,'
+        ¸,.–·´.·'     \ \¸ `·.`·.  `·.\¸    )/
+     ,·' .·ˆ¯          `·,¸`·. `·.`·——.¸
+ ¸ ·´.·´                    \ \    ¯¯¯¯`·,;
+ ¸·´                          ; ;             '´
+    """
     print(Fore.CYAN + banner)
+    title_color = Fore.YELLOW if preset == 'fast' else Fore.GREEN
+    edition = '提速优化版' if preset == 'fast' else 'v1.0版'
     print(Fore.GREEN + "=" * 60)
-    print(Fore.GREEN + "  EdgeURL 基于Edge浏览器的URL爬取器（v1.0版） - 辉小鱼")
+    print(title_color + f"  EdgeURL 基于Edge浏览器的URL爬取器（{edition}） - 辉小鱼")
     print(Fore.GREEN + "=" * 60)
     print(Style.RESET_ALL)
 
 
-def setup_driver(proxy=None):
-    """设置并返回 Edge 浏览器驱动，修复潜在的SSL和SmartScreen问题"""
+def edge_driver_path():
+    """Edge 驱动路径：与脚本同一目录下的 msedgedriver.exe"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "msedgedriver.exe")
+
+
+def setup_driver(proxy=None, profile_dir=None):
+    """设置并返回 Edge 浏览器驱动，修复潜在的SSL和SmartScreen问题；profile_dir 为复用的用户数据目录"""
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        driver_path = os.path.join(current_dir, "msedgedriver.exe")
+        from selenium import webdriver
+
+        driver_path = edge_driver_path()
 
         if not os.path.exists(driver_path):
             print(Fore.RED + f"[-] 未找到 Edge 驱动: {driver_path}")
@@ -119,6 +168,11 @@ def setup_driver(proxy=None):
 
         if proxy:
             options.add_argument(f'--proxy-server={proxy}')
+        if profile_dir:
+            # 复用预热过的用户数据目录（Cookie、同意状态），跳过首次运行向导
+            options.add_argument(f'--user-data-dir={profile_dir}')
+            options.add_argument("--no-first-run")
+            options.add_argument("--no-default-browser-check")
 
         service = webdriver.edge.service.Service(driver_path)
         driver = webdriver.Edge(service=service, options=options)
@@ -137,64 +191,65 @@ def setup_driver(proxy=None):
         return None
 
 
-def auto_scroll(driver):
-    """自动滚动页面以确保内容完全加载"""
+def launch_driver(proxy=None, profiles=None):
+    """启动浏览器：开启 --warm-profiles 时从预热配置档池中取配置档，否则冷启动"""
+    if profiles is not None:
+        return profiles.launch(proxy)
+    return setup_driver(proxy)
+
+
+def close_driver(driver, profiles=None):
+    """关闭浏览器，并把其使用的预热配置档交还配置档池"""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    if profiles is not None:
+        profiles.release(driver)
+
+
+def restart_driver(driver, proxy=None, command_counts=None, profiles=None):
+    """关闭旧浏览器并以指定代理重新启动，--profile 时为新浏览器重新安装命令计数"""
+    close_driver(driver, profiles)
+    if proxy:
+        print(Fore.YELLOW + f"[+] 使用代理 {proxy} 重新启动浏览器...")
+    driver = launch_driver(proxy, profiles)
+    if driver and command_counts is not None:
+        install_command_counter(driver, command_counts)
+    return driver
+
+
+def auto_scroll(driver, tuner=None):
+    """自动滚动页面以确保内容完全加载，传入 tuner 时轮询页面高度并记录渲染耗时"""
     try:
         last_height = driver.execute_script("return document.body.scrollHeight")
         while True:
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(SCROLL_PAUSE)
-            new_height = driver.execute_script("return document.body.scrollHeight")
+            if tuner is None:
+                time.sleep(SCROLL_PAUSE)
+                new_height = driver.execute_script("return document.body.scrollHeight")
+            else:
+                new_height = wait_for_growth(driver, last_height, tuner)
             if new_height == last_height:
                 break
             last_height = new_height
-        time.sleep(1)
+        time.sleep(SCROLL_SETTLE)
     except Exception as e:
-        print(Fore.RED + f"[-] 自动滚动失败: {e}")
-
-
-def get_page_content_hash(driver):
-    """获取页面主体内容的哈希值（用于判断内容是否变化）"""
-    try:
-        content_elements = driver.find_elements(By.CSS_SELECTOR, 'li.b_algo')
-        content_text = " ".join([el.text for el in content_elements])
-        return hashlib.md5(content_text.encode('utf-8')).hexdigest()
-    except Exception as e:
-        print(Fore.RED + f"[-] 获取页面内容哈希失败: {e}")
-        return hashlib.md5(driver.page_source.encode('utf-8')).hexdigest()
-
-
-def find_next_page(driver):
-    """查找下一页按钮（兼容多种形态）"""
-    selectors = [
-        'a[title="Next page"]',
-        'a[aria-label="Next page"]',
-        'a.sb_pagN',
-    ]
-    xpath_selectors = [
-        '//a[contains(text(), "下一页")]',
-        '//a[contains(text(), "Next")]',
-    ]
-
-    for selector in selectors:
-        try:
-            btns = driver.find_elements(By.CSS_SELECTOR, selector)
-            if btns:
-                return btns[0]
-        except InvalidSelectorException:
-            print(Fore.RED + f"[-] 无效的 CSS 选择器: {selector}")
-            continue
+        log_event('error', logging.ERROR, f"[-] 自动滚动失败: {e}", stage='scroll')
 
-    for xpath in xpath_selectors:
-        try:
-            btns = driver.find_elements(By.XPATH, xpath)
-            if btns:
-                return btns[0]
-        except Exception as e:
-            print(Fore.RED + f"[-] 查找下一页按钮失败: {e}")
-            continue
 
-    return None
+def wait_for_growth(driver, last_height, tuner):
+    """在 SCROLL_PAUSE 内轮询页面高度，高度增长时立即返回并把耗时计入渲染样本"""
+    start = time.perf_counter()
+    while True:
+        time.sleep(AUTOTUNE_POLL)
+        new_height = driver.execute_script("return document.body.scrollHeight")
+        elapsed = time.perf_counter() - start
+        if new_height != last_height:
+            tuner.observe('render', elapsed)
+            return new_height
+        if elapsed >= SCROLL_PAUSE:
+            return new_height
 
 
 def is_valid_url(url, base_domain):
@@ -237,52 +292,36 @@ def classify_urls(url_list):
     return normal_urls, doc_urls
 
 
-def extract_bing_urls(driver, base_domain):
-    """提取Bing搜索结果的URL和标题，并进行初步过滤"""
-    urls = []  # 存储格式：[(url, title), ...]
-    try:
-        # 定位所有搜索结果项
-        result_items = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, '#b_results > li.b_algo'))
-        )
-
-        for item in result_items:
-            try:
-                # 提取URL
-                link_element = item.find_element(By.CSS_SELECTOR, 'h2 a')
-                link = link_element.get_attribute('href')
-
-                # 提取标题
-                title = link_element.text.strip()
+def save_to_excel(url_list, base_domain, is_document=False, cluster=True, is_html=False):
+    """保存URL和标题到Excel，支持普通URL、文档URL和HTML URL的不同路径，cluster=True 时附带模板汇总表"""
+    import pandas as pd
 
-                if link and is_valid_url(link, base_domain):
-                    urls.append((link, title))
-            except Exception as e:
-                print(Fore.RED + f"[-] 提取单个URL/标题失败: {e}")
-                continue
-    except Exception as e:
-        print(Fore.RED + f"[-] 提取搜索结果失败: {e}")
-    return urls
-
-
-def save_to_excel(url_list, base_domain, is_document=False):
-    """保存URL和标题到Excel，支持普通URL和文档URL的不同路径"""
     try:
         # 转换为DataFrame
-        df = pd.DataFrame(url_list, columns=['URL', '标题'])
+        df = pd.DataFrame(list(url_list), columns=['URL', '标题'])
 
         # 构建保存路径
         if is_document:
             result_dir = os.path.join('results', base_domain, '爬取的文档')
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             excel_file = os.path.join(result_dir, f'{base_domain}_文档_{timestamp}.xlsx')
+        elif is_html:
+            result_dir = os.path.join('results', base_domain, '爬取的HTML')
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            excel_file = os.path.join(result_dir, f'{base_domain}_HTML_{timestamp}.xlsx')
         else:
             result_dir = os.path.join('results', base_domain)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             excel_file = os.path.join(result_dir, f'Edge_results_{base_domain}_{timestamp}.xlsx')
 
         os.makedirs(result_dir, exist_ok=True)
-        df.to_excel(excel_file, index=False)
+        with pd.ExcelWriter(excel_file) as writer:
+            df.to_excel(writer, index=False)
+            if cluster:
+                # 按路径模板聚类，每个模板一行：代表URL + 数量
+                summary = pd.DataFrame(cluster_urls(df.itertuples(index=False, name=None)),
+                                       columns=['模板', '数量', '代表URL', '标题'])
+                summary.to_excel(writer, sheet_name=CLUSTER_SHEET, index=False)
         print(Fore.GREEN + f"[+] Excel 文件已保存: {excel_file}")
         return excel_file
     except Exception as e:
@@ -290,27 +329,13 @@ def save_to_excel(url_list, base_domain, is_document=False):
         return None
 
 
-def crawl_domain(driver, query, proxy=None):
-    """爬取单个域名相关的 URL 和标题"""
-    base_domain = query.split(':')[1]
-    all_normal_urls = []  # 普通URL [(url, title), ...]
-    all_doc_urls = []  # 文档URL [(url, title), ...]
-    page_num = 1
-    consecutive_same_count = 0
-
-    print(Fore.YELLOW + f"[+] 正在爬取 {base_domain} 的相关 URL...")
-    driver.get(f"https://www.bing.com/search?q={query}")
-    print(Fore.YELLOW + f"[+] 手动处理验证码（若有），{VERIFICATION_TIME} 秒后继续...")
-    time.sleep(VERIFICATION_TIME)
-
-    prev_url = driver.current_url
-    prev_content_hash = get_page_content_hash(driver)
-
-    while page_num <= MAX_PAGES:
-        print(Fore.YELLOW + f"\n[+] 第 {page_num} 页 | 开始爬取")
-        auto_scroll(driver)
+def process_page(snapshot, base_domain, store, run_id, all_normal_urls, all_doc_urls, timer):
+    """处理一页快照：过滤、分类、打印、写入结果数据库，并追加到汇总列表"""
+    page_num = snapshot.page_num
+    with timer.stage('过滤'):
+        page_urls = [(url, title) for url, title in snapshot.results if is_valid_url(url, base_domain)]
 
-        page_urls = extract_bing_urls(driver, base_domain)
+    with timer.stage('分类'):
         # 分类URL和标题
         normal_urls = []
         doc_urls = []
@@ -323,11 +348,22 @@ def crawl_domain(driver, query, proxy=None):
         all_normal_urls.extend(normal_urls)
         all_doc_urls.extend(doc_urls)
 
-        # 有有效URL才打印统计
-        has_new_urls = len(normal_urls) + len(doc_urls) > 0
-        if has_new_urls:
-            print(
-                Fore.GREEN + f"[+] 第 {page_num} 页 | 新增普通 URL: {len(normal_urls)} 个 | 新增文档 URL: {len(doc_urls)} 个")
+    if store is not None:
+        with timer.stage('入库'):
+            try:
+                store.add_page(run_id, base_domain, page_num, snapshot.serp_url,
+                               [(url, title, 'normal') for url, title in normal_urls] +
+                               [(url, title, 'doc') for url, title in doc_urls])
+            except Exception as e:
+                log_event('error', logging.ERROR, f"[-] 写入结果数据库失败: {e}", stage='store',
+                          domain=base_domain, page=page_num)
+
+    with timer.stage('打印'):
+        # 每页统计写入日志，控制台默认只在进度视图中汇总；逐条 URL 仅在 --show-urls 时输出
+        log_event('urls_added', logging.INFO if SHOW_URLS else logging.DEBUG,
+                  f"[+] 第 {page_num} 页 | 新增普通 URL: {len(normal_urls)} 个 | 新增文档 URL: {len(doc_urls)} 个",
+                  domain=base_domain, page=page_num, normal=len(normal_urls), doc=len(doc_urls))
+        if SHOW_URLS:
             # 普通URL（蓝色）
             if normal_urls:
                 print(Fore.CYAN + "[+] 新增普通 URL 列表：")
@@ -341,55 +377,448 @@ def crawl_domain(driver, query, proxy=None):
                     print(Fore.MAGENTA + f"    {idx}. {url}")
                     print(Fore.WHITE + f"       标题: {title}")
 
-        # 查找下一页（原逻辑不变）
-        next_btn = find_next_page(driver)
-        if not next_btn:
-            print(Fore.RED + "[-] 未找到下一页按钮，终止爬取")
-            break
 
-        try:
-            current_url = driver.current_url
-            current_content_hash = get_page_content_hash(driver)
-            driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
-            next_btn.click()
-
-            WebDriverWait(driver, CONTENT_TIMEOUT).until(
-                lambda d: d.current_url != current_url or
-                          get_page_content_hash(d) != current_content_hash
-            )
-
-            new_url = driver.current_url
-            new_content_hash = get_page_content_hash(driver)
-
-            if new_url == current_url and new_content_hash == current_content_hash:
-                consecutive_same_count += 1
-                print(Fore.RED + f"[!] 页面未刷新！连续 {consecutive_same_count} 次")
+def crawl_domain(driver, query, proxy=None, store=None, run_id=None, start_page=1, max_pages=MAX_PAGES,
+                 pipeline=True, record=False, backend=None, tuner=None, monitor=None, proxy_pool=None):
+    """
+    爬取单个域名相关的 URL 和标题，传入 store 时每页结果批量写入结果数据库。
+    start_page/max_pages 用于按页码分片：从第 start_page 页开始，最多翻 max_pages 页。
+    pipeline=True 时结果处理在后台线程进行，与下一页的加载重叠。
+    backend 为搜索引擎后端（search_backends.SearchBackend），默认为 Bing，回放时其 search_url 指向回放服务器。
+    record=True 时把访问的 SERP 页面录制到 results/<domain>/（仅支持可回放的后端）。
+    传入 tuner（LatencyTuner）时按观测到的加载/渲染耗时自动调整等待参数。
+    每次加载后用 monitor（ChallengeMonitor）检测页面类型，遇到验证页面时暂停等待人工验证。
+    传入 proxy_pool 时把每页的加载结果、耗时和验证情况计入 proxy 的健康分。
+    """
+    crawl = iter_crawl_domain(driver, query, proxy, store, run_id, start_page, max_pages, pipeline,
+                              record, backend, tuner, monitor, proxy_pool)
+    try:
+        while True:
+            time.sleep(next(crawl))
+    except StopIteration as stop:
+        return stop.value
+
+
+def iter_crawl_domain(driver, query, proxy=None, store=None, run_id=None, start_page=1, max_pages=MAX_PAGES,
+                      pipeline=True, record=False, backend=None, tuner=None, monitor=None, proxy_pool=None):
+    """
+    crawl_domain() 的可交错版本：每次需要等待时 yield 等待秒数而不是 sleep，
+    调用方可以在等待期间切换到其他标签页工作，结束时通过 StopIteration.value 返回结果。
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    base_domain = query.split(':')[1]
+    all_normal_urls = UrlList()  # 普通URL [(url, title), ...]
+    all_doc_urls = UrlList()  # 文档URL [(url, title), ...]
+    page_num = start_page
+    last_page = min(start_page + max_pages - 1, MAX_PAGES)
+    consecutive_same_count = 0
+    pages_crawled = 0  # 实际提取过结果的页数
+    monitor = monitor or ChallengeMonitor()
+    backend = backend or BingBackend()
+
+    def check_page(latency):
+        """检测页面类型（验证页面时等待），并把结果计入代理健康分"""
+        challenges = monitor.challenges(base_domain)
+        kind = yield from monitor.wait_for_clearance(driver, base_domain, VERIFICATION_TIME, backend.classify,
+                                                     CONTENT_TIMEOUT)
+        if proxy_pool is not None:
+            proxy_pool.record(proxy, kind in (PAGE_NORMAL, PAGE_EMPTY), latency,
+                              monitor.challenges(base_domain) > challenges)
+        return kind
+
+    log_event('crawl_start', logging.INFO, f"[+] 正在爬取 {base_domain} 的相关 URL（{backend.label}）...",
+              domain=base_domain, start_page=start_page, proxy=proxy, engine=backend.name)
+    load_start = time.perf_counter()
+    driver.get(backend.build_url(query, start_page))
+    load_time = time.perf_counter() - load_start
+    # 正常结果页立即继续，验证页面时只暂停当前爬取
+    kind = yield from check_page(load_time)
+    if kind != PAGE_NORMAL:
+        log_event('crawl_stop', logging.WARNING, f"[-] 第 {page_num} 页为{PAGE_LABELS[kind]}，终止爬取",
+                  domain=base_domain, page=page_num, reason=kind)
+        log_event('crawl_done', logging.DEBUG, domain=base_domain, pages=0, normal=0, doc=0)
+        return all_normal_urls, all_doc_urls, 0
+
+    prev_url = driver.current_url
+    prev_content_hash = backend.content_hash(driver)
+
+    def process(snapshot, timer):
+        process_page(snapshot, base_domain, store, run_id, all_normal_urls, all_doc_urls, timer)
+
+    page_pipeline = PagePipeline(process, name=f"pipeline-{base_domain}", domain=base_domain) if pipeline else None
+    timer = page_pipeline.main_timer if page_pipeline else StageTimer()
+    recorder = SerpRecorder(base_domain) if record and backend.replayable else None
+    try:
+        while page_num <= last_page:
+            log_event('page_fetched', logging.DEBUG, f"[+] 第 {page_num} 页 | 开始爬取（加载 {load_time:.2f} 秒）",
+                      domain=base_domain, page=page_num, load_time=round(load_time, 3), url=driver.current_url)
+            with timer.stage('滚动'):
+                auto_scroll(driver, tuner)
+
+            if recorder is not None:
+                with timer.stage('录制'):
+                    recorder.record(driver.current_url, driver.page_source, load_time, page_num)
+
+            with timer.stage('提取'):
+                snapshot = PageSnapshot(page_num, driver.current_url, backend.extract_results(driver, CONTENT_TIMEOUT))
+            if page_pipeline is not None:
+                page_pipeline.submit(snapshot)
             else:
-                consecutive_same_count = 0
+                process_page(snapshot, base_domain, store, run_id, all_normal_urls, all_doc_urls, timer)
+            pages_crawled += 1
+
+            # 配额内的最后一页不再翻页，避免多加载一页后丢弃（下一块配额会从下一页重新加载）
+            if page_num >= last_page:
+                log_event('crawl_stop', logging.DEBUG, f"[+] 已达到本次页数上限（第 {page_num} 页）",
+                          domain=base_domain, page=page_num, reason='page_limit')
+                break
 
-            prev_url = new_url
-            prev_content_hash = new_content_hash
+            # 查找下一页（原逻辑不变）
+            with timer.stage('翻页'):
+                next_btn = backend.find_next_page(driver)
+            if not next_btn:
+                log_event('crawl_stop', logging.INFO, "[-] 未找到下一页按钮，终止爬取",
+                          domain=base_domain, page=page_num, reason='no_next_page')
+                break
 
-            if consecutive_same_count >= CONSECUTIVE_SAME_LIMIT:
-                print(Fore.RED + f"[!] 连续 {CONSECUTIVE_SAME_LIMIT} 次页面未刷新，终止爬取")
+            try:
+                with timer.stage('翻页'):
+                    current_url = driver.current_url
+                    current_content_hash = backend.content_hash(driver)
+                    driver.execute_script("arguments[0].scrollIntoView(true);", next_btn)
+                    load_start = time.perf_counter()
+                    next_btn.click()
+                # 让出一次，页面加载期间调度器可以先处理其他已就绪的标签页
+                yield 0
+
+                with timer.stage('等待加载'):
+                    wait_for_page(driver, current_url, current_content_hash, tuner, backend)
+                    new_url = driver.current_url
+                    new_content_hash = backend.content_hash(driver)
+                load_time = time.perf_counter() - load_start
+                if tuner is not None:
+                    tuner.observe('load', load_time)
+                    retune(tuner)
+
+                kind = yield from check_page(load_time)
+                if kind != PAGE_NORMAL:
+                    log_event('crawl_stop', logging.WARNING, f"[-] 第 {page_num + 1} 页为{PAGE_LABELS[kind]}，终止爬取",
+                              domain=base_domain, page=page_num + 1, reason=kind)
+                    break
+
+                if new_url == current_url and new_content_hash == current_content_hash:
+                    consecutive_same_count += 1
+                    log_event('page_unchanged', logging.WARNING, f"[!] 页面未刷新！连续 {consecutive_same_count} 次",
+                              domain=base_domain, page=page_num, count=consecutive_same_count)
+                else:
+                    consecutive_same_count = 0
+
+                prev_url = new_url
+                prev_content_hash = new_content_hash
+
+                if consecutive_same_count >= CONSECUTIVE_SAME_LIMIT:
+                    log_event('crawl_stop', logging.WARNING, f"[!] 连续 {CONSECUTIVE_SAME_LIMIT} 次页面未刷新，终止爬取",
+                              domain=base_domain, page=page_num, reason='unchanged')
+                    break
+
+                page_num += 1
+                yield random.uniform(*PAGE_DELAY)
+
+            except TimeoutException:
+                # 超时可能是验证页面拦截：验证通过且已离开原页面时继续翻页
+                kind = yield from check_page(time.perf_counter() - load_start)
+                if kind == PAGE_NORMAL and driver.current_url != current_url:
+                    page_num += 1
+                    continue
+                log_event('error', logging.ERROR, "[-] 页面加载超时，终止爬取",
+                          domain=base_domain, page=page_num, stage='load', timeout=CONTENT_TIMEOUT)
+                break
+            except Exception as e:
+                log_event('error', logging.ERROR, f"[-] 翻页过程中发生错误: {e}",
+                          domain=base_domain, page=page_num, stage='next_page')
+                if proxy_pool is not None:
+                    proxy_pool.record(proxy, False, time.perf_counter() - load_start)
                 break
+    finally:
+        if page_pipeline is not None:
+            page_pipeline.close()
+            page_pipeline.log_timings()
+        if recorder is not None:
+            recorder.close()
+
+    log_event('crawl_done', logging.DEBUG, domain=base_domain, pages=pages_crawled,
+              normal=len(all_normal_urls), doc=len(all_doc_urls))
+    return all_normal_urls, all_doc_urls, pages_crawled
+
+
+def wait_for_page(driver, current_url, current_content_hash, tuner=None, backend=None):
+    """
+    等待翻页后的内容变化。自动调优时超时不立即放弃：计入样本后按上限再等一次，
+    避免网络偶尔变慢时被调低的 CONTENT_TIMEOUT 误判为加载失败。
+    """
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    backend = backend or BingBackend()
+
+    def changed(d):
+        return d.current_url != current_url or backend.content_hash(d) != current_content_hash
+
+    try:
+        WebDriverWait(driver, CONTENT_TIMEOUT).until(changed)
+    except TimeoutException:
+        if tuner is None or CONTENT_TIMEOUT >= CONTENT_TIMEOUT_BOUNDS[1]:
+            raise
+        tuner.observe_timeout(CONTENT_TIMEOUT)
+        log_event('slow_load', logging.WARNING,
+                  f"[!] {CONTENT_TIMEOUT} 秒内未加载完成，放宽到 {CONTENT_TIMEOUT_BOUNDS[1]} 秒继续等待",
+                  timeout=CONTENT_TIMEOUT)
+        WebDriverWait(driver, CONTENT_TIMEOUT_BOUNDS[1] - CONTENT_TIMEOUT).until(changed)
+
+
+def tuning_settings():
+    """当前生效的调优参数"""
+    return {
+        'scroll_pause': SCROLL_PAUSE, 'scroll_settle': SCROLL_SETTLE, 'retry_limit': RETRY_LIMIT,
+        'verification_time': VERIFICATION_TIME, 'content_timeout': CONTENT_TIMEOUT,
+        'page_delay': PAGE_DELAY, 'html_bucket': HTML_BUCKET,
+    }
 
-            page_num += 1
-            time.sleep(random.uniform(2, 5))
 
-        except TimeoutException:
-            print(Fore.RED + "[-] 页面加载超时，终止爬取")
+def apply_tuning(settings):
+    """把预设/配置文件/自动调优得到的参数写入模块级配置"""
+    global SCROLL_PAUSE, SCROLL_SETTLE, RETRY_LIMIT, VERIFICATION_TIME, CONTENT_TIMEOUT, PAGE_DELAY, HTML_BUCKET
+    SCROLL_PAUSE = settings.get('scroll_pause', SCROLL_PAUSE)
+    SCROLL_SETTLE = settings.get('scroll_settle', SCROLL_SETTLE)
+    RETRY_LIMIT = settings.get('retry_limit', RETRY_LIMIT)
+    VERIFICATION_TIME = settings.get('verification_time', VERIFICATION_TIME)
+    CONTENT_TIMEOUT = settings.get('content_timeout', CONTENT_TIMEOUT)
+    PAGE_DELAY = tuple(settings.get('page_delay', PAGE_DELAY))
+    HTML_BUCKET = settings.get('html_bucket', HTML_BUCKET)
+
+
+def retune(tuner):
+    """按自动调优的推荐值更新等待参数"""
+    changes = tuner.recommend(tuning_settings())
+    if changes:
+        apply_tuning(changes)
+        print(Fore.CYAN + "[+] 自动调优：" + " | ".join(f"{k} = {v}" for k, v in changes.items()))
+
+
+def use_offline_timing():
+    """回放时去掉验证码等待和翻页的随机间隔，以便全速、可重复地测试"""
+    global VERIFICATION_TIME, PAGE_DELAY
+    VERIFICATION_TIME = 0
+    PAGE_DELAY = (0, 0)
+
+
+def save_task_results(task, all_normal_urls, all_doc_urls, pages, domain_stats, start_time, cluster=True):
+    """按目标域名拆分并保存一次查询的结果，累加到 domain_stats，返回 (普通URL数, 文档URL数)"""
+    # 父域名查询的结果按目标子域名拆分，保持 results/<domain>/ 的输出结构
+    normal_split = split_by_target(all_normal_urls, task, UrlList)
+    doc_split = split_by_target(all_doc_urls, task, UrlList)
+    total_normal = 0
+    total_doc = 0
+    for domain in list(normal_split) + [d for d in doc_split if d not in normal_split]:
+        normal_urls = normal_split.get(domain, UrlList())
+        doc_urls = doc_split.get(domain, UrlList())
+        if domain not in task.targets and not (normal_urls or doc_urls):
+            continue
+
+        normal_count = len(normal_urls)
+        doc_count = len(doc_urls)
+        total_normal += normal_count
+        total_doc += doc_count
+
+        stat = domain_stats.setdefault(domain, {'pages': 0, 'normal_urls': 0, 'doc_urls': 0, 'query': task.query})
+        stat['pages'] += pages
+        stat['normal_urls'] += normal_count
+        stat['doc_urls'] += doc_count
+
+        html_urls = None
+        if HTML_BUCKET:
+            # HTML URL 从普通URL中拆出单独保存
+            html_urls = UrlList(item for item in normal_urls if item[0].lower().endswith(HTML_EXTENSIONS))
+            if html_urls:
+                normal_urls = UrlList(item for item in normal_urls if not item[0].lower().endswith(HTML_EXTENSIONS))
+            stat['html_urls'] = stat.get('html_urls', 0) + len(html_urls)
+
+        # 保存普通URL
+        normal_file = save_to_excel(normal_urls, domain, is_document=False, cluster=cluster)
+        # 保存文档URL
+        doc_file = save_to_excel(doc_urls, domain, is_document=True, cluster=cluster) if doc_urls else None
+        # 保存HTML URL
+        html_file = save_to_excel(html_urls, domain, is_html=True, cluster=cluster) if html_urls else None
+
+        if normal_file or doc_file or html_file:
+            html_note = f"其中 HTML URL: {len(html_urls)} | " if html_urls is not None else ""
+            print(Fore.GREEN + f"\n[+] 爬取 {domain} 完成 | 页数: {pages} | "
+                               f"普通URL: {normal_count} | 文档URL: {doc_count} | {html_note}"
+                               f"耗时: {time.time() - start_time:.2f} 秒")
+    return total_normal, total_doc
+
+
+def merge_engine_results(runs, engine_stats=None):
+    """
+    合并同一任务在多个搜索引擎上的结果 [(引擎名, (普通URL, 文档URL, 页数)), ...]：按 URL 去重
+    （保留先完成的引擎的标题），页数累加。传入 engine_stats 时按引擎累计爬取次数、页数、URL 数
+    和独有 URL 数（只有该引擎找到的），用于报告各引擎的产出。返回 (普通URL, 文档URL, 页数)
+    """
+    found = [(name, {url for url, _ in normal} | {url for url, _ in doc}) for name, (normal, doc, _) in runs]
+    counts = Counter(url for _, urls in found for url in urls)
+    if engine_stats is not None:
+        for (name, urls), (_, (_, _, pages)) in zip(found, runs):
+            stat = engine_stats.setdefault(name, Counter())
+            stat['crawls'] += 1
+            stat['pages'] += pages
+            stat['urls'] += len(urls)
+            stat['unique'] += sum(1 for url in urls if counts[url] == 1)
+    if len(runs) == 1:
+        return runs[0][1]
+
+    merged_normal, merged_doc, seen = UrlList(), UrlList(), set()
+    for _, (normal, doc, _) in runs:
+        for merged, rows in ((merged_normal, normal), (merged_doc, doc)):
+            for url, title in rows:
+                if url not in seen:
+                    seen.add(url)
+                    merged.append((url, title))
+    return merged_normal, merged_doc, sum(pages for _, (_, _, pages) in runs)
+
+
+def engine_report(engine_stats):
+    """返回 [(引擎, 爬取次数, 页数, URL数, 独有URL数, 每页URL数), ...]"""
+    return [(name, stat['crawls'], stat['pages'], stat['urls'], stat['unique'], stat['urls'] / max(stat['pages'], 1))
+            for name, stat in engine_stats.items()]
+
+
+def plan_tasks(domains, store=None, no_plan=False, plan_limit=PARENT_RESULT_LIMIT):
+    """按域名条目和数据库中的历史结果数生成 site: 查询计划，并打印合并情况"""
+    if no_plan:
+        tasks = [CrawlTask(host, [host], '未启用规划') for host in dedup_entries(domains)]
+    else:
+        observed = {}
+        if store is not None:
+            for parent in {registrable_domain(host) for host in dedup_entries(domains)}:
+                observed.update(store.host_counts(parent))
+        tasks = plan_domains(domains, observed, plan_limit)
+    if domains:
+        print(Fore.GREEN + f"[+] 爬取计划：{len(domains)} 个条目 -> {len(tasks)} 次 site: 查询")
+    for task in tasks:
+        if len(task.targets) > 1:
+            print(Fore.CYAN + f"    site:{task.query} <- {', '.join(task.targets)} | {task.reason}")
+    return tasks
+
+
+def enqueue_tasks(broker, tasks, shard_pages=0):
+    """把爬取计划写入任务队列，shard_pages > 0 时只入队首个分片，后续分片由节点按需追加"""
+    for task in tasks:
+        end_page = min(shard_pages, MAX_PAGES) if shard_pages > 0 else 0
+        job_id = broker.enqueue(task.query, task.targets, 1, end_page)
+        print(Fore.CYAN + f"    #{job_id} site:{task.query} -> {', '.join(task.targets)}")
+    print(Fore.GREEN + f"[+] 已入队 {len(tasks)} 个任务")
+
+
+def print_queue_status(broker):
+    """打印队列各状态的任务数和已汇报的结果"""
+    stats = broker.stats()
+    print(Fore.GREEN + "[+] 队列状态：" + " | ".join(f"{k}: {v}" for k, v in sorted(stats.items())))
+    for domain, start, end, worker, result in broker.results():
+        pages = f"{start}-{end}" if end else f"{start}-"
+        print(Fore.CYAN + f"    site:{domain} 第 {pages} 页 | 节点: {worker} | "
+                          f"页数: {result.get('pages', 0)} | 普通URL: {result.get('normal_urls', 0)} | "
+                          f"文档URL: {result.get('doc_urls', 0)} | 验证页面: {result.get('challenges', 0)}")
+
+
+def run_worker(args, broker, driver, store, run_id, domain_stats, command_counts=None, backends=None,
+               tuner=None, monitor=None, proxy_pool=None, notifier=None, engine_stats=None, profiles=None):
+    """
+    队列节点循环：领取任务 -> 爬取（后台续约）-> 本地保存 -> 汇报结果。
+    失败的任务退回队列，由其他节点在可见性超时或失败后重新领取。
+    多个搜索引擎时同一任务依次在各引擎上爬取，合并去重后保存。
+    返回 (driver, 总页数, 普通URL数, 文档URL数)，driver 可能因重启而变化。
+    """
+    worker_id = args.worker_id or default_worker_id()
+    backends = backends or [BingBackend()]
+    total_pages = total_normal = total_doc = 0
+    print(Fore.GREEN + f"[+] 队列节点 {worker_id} 已启动")
+    while True:
+        if proxy_pool is not None and proxy_pool.should_rotate():
+            driver = restart_driver(driver, proxy_pool.rotate(), command_counts, profiles)
+            if not driver:
+                break
+        proxy = proxy_pool.current if proxy_pool is not None else args.proxy
+        job = broker.lease(worker_id, args.lease_timeout)
+        if job is None:
+            stats = broker.stats()
+            if stats.get('pending', 0) or stats.get('leased', 0):
+                # 其他节点仍在执行，等待其完成或租约超时后接管
+                time.sleep(QUEUE_IDLE_POLL)
+                continue
+            print(Fore.GREEN + "[+] 队列已无待处理任务")
             break
+
+        task = CrawlTask(job.domain, job.targets, f'队列任务 #{job.id}')
+        max_pages = job.end_page - job.start_page + 1 if job.end_page else MAX_PAGES
+        print(Fore.YELLOW + f"\n[+] 领取任务 #{job.id}: site:{job.domain} 第 {job.start_page} 页起 "
+                            f"（第 {job.attempts} 次尝试）")
+        start_time = time.time()
+        profiler = DomainProfiler(job.domain, command_counts) if args.profile else None
+        try:
+            with Heartbeat(broker, job, args.lease_timeout) as heartbeat, \
+                    (profiler.active() if profiler else nullcontext()):
+                runs = [(backend.name, crawl_domain(driver, f'site:{job.domain}', proxy, store, run_id,
+                                                    job.start_page, max_pages,
+                                                    pipeline=not args.no_pipeline and not args.profile,
+                                                    record=args.record, backend=backend, tuner=tuner,
+                                                    monitor=monitor, proxy_pool=proxy_pool))
+                        for backend in backends]
+                normal_urls, doc_urls, pages = merge_engine_results(runs, engine_stats)
+                chunk_pages = max(result[2] for _, result in runs)
+                if heartbeat.lost:
+                    print(Fore.RED + f"[-] 任务 #{job.id} 的租约已被其他节点接管，结果仅保存在本地")
+                normal_count, doc_count = save_task_results(task, normal_urls, doc_urls, pages,
+                                                            domain_stats, start_time, not args.no_cluster)
+            if profiler is not None:
+                profiler.save()
+            if notifier is not None:
+                for domain in task.targets:
+                    if domain in domain_stats:
+                        notifier.domain_done(domain, domain_stats[domain], time.time() - start_time)
+            total_pages += pages
+            total_normal += normal_count
+            total_doc += doc_count
+            # 分片翻满仍有下一页时追加后续分片
+            if job.end_page and chunk_pages >= max_pages and job.end_page < MAX_PAGES:
+                broker.enqueue(job.domain, job.targets, job.end_page + 1,
+                               min(job.end_page + max_pages, MAX_PAGES))
+            broker.complete(job, {'pages': pages, 'normal_urls': normal_count, 'doc_urls': doc_count,
+                                  'challenges': monitor.challenges(job.domain) if monitor else 0,
+                                  'elapsed': round(time.time() - start_time, 2)})
         except Exception as e:
-            print(Fore.RED + f"[-] 翻页过程中发生错误: {e}")
-            break
+            log_event('error', logging.ERROR, f"[-] 任务 #{job.id} 执行失败，退回队列: {e}",
+                      domain=job.domain, job=job.id, stage='job')
+            broker.fail(job, e)
+            driver = restart_driver(driver, proxy, command_counts, profiles)
+            if not driver:
+                break
 
-    return all_normal_urls, all_doc_urls, page_num - 1
+        time.sleep(random.uniform(3, 7))
+    return driver, total_pages, total_normal, total_doc
 
 
 #以下的邮箱推送信息，可以做个性化的自定义
-def generate_email_content(domain_stats, total_domains, total_urls, total_pages, execution_time):
-    """生成详细的邮件内容"""
+def generate_email_content(domain_stats, total_domains, total_urls, total_pages, execution_time,
+                           discovered=None, budget_rows=None, challenge_rows=None, proxy_rows=None,
+                           engine_rows=None):
+    """
+    生成详细的邮件内容，discovered 为子域名发现结果 [(host, 来源, 层数, 出现次数, 是否已爬取), ...]，
+    budget_rows 为预算调度结果 [(域名, 页数, 新增URL, 分配次数, 近期每页产出, 状态), ...]，
+    challenge_rows 为异常页面统计 [(域名, 验证次数, 等待秒数, 无结果页, 错误页), ...]，
+    proxy_rows 为代理池统计 [(代理, 健康分, 成功页数, 失败次数, 验证次数, 平均加载秒数, 被换下次数), ...]，
+    engine_rows 为多引擎产出 [(引擎, 爬取次数, 页数, URL数, 独有URL数, 每页URL数), ...]
+    """
     content = f"""
 📊 EdgeURL 爬取任务完成报告 📊
 尊敬的辉小鱼先生：
@@ -404,12 +833,48 @@ EdgeURL 爬虫已完成所有域名的爬取工作！以下是详细报告：
     for domain, stat in domain_stats.items():
         content += f"""
   • {domain}:
-    - 爬取页数：{stat.get('pages', 0)}
+    - 爬取页数：{stat.get('pages', 0)}（查询 site:{stat.get('query', domain)}）
     - 获取普通 URL 数量：{stat.get('normal_urls', 0)}
     - 获取文档 URL 数量：{stat.get('doc_urls', 0)}
     - 普通结果保存路径：results/{domain}/
     - 文档结果保存路径：results/{domain}/爬取的文档/
 """
+        if 'html_urls' in stat:
+            content += f"""    - 其中 HTML URL 数量：{stat['html_urls']}（保存路径：results/{domain}/爬取的HTML/）
+"""
+    if discovered:
+        content += f"""
+🧭 新发现的子域名（{len(discovered)} 个）：
+"""
+        for host, origin, depth, count, crawled in discovered:
+            state = '已爬取' if crawled else '未爬取'
+            content += f"  • {host} | 来源: site:{origin} | 第 {depth} 层 | 出现 {count} 次 | {state}\n"
+    if budget_rows:
+        content += f"""
+⏱️ 预算分配（共使用 {sum(row[1] for row in budget_rows)} 页）：
+"""
+        for key, pages, new_urls, chunks, recent, state in budget_rows:
+            content += f"  • {key} | {pages} 页 | 新增 URL {new_urls} | 分配 {chunks} 次 | 近期每页 {recent:.1f} | {state}\n"
+    if challenge_rows:
+        content += f"""
+🧩 验证与异常页面（共验证 {sum(row[1] for row in challenge_rows)} 次）：
+"""
+        for domain, challenges, waited, empty, error in challenge_rows:
+            content += f"  • {domain} | 验证页面 {challenges} 次（等待 {waited:.0f} 秒） | 无结果页 {empty} | 错误页 {error}\n"
+    if proxy_rows:
+        content += f"""
+🌐 代理池（{len(proxy_rows)} 个代理）：
+"""
+        for proxy, score, pages, failures, challenges, latency, rotations in proxy_rows:
+            content += (f"  • {proxy} | 健康分 {score:.2f} | 成功 {pages} 页 | 失败 {failures} 次 | "
+                        f"验证 {challenges} 次 | 平均加载 {latency:.2f} 秒 | 被换下 {rotations} 次\n")
+    if engine_rows:
+        content += f"""
+🔎 搜索引擎产出（{len(engine_rows)} 个引擎）：
+"""
+        for name, crawls, pages, urls, unique, per_page in engine_rows:
+            content += (f"  • {name} | 爬取 {crawls} 次 | {pages} 页 | URL {urls} 个（独有 {unique} 个） | "
+                        f"每页 {per_page:.1f} 个\n")
     content += """
 💡 说明：
 - 文档类型URL已单独保存
@@ -420,127 +885,590 @@ EdgeURL 爬虫助手 🤖
     return content
 
 
-def send_email(sender_email, sender_password, receiver_email, subject, content):
-    """发送邮件（简化版，优化错误捕获与反馈）"""
+def dry_run(args, default_preset=DEFAULT_PRESET):
+    """
+    --dry-run：检查域名文件、调优/通知/代理配置、回放录制和运行依赖，并打印爬取计划。
+    不启动浏览器、不联网、不导入 selenium/pandas，返回发现的问题数。
+    """
+    problems = 0
+
+    def problem(message):
+        nonlocal problems
+        problems += 1
+        print(Fore.RED + f"[-] {message}")
+
     try:
-        print(Fore.YELLOW + "[+] 准备发送邮件...")
-        message = MIMEMultipart()
-        message['From'] = formataddr((str(Header("EdgeURL 爬虫助手", 'utf-8')), sender_email))
-        message['To'] = receiver_email
-        message['Subject'] = Header(subject, 'utf-8')
-        message.attach(MIMEText(content, 'plain', 'utf-8'))
-
-        print(Fore.YELLOW + "[+] 连接 SMTP 服务器...")
-        with smtplib.SMTP_SSL('smtp.qq.com', 465) as server:
-            server.set_debuglevel(0)
-            print(Fore.YELLOW + "[+] 正在进行身份验证...")
-            server.login(sender_email, sender_password)
-            print(Fore.YELLOW + "[+] 身份验证成功，正在发送邮件...")
-            server.sendmail(sender_email, [receiver_email], message.as_string())
-            print(Fore.GREEN + "[√] 邮件发送成功！")
-            return True
-    except smtplib.SMTPException as e:
-        if "b'\\x00\\x00\\x00'" in str(e):
-            print(Fore.YELLOW + "[!] 出现 SMTP 通信特殊异常，邮件可能已发送成功")
-            return True
+        tuning = load_tuning(args.preset, args.tuning_config, default_preset)
+        print(Fore.GREEN + f"[+] 调优参数：{tuning['name']} | CONTENT_TIMEOUT {tuning['content_timeout']} 秒 | "
+                           f"滚动等待 {tuning['scroll_pause']} 秒 | "
+                           f"翻页间隔 {tuning['page_delay'][0]}-{tuning['page_delay'][1]} 秒")
+    except (OSError, ValueError) as e:
+        problem(f"调优配置无效: {e}")
+
+    try:
+        backends = get_backends(args.engines)
+        print(Fore.GREEN + f"[+] 搜索引擎：{', '.join(backend.label for backend in backends)}")
+    except ValueError as e:
+        problem(str(e))
+
+    try:
+        config = load_notify_config(args.notify_config)
+        smtp = config.get('smtp') or {}
+        channels = (['smtp'] if smtp.get('host') and smtp.get('to') else []) + \
+            ['webhook'] * len(config.get('webhooks') or []) + (['file'] if config.get('file') else [])
+        print(Fore.GREEN + f"[+] 通知渠道：{', '.join(channels) or '无'}")
+        if bool(smtp.get('host')) != bool(smtp.get('to')):
+            print(Fore.YELLOW + "[!] SMTP 配置不完整（需要 host 和 to），不会发送邮件")
+    except (OSError, ValueError) as e:
+        problem(f"通知配置无效: {e}")
+
+    if args.proxy_file:
+        try:
+            proxies = load_proxies(args.proxy_file)
+            if proxies:
+                print(Fore.GREEN + f"[+] 代理池：{len(proxies)} 个代理")
+            else:
+                problem(f"代理列表 {args.proxy_file} 为空")
+        except OSError as e:
+            problem(f"读取代理列表失败: {e}")
+    elif args.proxy:
+        print(Fore.GREEN + f"[+] 代理：{normalize_proxy(args.proxy)}")
+
+    if args.replay is not None:
+        archives = find_archives(args.replay)
+        if archives:
+            print(Fore.GREEN + f"[+] 回放录制：{len(archives)} 个文件")
         else:
-            print(Fore.RED + f"[-] SMTP 错误: {str(e)}")
-            print(Fore.YELLOW + "[!] 请检查邮箱账号、授权码和网络连接")
-    except Exception as e:
-        print(Fore.RED + f"[-] 发送邮件时发生未知错误: {str(e)}")
-    return False
+            problem(f"未找到录制文件: {args.replay}")
+
+    if args.warm_profiles < 0:
+        problem("--warm-profiles 不能为负数")
+    elif args.warm_profiles:
+        print(Fore.GREEN + f"[+] 预热配置档：{args.warm_profiles} 个，目录 {os.path.abspath(args.profile_dir)}"
+                           f"{'（回放时忽略）' if args.replay is not None else ''}")
+
+    if not os.path.exists(edge_driver_path()):
+        problem(f"未找到 Edge 驱动: {edge_driver_path()}")
+    missing = [name for name in ('selenium', 'pandas', 'openpyxl') if importlib.util.find_spec(name) is None]
+    if missing:
+        problem(f"缺少依赖: {', '.join(missing)}（pip install -r requirements.txt）")
+
+    if args.queue and not args.enqueue and args.queue != 'memory://':
+        print(Fore.GREEN + f"[+] 队列节点：从 {args.queue} 领取任务，不读取域名文件")
+    elif not os.path.exists(args.file):
+        problem(f"未找到文件: {args.file}")
+    else:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            domains = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+        invalid = [line for line in domains if '.' not in normalize_entry(line)]
+        hosts = [host for host in dedup_entries(domains) if '.' in host]
+        print(Fore.GREEN + f"[+] 域名文件：{args.file} | {len(domains)} 个条目 | 有效域名 {len(hosts)} 个 | "
+                           f"重复 {len(domains) - len(invalid) - len(hosts)} 个 | 无效 {len(invalid)} 个")
+        for line in invalid[:5]:
+            print(Fore.YELLOW + f"    [!] 无法识别的条目: {line}")
+        if not hosts:
+            problem(f"文件 {args.file} 中没有有效域名")
+        else:
+            store = None
+            if not args.no_db and os.path.exists(args.db):
+                try:
+                    store = ResultStore(args.db)
+                except Exception as e:
+                    print(Fore.YELLOW + f"[!] 打开结果数据库失败，计划不参考历史结果: {e}")
+            plan_tasks(domains, store, args.no_plan, args.plan_limit)
+            if store is not None:
+                store.close()
+
+    if problems:
+        print(Fore.RED + f"[-] 检查完成，发现 {problems} 个问题")
+    else:
+        print(Fore.GREEN + "[+] 检查通过，可以开始爬取")
+    return problems
 
 
-def main():
-    print_banner()
+def main(default_preset=DEFAULT_PRESET):
     parser = argparse.ArgumentParser(description='Bing 相关 URL 爬取（优化版）')
     parser.add_argument('-f', '--file', type=str, default='domain.txt', help='域名列表文件，默认为 domain.txt')
     parser.add_argument('--proxy', type=str, default=None, help='代理，如 127.0.0.1:7890')
+    parser.add_argument('--proxy-file', type=str, default=None,
+                        help='代理列表文件（每行一个），按健康分自动选择和切换代理，优先于 --proxy')
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f'结果数据库路径，默认为 {DEFAULT_DB_PATH}')
+    parser.add_argument('--no-db', action='store_true', help='不写入结果数据库，仅保存Excel')
+    parser.add_argument('--no-plan', action='store_true', help='不合并子域名，逐条爬取 domain.txt 中的条目')
+    parser.add_argument('--plan-limit', type=int, default=PARENT_RESULT_LIMIT,
+                        help=f'父域名历史结果超过该数量时改为逐个子域名爬取，默认为 {PARENT_RESULT_LIMIT}')
+    parser.add_argument('--discover', action='store_true', help='把结果中新出现的子域名加入队列继续爬取')
+    parser.add_argument('--discover-depth', type=int, default=DISCOVERY_DEPTH,
+                        help=f'子域名发现的最大层数，默认为 {DISCOVERY_DEPTH}')
+    parser.add_argument('--discover-budget', type=int, default=DISCOVERY_BUDGET,
+                        help=f'子域名发现最多追加的查询次数，默认为 {DISCOVERY_BUDGET}')
+    parser.add_argument('--tabs', type=int, default=1,
+                        help='在同一个浏览器中同时使用的标签页数（每个标签页爬取一个域名），默认为 1')
+    parser.add_argument('--no-pipeline', action='store_true',
+                        help='关闭流水线，结果过滤/打印/入库与翻页串行执行')
+    parser.add_argument('--no-cluster', action='store_true', help='保存Excel时不生成URL模板汇总表')
+    parser.add_argument('--profile', action='store_true',
+                        help='对每个域名做 cProfile/tracemalloc 分析并统计 WebDriver 命令，报告写入 results/<domain>/')
+    parser.add_argument('--record', action='store_true',
+                        help='把访问的每个 SERP 页面录制到 results/<domain>/serp_<时间>.jsonl.gz')
+    parser.add_argument('--replay', type=str, nargs='?', const='results', default=None,
+                        help='从录制文件离线回放（可指定录制文件或目录，默认取 results/ 下各域名最新录制）')
+    parser.add_argument('--replay-latency', action='store_true', help='回放时按录制的页面加载耗时延迟响应')
+    parser.add_argument('--page-budget', type=int, default=None, help='本次运行的总页数预算，按各域名产出动态分配')
+    parser.add_argument('--deadline', type=str, default=None,
+                        help='全局截止时间：分钟数（如 120）或时刻（如 06:30），到点后停止分配')
+    parser.add_argument('--initial-pages', type=int, default=INITIAL_PAGES,
+                        help=f'预算模式下每个域名的初始页数配额，默认为 {INITIAL_PAGES}')
+    parser.add_argument('--chunk-pages', type=int, default=CHUNK_PAGES,
+                        help=f'预算模式下每次追加分配的页数，默认为 {CHUNK_PAGES}')
+    parser.add_argument('--queue', type=str, default=None,
+                        help='共享任务队列（SQLite 文件路径，或 memory:// 本地替身），指定后以队列节点方式运行')
+    parser.add_argument('--enqueue', action='store_true', help='把域名文件按计划写入队列后退出')
+    parser.add_argument('--queue-status', action='store_true', help='查看队列状态和已汇报的结果后退出')
+    parser.add_argument('--shard-pages', type=int, default=0, help='按页码分片，每个任务最多翻的页数，默认不分片')
+    parser.add_argument('--lease-timeout', type=int, default=LEASE_TIMEOUT,
+                        help=f'任务租约可见性超时（秒），默认为 {LEASE_TIMEOUT}')
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                        help=f'单个任务最多尝试次数，默认为 {MAX_ATTEMPTS}')
+    parser.add_argument('--worker-id', type=str, default=None, help='队列节点标识，默认为 主机名-进程号')
+    parser.add_argument('--preset', type=str, choices=sorted(PRESETS), default=None,
+                        help=f'等待/超时参数预设（safe 稳妥、fast 提速并单独保存HTML结果），默认为 {default_preset}')
+    parser.add_argument('--tuning-config', type=str, default=None,
+                        help='自定义调优配置文件（JSON），可用 "preset" 键指定基础预设，其余键覆盖预设参数')
+    parser.add_argument('--autotune', action='store_true',
+                        help='按运行中实测的页面加载/渲染耗时自动调整 CONTENT_TIMEOUT 和滚动等待')
+    parser.add_argument('--log-level', type=str, default='INFO', choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                        help='控制台日志级别，DEBUG 时输出每页的加载和新增统计，默认为 INFO')
+    parser.add_argument('--log-file', type=str, default=None,
+                        help='结构化 JSON 日志路径，默认为 results/logs/edgeurl_<时间>.jsonl')
+    parser.add_argument('--no-log-file', action='store_true', help='不写结构化 JSON 日志')
+    parser.add_argument('--show-urls', action='store_true', help='在控制台逐条输出每页新增的 URL 和标题')
+    parser.add_argument('--challenge-alert', action='store_true',
+                        help='出现验证页面时额外发送通知提醒人工处理（默认仅在控制台提示并响铃）')
+    parser.add_argument('--notify-config', type=str, default=None,
+                        help=f'通知配置文件（JSON），默认为 {NOTIFY_CONFIG}，环境变量 EDGEURL_SMTP_* 等优先')
+    parser.add_argument('--no-pause', action='store_true', help='结束时不等待按回车（非交互终端下自动跳过）')
+    parser.add_argument('--engines', type=str, default=DEFAULT_ENGINES,
+                        help=f'搜索引擎，逗号分隔（可选 {", ".join(BACKENDS)}），多个引擎时同一域名在各引擎上'
+                             f'分别占用标签页并行爬取，结果合并去重，默认为 {DEFAULT_ENGINES}')
+    parser.add_argument('--warm-profiles', type=int, default=0,
+                        help='使用 N 个可复用的浏览器配置档：开始爬取前预热（同意 Cookie、完成首次查询），'
+                             '启动和重启浏览器时复用，默认为 0（每次冷启动）')
+    parser.add_argument('--profile-dir', type=str, default=PROFILE_ROOT,
+                        help=f'预热配置档所在目录，默认为 {PROFILE_ROOT}')
+    parser.add_argument('--rewarm', action='store_true', help='忽略预热有效期，重新预热全部空闲配置档')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='只检查域名文件和各项配置并打印爬取计划，不启动浏览器')
     args = parser.parse_args()
+    print_banner(args.preset or default_preset)
 
-    if not os.path.exists(args.file):
+    if args.dry_run:
+        if dry_run(args, default_preset):
+            sys.exit(1)
+        return
+
+    global SHOW_URLS
+    SHOW_URLS = args.show_urls
+    progress = ProgressView(total_pages=args.page_budget)
+    log_file = None if args.no_log_file else (args.log_file or default_log_file())
+    setup_logging(args.log_level, log_file, progress)
+
+    try:
+        tuning = load_tuning(args.preset, args.tuning_config, default_preset)
+    except (OSError, ValueError) as e:
+        print(Fore.RED + f"[-] 加载调优配置失败: {e}")
+        return
+    apply_tuning(tuning)
+    tuner = LatencyTuner() if args.autotune else None
+    try:
+        backends = get_backends(args.engines)
+    except ValueError as e:
+        print(Fore.RED + f"[-] {e}")
+        return
+
+    # 通知：结束报告、各域名进度（配置 progress 时）以及 --challenge-alert 时的验证提醒，均在后台线程发送
+    try:
+        notifier = build_notifier(load_notify_config(args.notify_config))
+    except (OSError, ValueError) as e:
+        print(Fore.RED + f"[-] 加载通知配置失败: {e}")
+        return
+    print(Fore.GREEN + f"[+] 通知渠道：{notifier.describe()}")
+
+    def challenge_alert(domain, url):
+        notifier.notify(f"⚠️ EdgeURL 需要人工验证：{domain}",
+                        f"爬取 {domain} 时出现验证页面，请在浏览器中完成验证。\n页面地址：{url}",
+                        event='challenge', domain=domain, url=url)
+
+    monitor = ChallengeMonitor(challenge_alert if args.challenge_alert else None)
+    print(Fore.GREEN + f"[+] 调优参数：{tuning['name']}{'（自动调优）' if tuner else ''} | "
+                       f"CONTENT_TIMEOUT {CONTENT_TIMEOUT} 秒 | 滚动等待 {SCROLL_PAUSE} 秒 | "
+                       f"翻页间隔 {PAGE_DELAY[0]}-{PAGE_DELAY[1]} 秒")
+
+    broker = None
+    if args.queue:
+        broker = open_broker(args.queue, args.max_attempts)
+        if args.queue_status:
+            print_queue_status(broker)
+            broker.close()
+            return
+
+    # 队列节点不读取本地域名文件（与 memory:// 替身配合时除外）
+    worker_only = broker is not None and not args.enqueue and args.queue != 'memory://'
+    if worker_only:
+        domains = []
+    elif not os.path.exists(args.file):
         print(Fore.RED + f"[-] 未找到文件: {args.file}")
         return
 
-    with open(args.file, 'r', encoding='utf-8') as f:
-        domains = [line.strip() for line in f.readlines() if line.strip()]
+    else:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            domains = [line.strip() for line in f.readlines() if line.strip()]
 
-    if not domains:
+    if not domains and not worker_only:
         print(Fore.RED + f"[-] 文件 {args.file} 为空或全部为空行")
         return
 
-    driver = setup_driver(args.proxy)
+    store = None
+    run_id = None
+    if not args.no_db:
+        try:
+            store = ResultStore(args.db)
+        except Exception as e:
+            print(Fore.RED + f"[-] 打开结果数据库失败，仅保存Excel: {e}")
+            store = None
+
+    tasks = plan_tasks(domains, store, args.no_plan, args.plan_limit)
+
+    if broker is not None and (args.enqueue or args.queue == 'memory://'):
+        enqueue_tasks(broker, tasks, args.shard_pages)
+        if args.enqueue:
+            broker.close()
+            if store is not None:
+                store.close()
+            return
+
+    # 离线回放：本地服务器代替 Bing，去掉人为等待
+    replay = None
+    if args.replay is not None:
+        archives = find_archives(args.replay)
+        if not archives:
+            print(Fore.RED + f"[-] 未找到录制文件: {args.replay}")
+            if store is not None:
+                store.close()
+            return
+        replay = ReplayServer(archives, args.replay_latency).start()
+        skipped = [backend.label for backend in backends if not backend.replayable]
+        if skipped:
+            print(Fore.YELLOW + f"[!] 回放只支持 Bing，跳过: {', '.join(skipped)}")
+        backends = [type(backend)(replay.search_url) for backend in backends if backend.replayable] or \
+            [BingBackend(replay.search_url)]
+        use_offline_timing()
+    elif args.record and not all(backend.replayable for backend in backends):
+        print(Fore.YELLOW + "[!] --record 只录制 Bing 的页面")
+    tabs = max(args.tabs, len(backends))
+    if args.profile and tabs > 1:
+        # 命令计数和 tracemalloc 快照都是进程级的，多个标签页交错执行时会互相混入对方的统计
+        print(Fore.YELLOW + "[!] --profile 时只使用一个标签页（多个搜索引擎依次爬取），"
+                            "使每个域名的命令统计和内存分配不混入其他标签页")
+        tabs = 1
+    if len(backends) > 1:
+        print(Fore.GREEN + f"[+] 搜索引擎：{', '.join(backend.label for backend in backends)}"
+                           f"（每个域名在各引擎上{'依次' if tabs == 1 else '并行'}爬取）")
+
+    proxy_pool = None
+    if args.proxy_file:
+        try:
+            proxy_pool = ProxyPool(load_proxies(args.proxy_file))
+        except (OSError, ValueError) as e:
+            print(Fore.RED + f"[-] 加载代理列表失败: {e}")
+            if store is not None:
+                store.close()
+            if replay is not None:
+                replay.stop()
+            return
+        print(Fore.GREEN + f"[+] 代理池：{len(proxy_pool.stats)} 个代理")
+
+    # 预热配置档：开始爬取前完成 Cookie 同意和首次查询，之后启动/重启浏览器时复用
+    proxy = proxy_pool.acquire() if proxy_pool is not None else args.proxy
+    profiles = None
+    if args.warm_profiles > 0 and replay is not None:
+        print(Fore.YELLOW + "[!] 离线回放不需要预热配置档，忽略 --warm-profiles")
+    elif args.warm_profiles > 0:
+        profiles = WarmProfilePool(setup_driver, args.profile_dir, args.warm_profiles)
+        ready, warmed = profiles.prewarm(backends, proxy, monitor=monitor, force=args.rewarm)
+        print(Fore.GREEN + f"[+] 预热配置档：{ready}/{args.warm_profiles} 个可用（本次预热 {warmed} 个）")
+
+    driver = launch_driver(proxy, profiles)
     if not driver:
+        if store is not None:
+            store.close()
+        if replay is not None:
+            replay.stop()
         return
 
-    domain_stats = {}
-    total_domains = len(domains)
-    total_normal_urls = 0
-    total_doc_urls = 0
-    total_pages = 0
-    start_time = time.time()
-
-    try:
-        for domain in domains:
-            domain_start_time = time.time()
-            query = f'site:{domain}'
-            # 爬取并获取分类后的URL
-            normal_urls, doc_urls, pages = crawl_domain(driver, query, args.proxy)
-
-            normal_count = len(normal_urls)
-            doc_count = len(doc_urls)
+    if store is not None:
+        run_id = store.start_run(' '.join(f'{k}={v}' for k, v in vars(args).items()))
 
-            total_normal_urls += normal_count
-            total_doc_urls += doc_count
-            total_pages += pages
+    discovery = None
+    if args.discover:
+        discovery = DiscoveryQueue([host for task in tasks for host in [task.query] + task.targets],
+                                   args.discover_depth, args.discover_budget)
 
-            domain_stats[domain] = {
-                'pages': pages,
-                'normal_urls': normal_count,
-                'doc_urls': doc_count
-            }
+    domain_stats = {}
+    totals = {'domains': sum(len(task.targets) for task in tasks), 'normal_urls': 0, 'doc_urls': 0, 'pages': 0}
+    pending = [(task, 0) for task in tasks] if broker is None else []
+    progress.total_domains = totals['domains'] if broker is None else 0
+    start_time = time.time()
 
-            # 保存普通URL
-            normal_file = save_to_excel(normal_urls, domain, is_document=False)
-            # 保存文档URL
-            doc_file = save_to_excel(doc_urls, domain, is_document=True) if doc_urls else None
+    # --profile 时结果处理内联执行，使 cProfile 覆盖全部 Python 侧开销；未开启时不做任何包装
+    command_counts = None
+    profilers = {}
+    use_pipeline = not args.no_pipeline and not args.profile
+    if args.profile:
+        start_tracemalloc()
+        command_counts = Counter()
+        install_command_counter(driver, command_counts)
+
+    # 预算模式：按页数/截止时间把配额一块一块分给各域名，同一域名的各块结果累积后统一保存
+    scheduler = None
+    partial = {}
+    if args.page_budget or args.deadline:
+        deadline = parse_deadline(args.deadline) if args.deadline else None
+        scheduler = BudgetScheduler(args.page_budget, deadline, args.initial_pages, args.chunk_pages,
+                                    cost_per_page=len(backends))
+        for task, depth in pending:
+            scheduler.add(task.query, (task, depth))
+        pending.clear()
+
+    def pop_discovered():
+        if discovery is None:
+            return None
+        found = discovery.pop()
+        if found is None:
+            return None
+        host, depth = found
+        totals['domains'] += 1
+        progress.total_domains = totals['domains']
+        print(Fore.CYAN + f"\n[+] 发现新子域名 {host}（第 {depth} 层），加入爬取")
+        return CrawlTask(host, [host], f'第 {depth} 层发现'), depth
+
+    def next_task():
+        """先取计划中的任务，再取子域名发现队列中的任务；预算模式下由调度器决定下一块配额"""
+        if scheduler is None:
+            found = pending.pop(0) if pending else pop_discovered()
+            return found + (1, MAX_PAGES) if found else None
+        # 只在调度器马上会给它分配初始配额时才取出新发现的子域名（初始配额优先），
+        # 避免预算或截止时间先用完时，这些子域名已被计入发现预算并在报告中显示为已爬取
+        if scheduler.can_grant() and not scheduler.waiting():
+            found = pop_discovered()
+            if found is not None:
+                scheduler.add(found[0].query, found)
+        grant = scheduler.next_grant()
+        if grant is None:
+            return None
+        _, (task, depth), start_page, pages = grant
+        print(Fore.CYAN + f"\n[+] 预算分配：site:{task.query} 第 {start_page} 页起 {pages} 页")
+        return task, depth, start_page, pages
+
+    # 多引擎：同一任务按引擎拆成多个爬取，分别占用标签页并行执行，全部结束后合并去重再保存
+    fanout = []
+    engine_runs = {}
+    engine_stats = {}
+
+    def next_item():
+        if not fanout:
+            item = next_task()
+            if item is None:
+                return None
+            fanout.extend(item + (backend,) for backend in backends)
+        return fanout.pop(0)
+
+    def start_crawl(item):
+        task, _, start_page, max_pages, backend = item
+        proxy = proxy_pool.current if proxy_pool is not None else args.proxy
+        crawl = iter_crawl_domain(driver, f'site:{task.query}', proxy, store, run_id, start_page, max_pages,
+                                  pipeline=use_pipeline, record=args.record, backend=backend,
+                                  tuner=tuner, monitor=monitor, proxy_pool=proxy_pool)
+        if command_counts is None:
+            return crawl
+        profilers[task.query, backend.name] = DomainProfiler(task.query, command_counts)
+        return profilers[task.query, backend.name].wrap(crawl)
+
+    def finish_item(item, result, domain_start_time):
+        task, _, _, _, backend = item
+        runs = engine_runs.setdefault(task.query, {'runs': [], 'start': domain_start_time})
+        runs['runs'].append((backend.name, result))
+        runs['start'] = min(runs['start'], domain_start_time)
+        # 最后结束的引擎的性能分析交给 finish_crawl（与保存结果一起统计），其余引擎的直接保存
+        profiler = profilers.pop((task.query, backend.name), None)
+        if len(runs['runs']) < len(backends):
+            if profiler is not None:
+                profiler.save()
+            return
+        if profiler is not None:
+            profilers[task.query] = profiler
+        engine_runs.pop(task.query)
+        merged = merge_engine_results(runs['runs'], engine_stats)
+        # 预算模式按各引擎中翻得最多的页码推进（全部引擎都翻到尽头才算该域名结束），按各引擎页数之和计入预算
+        finish_crawl(item[:4], merged, runs['start'], max(result[2] for _, result in runs['runs']))
+
+    def save_crawl(task, all_normal_urls, all_doc_urls, pages, domain_start_time, profiler=None):
+        if profiler is None:
+            normal_count, doc_count = save_task_results(task, all_normal_urls, all_doc_urls, pages,
+                                                        domain_stats, domain_start_time, not args.no_cluster)
+        else:
+            with profiler.active():
+                normal_count, doc_count = save_task_results(task, all_normal_urls, all_doc_urls, pages,
+                                                            domain_stats, domain_start_time, not args.no_cluster)
+            profiler.save()
+        totals['normal_urls'] += normal_count
+        totals['doc_urls'] += doc_count
+        for domain in task.targets:
+            if domain in domain_stats:
+                notifier.domain_done(domain, domain_stats[domain], time.time() - domain_start_time)
+
+    def finish_crawl(item, result, domain_start_time, chunk_pages=None):
+        task, depth, _, _ = item
+        all_normal_urls, all_doc_urls, pages = result
+        totals['pages'] += pages
+        if discovery is not None:
+            discovery.observe(all_normal_urls, task.query, depth)
+            discovery.observe(all_doc_urls, task.query, depth)
+        profiler = profilers.pop(task.query, None)
+        if scheduler is None:
+            save_crawl(task, all_normal_urls, all_doc_urls, pages, domain_start_time, profiler)
+            return
+
+        entry = partial.setdefault(task.query, {'task': task, 'normal': UrlList(), 'doc': UrlList(),
+                                                'pages': 0, 'start': domain_start_time, 'seen': set()})
+        new_urls = 0
+        for url, _ in list(all_normal_urls) + list(all_doc_urls):
+            if hash(url) not in entry['seen']:
+                entry['seen'].add(hash(url))
+                new_urls += 1
+        entry['normal'].extend(all_normal_urls)
+        entry['doc'].extend(all_doc_urls)
+        entry['pages'] += pages
+        if profiler is not None:
+            profiler.save()
+        if scheduler.report_chunk(task.query, pages if chunk_pages is None else chunk_pages, new_urls, pages):
+            partial.pop(task.query)
+            save_crawl(task, entry['normal'], entry['doc'], entry['pages'], entry['start'])
+
+    def restart_browser(old_driver):
+        """
+        由标签页调度器调用：代理健康分过低时在任务间隙换代理并重启浏览器，
+        浏览器故障时重启（有代理池时同样换用下一个代理）
+        """
+        nonlocal driver
+        driver = restart_driver(old_driver, proxy_pool.rotate() if proxy_pool is not None else args.proxy,
+                                command_counts, profiles)
+        return driver
 
-            if normal_file or doc_file:
-                print(Fore.GREEN + f"\n[+] 爬取 {domain} 完成 | 页数: {pages} | "
-                                   f"普通URL: {normal_count} | 文档URL: {doc_count} | "
-                                   f"耗时: {time.time() - domain_start_time:.2f} 秒")
+    def flush_partial():
+        """预算用完时保存尚未翻完的域名"""
+        for entry in list(partial.values()):
+            save_crawl(entry['task'], entry['normal'], entry['doc'], entry['pages'], entry['start'])
+        partial.clear()
 
-            delay = random.uniform(3, 7)
-            print(Fore.YELLOW + f"[+] 准备爬取下一个域名，{delay:.1f} 秒后继续...")
-            time.sleep(delay)
+    try:
+        if broker is not None:
+            driver, pages, normal_count, doc_count = run_worker(args, broker, driver, store, run_id, domain_stats,
+                                                                command_counts, backends, tuner, monitor,
+                                                                proxy_pool, notifier, engine_stats, profiles)
+            totals.update(domains=len(domain_stats), pages=pages, normal_urls=normal_count, doc_urls=doc_count)
+        else:
+            pool = TabPool(driver, tabs, next_task_delay=(0, 0) if replay is not None else NEXT_TASK_DELAY,
+                           needs_restart=proxy_pool.should_rotate if proxy_pool is not None else None,
+                           restart=restart_browser, describe=lambda item: item[0].query)
+            pool.run(next_item, start_crawl, finish_item)
+            flush_partial()
+            progress.render()
+            pool.print_report()
 
     except Exception as e:
         print(Fore.RED + f"[-] 爬取过程中发生错误: {e}")
     finally:
         if driver:
             print(Fore.YELLOW + "\n[+] 所有域名爬取完成，关闭浏览器...")
-            driver.quit()
+            close_driver(driver, profiles)
+        if store is not None:
+            store.finish_run(run_id)
+            store.close()
+        if broker is not None:
+            broker.close()
+        if replay is not None:
+            replay.stop()
 
     execution_time = time.time() - start_time
-    total_urls = total_normal_urls + total_doc_urls
-    email_content = generate_email_content(domain_stats, total_domains, total_urls, total_pages, execution_time)
-
-    config = {
-        "sender_email": "your_QQ@qq.com",
-        "sender_password": "your_password",
-        "receiver_email": "your_Email@163.com",
-        "subject": f"📧 EdgeURL 爬取完成！共获取 {total_urls} 个URL",
-        "content": email_content
-    }
-
-    email_sent = send_email(**config)
-    if email_sent:
-        print(Fore.GREEN + "\n[✓] 爬取和通知流程全部完成！")
+    total_domains = totals['domains']
+    total_pages = totals['pages']
+    total_urls = totals['normal_urls'] + totals['doc_urls']
+    discovered = discovery.report() if discovery is not None else None
+    budget_rows = scheduler.report() if scheduler is not None else None
+    challenge_rows = monitor.report()
+    proxy_rows = proxy_pool.report() if proxy_pool is not None else None
+    engine_rows = engine_report(engine_stats) if len(backends) > 1 else None
+    if profiles is not None:
+        print(Fore.CYAN + "\n[+] 预热配置档：")
+        for name, warm, age, launches, warm_launches, startup, uses in profiles.report():
+            print(Fore.CYAN + f"    {name} | {'已预热' if warm else '未预热'}"
+                              f"{f'（{age / 3600:.1f} 小时前）' if age is not None else ''} | "
+                              f"本次启动 {launches} 次（预热启动 {warm_launches} 次，平均 {startup:.1f} 秒） | "
+                              f"累计使用 {uses} 次")
+        if profiles.cold_launches:
+            print(Fore.CYAN + f"    配置档均被占用时冷启动 {profiles.cold_launches} 次")
+    if engine_rows:
+        print(Fore.CYAN + "\n[+] 搜索引擎产出：")
+        for name, crawls, pages, urls, unique, per_page in engine_rows:
+            print(Fore.CYAN + f"    {name} | 爬取 {crawls} 次 | {pages} 页 | URL {urls} 个（独有 {unique} 个） | "
+                              f"每页 {per_page:.1f} 个")
+    if proxy_rows:
+        print(Fore.CYAN + "\n[+] 代理池统计：")
+        for proxy, score, pages, failures, challenges, latency, rotations in proxy_rows:
+            print(Fore.CYAN + f"    {proxy} | 健康分 {score:.2f} | 成功 {pages} 页 | 失败 {failures} 次 | "
+                              f"验证 {challenges} 次 | 平均加载 {latency:.2f} 秒 | 被换下 {rotations} 次")
+    if challenge_rows:
+        print(Fore.CYAN + "\n[+] 验证与异常页面：")
+        for domain, challenges, waited, empty, error in challenge_rows:
+            print(Fore.CYAN + f"    {domain} | 验证页面 {challenges} 次（等待 {waited:.0f} 秒） | "
+                              f"无结果页 {empty} | 错误页 {error}")
+    if budget_rows:
+        print(Fore.CYAN + f"\n[+] 预算使用：{scheduler.spent} 页"
+                          f"{f' / {scheduler.total_pages} 页' if scheduler.total_pages else ''}")
+        for key, pages, new_urls, chunks, recent, state in budget_rows:
+            print(Fore.CYAN + f"    {key} | {pages} 页 | 新增 URL {new_urls} | 分配 {chunks} 次 | "
+                              f"近期每页 {recent:.1f} | {state}")
+    if tuner is not None:
+        tuner.print_report()
+    if discovered:
+        print(Fore.CYAN + f"\n[+] 新发现子域名 {len(discovered)} 个：")
+        for host, origin, depth, count, crawled in discovered:
+            print(Fore.CYAN + f"    {host} <- site:{origin} | 第 {depth} 层 | 出现 {count} 次 | "
+                              f"{'已爬取' if crawled else '未爬取'}")
+    email_content = generate_email_content(domain_stats, total_domains, total_urls, total_pages, execution_time,
+                                           discovered, budget_rows, challenge_rows, proxy_rows, engine_rows)
+
+    if notifier.sinks:
+        print(Fore.YELLOW + f"[+] 正在发送结束报告（{notifier.describe()}）...")
+        notifier.notify(f"📧 EdgeURL 爬取完成！共获取 {total_urls} 个URL", email_content, event='report',
+                        domains=total_domains, pages=total_pages, urls=total_urls,
+                        elapsed=round(execution_time, 2))
+        if notifier.close():
+            print(Fore.GREEN + "\n[✓] 爬取和通知流程全部完成！")
+        else:
+            print(Fore.RED + f"\n[-] 爬取完成，但部分通知发送失败（成功 {notifier.sent} 次，失败 {notifier.failed} 次，"
+                             f"丢弃 {notifier.dropped} 条）")
+            print(Fore.YELLOW + "[*] 请检查通知配置和网络连接")
     else:
-        print(Fore.RED + "\n[-] 爬取完成，但邮件通知失败")
-        print(Fore.YELLOW + "[*] 请检查邮箱配置和网络连接")
-
-    input(Fore.YELLOW + "\n[*] 按回车退出...")
+        print(Fore.YELLOW + f"\n[!] 未配置通知渠道，跳过发送报告（见 {NOTIFY_CONFIG} 或 EDGEURL_SMTP_* 环境变量）")
+
+    if log_file:
+        shutdown_logging()
+        print(Fore.CYAN + f"[+] 结构化日志已保存: {log_file}")
+    # 计划任务等非交互环境下直接退出，不等待输入
+    if not args.no_pause and sys.stdin is not None and sys.stdin.isatty():
+        input(Fore.YELLOW + "\n[*] 按回车退出...")
 
 
 if __name__ == "__main__":
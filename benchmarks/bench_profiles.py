@@ -0,0 +1,105 @@
+"""
+对比冷启动与预热配置档两种方式的浏览器启动耗时和首次查询出结果的耗时（time-to-first-result）。
+
+每轮启动一次浏览器、执行一次 site: 查询并等待结果出现，记录启动耗时、出结果耗时和是否遇到验证页面。
+预热方式先在临时目录（或 --root）中预热配置档，再反复用同一配置档启动。
+
+用法（需要 Edge 驱动，会真实访问搜索引擎）：
+    python benchmarks/bench_profiles.py -n 3
+    python benchmarks/bench_profiles.py -n 5 --engine duckduckgo --proxy 127.0.0.1:7890
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from EdgeURL import setup_driver  # noqa: E402
+from page_state import PAGE_CHALLENGE, PAGE_NORMAL  # noqa: E402
+from search_backends import BACKENDS  # noqa: E402
+from warm_profiles import WarmProfilePool, wait_first_result  # noqa: E402
+
+
+def first_query(args):
+    """基准查询：域名文件中的第一个域名，没有时使用 example.com"""
+    path = os.path.join(ROOT, args.file)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip() and not line.strip().startswith('#'):
+                    return f'site:{line.strip()}'
+    return 'site:example.com'
+
+
+def run_round(start, backend, query):
+    """启动一次浏览器并完成首次查询，返回 (启动秒数, 出结果秒数, 页面类型)；start() 返回 (driver, 结束回调)"""
+    started = time.time()
+    driver, finish = start()
+    if not driver:
+        return None
+    startup = time.time() - started
+    try:
+        driver.get(backend.build_url(query))
+        kind, _ = wait_first_result(driver, backend)
+        return startup, time.time() - started, kind
+    finally:
+        finish(driver)
+
+
+def summarize(name, rows):
+    ok = [row for row in rows if row is not None]
+    if not ok:
+        print(f"{name:<10}{'启动失败':>10}")
+        return
+    startup = [row[0] for row in ok]
+    first = [row[1] for row in ok if row[2] == PAGE_NORMAL]
+    challenges = sum(row[2] == PAGE_CHALLENGE for row in ok)
+    first_avg = f"{statistics.mean(first):.2f}" if first else '-'
+    first_p50 = f"{statistics.median(first):.2f}" if first else '-'
+    print(f"{name:<10}{len(ok):>6}{statistics.mean(startup):>12.2f}{first_avg:>14}{first_p50:>12}"
+          f"{challenges:>8}{len(ok) - len(first) - challenges:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='冷启动 vs 预热配置档 对比测试')
+    parser.add_argument('-n', '--rounds', type=int, default=3, help='每种方式启动浏览器的次数')
+    parser.add_argument('-f', '--file', type=str, default='domain.txt', help='取第一个域名作为基准查询')
+    parser.add_argument('--engine', type=str, default='bing', choices=sorted(BACKENDS), help='搜索引擎')
+    parser.add_argument('--proxy', type=str, default=None, help='代理，如 127.0.0.1:7890')
+    parser.add_argument('--root', type=str, default=None, help='预热配置档目录，默认使用临时目录')
+    args = parser.parse_args()
+
+    backend = BACKENDS[args.engine]()
+    query = first_query(args)
+    root = args.root or tempfile.mkdtemp(prefix='edgeurl_profiles_')
+
+    def cold():
+        return setup_driver(args.proxy), lambda driver: driver.quit()
+
+    cold_rows = [run_round(cold, backend, query) for _ in range(args.rounds)]
+
+    profiles = WarmProfilePool(setup_driver, root, 1)
+    ready, _ = profiles.prewarm([backend], args.proxy)
+    if not ready:
+        print("[!] 配置档预热未完成，以下预热结果仅供参考")
+
+    def warm():
+        def finish(driver):
+            driver.quit()
+            profiles.release(driver)
+        return profiles.launch(args.proxy), finish
+
+    warm_rows = [run_round(warm, backend, query) for _ in range(args.rounds)]
+
+    print(f"查询: {query} | 搜索引擎: {backend.label} | 每种方式 {args.rounds} 轮 | 配置档目录: {root}")
+    print(f"{'方式':<10}{'轮数':>6}{'启动(秒)':>12}{'出结果(秒)':>14}{'P50(秒)':>12}{'验证':>8}{'超时':>8}")
+    summarize('冷启动', cold_rows)
+    summarize('预热配置档', warm_rows)
+
+
+if __name__ == "__main__":
+    main()
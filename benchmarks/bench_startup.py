@@ -0,0 +1,101 @@
+"""
+统计 EdgeURL 的启动开销：模块导入耗时（python -X importtime）、--help 和 --dry-run 的端到端耗时，
+并检查 selenium/pandas/smtplib 等重量级模块没有在导入阶段被加载，便于随功能增加跟踪启动速度。
+
+用法（不需要 Edge 驱动，不访问网络）：
+    python benchmarks/bench_startup.py -n 5
+    python benchmarks/bench_startup.py --budget-ms 200   # 导入耗时超过预算时返回非零退出码
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'EdgeURL.py')
+# 只应在启动浏览器、保存Excel、发送邮件时才导入的模块
+DEFERRED_MODULES = ('selenium', 'pandas', 'openpyxl', 'smtplib', 'email.mime.text', 'http.server', 'pstats')
+
+
+def import_times():
+    """
+    运行 python -X importtime -c "import EdgeURL"，
+    返回 (EdgeURL 累计导入耗时毫秒, [(模块, 累计毫秒), ...] EdgeURL 直接导入的各模块)
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import EdgeURL'],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(cumulative) / 1000))
+
+    # importtime 按导入完成顺序输出，子模块在父模块之前
+    index = max(i for i, (depth, name, _) in enumerate(rows) if depth == 0 and name == 'EdgeURL')
+    children = []
+    for depth, name, cumulative in reversed(rows[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, cumulative))
+    return rows[index][2], sorted(children, key=lambda item: -item[1])
+
+
+def loaded_deferred_modules():
+    """导入 EdgeURL 后已被加载的重量级模块"""
+    code = ('import sys, EdgeURL; '
+            f'print(" ".join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))')
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def wall_times(args, repeat):
+    """多次运行 EdgeURL.py 并返回每次的耗时（秒），退出码不影响计时（--dry-run 缺少驱动时返回 1）"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT] + args, cwd=ROOT, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EdgeURL 启动耗时基准')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='每个命令的运行次数，默认为 5')
+    parser.add_argument('--top', type=int, default=10, help='列出导入耗时最多的模块数，默认为 10')
+    parser.add_argument('--budget-ms', type=float, default=None, help='EdgeURL 导入耗时预算（毫秒），超出时退出码为 1')
+    args = parser.parse_args()
+
+    total, children = import_times()
+    print(f"导入 EdgeURL: {total:.1f} ms")
+    print(f"{'模块':<32}{'累计(ms)':>12}")
+    for name, cumulative in children[:args.top]:
+        print(f"{name:<32}{cumulative:>12.1f}")
+
+    loaded = loaded_deferred_modules()
+    print(f"\n导入阶段加载的重量级模块: {', '.join(loaded) if loaded else '无'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        domain_file = os.path.join(tmp, 'domain.txt')
+        with open(domain_file, 'w', encoding='utf-8') as f:
+            f.write('example.com\nwww.example.com\nexample.org\n')
+        commands = (('--help', ['--help']),
+                    ('--dry-run', ['--dry-run', '-f', domain_file, '--no-db', '--no-pause']))
+        print(f"\n{'命令':<16}{'最快(秒)':>12}{'中位数(秒)':>14}")
+        for name, command in commands:
+            times = wall_times(command, args.repeat)
+            print(f"{name:<16}{min(times):>12.3f}{statistics.median(times):>14.3f}")
+
+    if args.budget_ms is not None and total > args.budget_ms:
+        print(f"\n[-] 导入耗时 {total:.1f} ms 超出预算 {args.budget_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
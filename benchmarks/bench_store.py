@@ -0,0 +1,63 @@
+"""
+对比 (url, title) 元组列表与 UrlList 的内存占用（按每百万条URL折算）。
+
+用法：
+    python benchmarks/bench_store.py -n 1000000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compact_store import UrlList  # noqa: E402
+
+
+def synthetic_results(count, hosts=40, seed=1):
+    """生成近似真实分布的搜索结果：少量主机、数字ID路径、中文标题"""
+    rng = random.Random(seed)
+    host_names = [f"https://sub{i}.example.com" for i in range(hosts)]
+    sections = ['news', 'article', 'product', 'download', 'help', 'static/docs']
+    for i in range(count):
+        host = rng.choice(host_names)
+        path = f"/{rng.choice(sections)}/{rng.randint(10000, 999999)}.html"
+        if i % 7 == 0:
+            path += f"?id={rng.randint(1, 99999)}&page={rng.randint(1, 50)}"
+        title = f"示例标题 {rng.randint(1, 99999)} - 某某公司官网"
+        # 与爬取结果一样，每条记录都是独立构造的字符串
+        yield ''.join([host, path]), ''.join([title])
+
+
+def measure(build, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    container = build(synthetic_results(count))
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    iterated = sum(1 for _ in container)
+    iter_elapsed = time.perf_counter() - start
+    assert iterated == count
+    return current, elapsed, iter_elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='结果容器内存对比')
+    parser.add_argument('-n', '--count', type=int, default=1000000, help='URL 数量')
+    args = parser.parse_args()
+
+    print(f"URL 数量: {args.count}")
+    print(f"{'容器':<12}{'内存(MB)':>12}{'每百万条(MB)':>16}{'每条(字节)':>14}{'构建(秒)':>10}{'遍历(秒)':>10}")
+    for name, build in (('元组列表', list), ('UrlList', UrlList)):
+        memory, elapsed, iter_elapsed = measure(build, args.count)
+        per_million = memory / args.count * 1000000 / 1024 / 1024
+        print(f"{name:<12}{memory / 1024 / 1024:>12.1f}{per_million:>16.1f}{memory / args.count:>14.1f}"
+              f"{elapsed:>10.2f}{iter_elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
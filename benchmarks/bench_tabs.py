@@ -0,0 +1,116 @@
+"""
+对比"单浏览器多标签页"与"每个并发一个浏览器"两种方式的内存占用和爬取速度。
+
+用法（需要 Edge 驱动和 psutil，会真实访问 Bing）：
+    python benchmarks/bench_tabs.py -f domain.txt -n 3
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'EdgeURL.py')
+SAMPLE_INTERVAL = 1  # 内存采样间隔（秒）
+
+
+def tree_memory_mb(procs):
+    """统计若干进程及其全部子进程的常驻内存总和（MB）"""
+    total = 0
+    for proc in procs:
+        try:
+            members = [proc] + proc.children(recursive=True)
+        except psutil.NoSuchProcess:
+            continue
+        for member in members:
+            try:
+                total += member.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    return total / 1024 / 1024
+
+
+def count_pages(db_paths):
+    pages = 0
+    for path in db_paths:
+        if os.path.exists(path):
+            conn = sqlite3.connect(path)
+            pages += conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            conn.close()
+    return pages
+
+
+def run_processes(commands, db_paths):
+    """并行运行若干 EdgeURL 进程，返回 (耗时, 页数, 内存峰值MB)"""
+    start = time.time()
+    popens = [subprocess.Popen(cmd, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL) for cmd in commands]
+    procs = [psutil.Process(p.pid) for p in popens]
+    peak = 0.0
+    while any(p.poll() is None for p in popens):
+        peak = max(peak, tree_memory_mb(procs))
+        time.sleep(SAMPLE_INTERVAL)
+    for p in popens:
+        # 结束时的"按回车退出"
+        try:
+            p.communicate(b'\n', timeout=5)
+        except Exception:
+            p.kill()
+    return time.time() - start, count_pages(db_paths), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多标签页 vs 多浏览器 对比测试')
+    parser.add_argument('-f', '--file', type=str, default='domain.txt', help='域名列表文件')
+    parser.add_argument('-n', '--concurrency', type=int, default=3, help='并发爬取数')
+    parser.add_argument('--limit', type=int, default=6, help='最多使用域名文件中的前 N 个域名')
+    args = parser.parse_args()
+
+    if psutil is None:
+        print("[-] 对比测试需要 psutil：pip install psutil")
+        return
+
+    with open(os.path.join(ROOT, args.file), 'r', encoding='utf-8') as f:
+        domains = [line.strip() for line in f if line.strip()][:args.limit]
+
+    workdir = tempfile.mkdtemp(prefix='edgeurl_bench_')
+    domain_file = os.path.join(workdir, 'domains.txt')
+    with open(domain_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(domains))
+
+    # 方式一：单浏览器 N 个标签页
+    tabs_db = os.path.join(workdir, 'tabs.db')
+    tabs = run_processes([[sys.executable, SCRIPT, '-f', domain_file, '--no-plan',
+                           '--tabs', str(args.concurrency), '--db', tabs_db]], [tabs_db])
+
+    # 方式二：N 个进程，每个进程一个浏览器
+    commands, db_paths = [], []
+    for i in range(args.concurrency):
+        shard = domains[i::args.concurrency]
+        if not shard:
+            continue
+        shard_file = os.path.join(workdir, f'shard_{i}.txt')
+        with open(shard_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(shard))
+        db_path = os.path.join(workdir, f'worker_{i}.db')
+        commands.append([sys.executable, SCRIPT, '-f', shard_file, '--no-plan', '--db', db_path])
+        db_paths.append(db_path)
+    workers = run_processes(commands, db_paths)
+
+    print(f"域名数: {len(domains)} | 并发: {args.concurrency}")
+    print(f"{'方式':<14}{'页数':>8}{'耗时(秒)':>12}{'页/分钟':>10}{'内存峰值MB':>14}{'每并发MB':>12}")
+    for name, (elapsed, pages, peak) in (('单浏览器多标签', tabs), ('每并发一浏览器', workers)):
+        rate = pages / elapsed * 60 if elapsed > 0 else 0
+        print(f"{name:<14}{pages:>8}{elapsed:>12.1f}{rate:>10.1f}{peak:>14.0f}{peak / args.concurrency:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import math
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+# ====================== 预算调度配置 ======================
+INITIAL_PAGES = 5  # 每个域名的初始页数配额
+CHUNK_PAGES = 5  # 之后每次追加的页数
+EXPLORATION = 2.0  # UCB 探索系数，越大越倾向给尝试较少的域名机会
+YIELD_DECAY = 0.5  # 近期产出的指数衰减系数，越大越看重最近一次
+
+
+def parse_deadline(value, now=None):
+    """把 --deadline 解析为时间戳：纯数字表示从现在起的分钟数，HH:MM 表示今天（或明天）的时刻"""
+    now = now or datetime.now()
+    if ':' in value:
+        hour, minute = (int(part) for part in value.split(':', 1))
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return target.timestamp()
+    return (now + timedelta(minutes=float(value))).timestamp()
+
+
+class BudgetScheduler:
+    """
+    全局页数/时间预算调度：每个域名先分到 initial_pages 页，之后按近期每页新增URL数
+    （UCB 多臂老虎机）把剩余页数一块一块分给最高产的域名，预算或截止时间用完即停止。
+    cost_per_page 为每个页码实际加载的页数（多个搜索引擎时同一页码在每个引擎上各加载一次）。
+    """
+
+    def __init__(self, total_pages=None, deadline=None, initial_pages=INITIAL_PAGES, chunk_pages=CHUNK_PAGES,
+                 cost_per_page=1):
+        self.total_pages = total_pages
+        self.deadline = deadline
+        self.initial_pages = initial_pages
+        self.chunk_pages = chunk_pages
+        self.cost_per_page = max(cost_per_page, 1)
+        self.spent = 0
+        self.arms = OrderedDict()  # key -> 状态
+
+    def add(self, key, payload=None):
+        """加入一个域名，payload 为调用方需要的任务信息（如 CrawlTask）"""
+        if key in self.arms:
+            return
+        self.arms[key] = {
+            'payload': payload, 'next_page': 1, 'pages': 0, 'new_urls': 0, 'chunks': 0,
+            'recent_yield': 0.0, 'exhausted': False, 'running': False,
+        }
+
+    def pages_left(self):
+        if self.total_pages is None:
+            return None
+        return max(0, self.total_pages - self.spent)
+
+    def expired(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def can_grant(self):
+        """预算和截止时间是否还允许再分配一块配额"""
+        left = self.pages_left()
+        return not self.expired() and (left is None or left >= self.cost_per_page)
+
+    def waiting(self):
+        """尚未分到初始配额的域名数"""
+        return sum(1 for arm in self.arms.values() if arm['chunks'] == 0 and not arm['running'])
+
+    def _score(self, arm, total_chunks):
+        if arm['chunks'] == 0:
+            return float('inf')
+        bonus = EXPLORATION * math.sqrt(math.log(max(total_chunks, 1) + 1) / arm['chunks'])
+        return arm['recent_yield'] + bonus
+
+    def next_grant(self):
+        """返回 (key, payload, 起始页, 页数)；暂时没有可分配的域名或预算耗尽时返回 None"""
+        if not self.can_grant():
+            return None
+        left = self.pages_left()
+        candidates = [(key, arm) for key, arm in self.arms.items() if not arm['exhausted'] and not arm['running']]
+        if not candidates:
+            return None
+
+        # 先保证每个域名拿到初始配额，再按 UCB 分配
+        fresh = [(key, arm) for key, arm in candidates if arm['chunks'] == 0]
+        if fresh:
+            key, arm = fresh[0]
+            pages = self.initial_pages
+        else:
+            total_chunks = sum(a['chunks'] for a in self.arms.values())
+            key, arm = max(candidates, key=lambda item: self._score(item[1], total_chunks))
+            pages = self.chunk_pages
+        if left is not None:
+            pages = min(pages, left // self.cost_per_page)
+        # 预先扣除配额，避免多个标签页同时超发
+        self.spent += pages * self.cost_per_page
+        arm['running'] = True
+        arm['granted'] = pages
+        return key, arm['payload'], arm['next_page'], pages
+
+    def report_chunk(self, key, pages, new_urls, loaded=None):
+        """
+        回报一块配额的执行结果，返回该域名是否已翻到尽头。
+        pages 为翻过的页码数，loaded 为实际加载的页数（多个搜索引擎时为各引擎之和，默认等于 pages）。
+        """
+        arm = self.arms[key]
+        granted = arm.pop('granted', pages)
+        loaded = pages if loaded is None else loaded
+        # 实际少用的页数退回预算
+        self.spent -= max(0, granted * self.cost_per_page - loaded)
+        arm['running'] = False
+        arm['chunks'] += 1
+        arm['pages'] += loaded
+        arm['new_urls'] += new_urls
+        arm['next_page'] += pages
+        per_page = new_urls / max(loaded, 1)
+        if arm['chunks'] == 1:
+            arm['recent_yield'] = per_page
+        else:
+            arm['recent_yield'] = YIELD_DECAY * per_page + (1 - YIELD_DECAY) * arm['recent_yield']
+        if pages < granted:
+            arm['exhausted'] = True
+        return arm['exhausted']
+
+    def report(self):
+        """返回 [(key, 页数, 新增URL, 分配次数, 近期每页产出, 状态), ...]"""
+        rows = []
+        for key, arm in self.arms.items():
+            if arm['exhausted']:
+                state = '已翻完'
+            elif arm['chunks'] == 0:
+                state = '未分配'
+            else:
+                state = '预算截止'
+            rows.append((key, arm['pages'], arm['new_urls'], arm['chunks'], arm['recent_yield'], state))
+        return rows
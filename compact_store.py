@@ -0,0 +1,114 @@
+from array import array
+
+# ====================== 紧凑存储配置 ======================
+CHUNK_SIZE = 4096  # 每个共享字符串块容纳的记录数
+
+
+def _split_origin(url):
+    """把URL拆成 "协议://主机" 前缀和其余部分，前缀用于驻留去重"""
+    scheme_end = url.find('://')
+    if scheme_end < 0:
+        return '', url
+    path_start = url.find('/', scheme_end + 3)
+    if path_start < 0:
+        return url, ''
+    return url[:path_start], url[path_start:]
+
+
+class UrlList:
+    """
+    紧凑的 [(url, title), ...] 容器，供结果很多的域名使用。
+    "协议://主机" 前缀驻留在主机表中，每条记录只存主机编号；路径和标题按块拼接成共享字符串，
+    用 array 记录偏移。迭代、下标、len()、append()/extend() 的行为与元组列表一致。
+    """
+
+    __slots__ = ('_hosts', '_host_index', '_host_ids', '_chunks', '_ends', '_pending')
+
+    def __init__(self, items=()):
+        self._hosts = []  # 主机编号 -> 前缀
+        self._host_index = {}  # 前缀 -> 主机编号
+        self._host_ids = array('I')  # 每条记录的主机编号
+        self._chunks = []  # 已封存的共享字符串块
+        self._ends = array('I')  # 每条记录在块内的 路径结束、标题结束 偏移
+        self._pending = []  # 尚未封存的记录 [(路径, 标题), ...]
+        self.extend(items)
+
+    def append(self, item):
+        url, title = item
+        origin, rest = _split_origin(url)
+        host_id = self._host_index.get(origin)
+        if host_id is None:
+            host_id = len(self._hosts)
+            self._host_index[origin] = host_id
+            self._hosts.append(origin)
+        self._host_ids.append(host_id)
+        self._pending.append((rest, title or ''))
+        if len(self._pending) >= CHUNK_SIZE:
+            self._seal()
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def _seal(self):
+        """把待封存记录拼接成一个字符串块"""
+        parts = []
+        offset = 0
+        for rest, title in self._pending:
+            offset += len(rest)
+            self._ends.append(offset)
+            offset += len(title)
+            self._ends.append(offset)
+            parts.append(rest)
+            parts.append(title)
+        self._chunks.append(''.join(parts))
+        self._pending = []
+
+    def __len__(self):
+        return len(self._host_ids)
+
+    def __bool__(self):
+        return len(self._host_ids) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('UrlList index out of range')
+        origin = self._hosts[self._host_ids[index]]
+        chunk_no, pos = divmod(index, CHUNK_SIZE)
+        if chunk_no == len(self._chunks):
+            rest, title = self._pending[pos]
+            return origin + rest, title
+        chunk = self._chunks[chunk_no]
+        base = chunk_no * CHUNK_SIZE * 2
+        start = self._ends[base + pos * 2 - 1] if pos else 0
+        rest_end = self._ends[base + pos * 2]
+        title_end = self._ends[base + pos * 2 + 1]
+        return origin + chunk[start:rest_end], chunk[rest_end:title_end]
+
+    def __iter__(self):
+        hosts = self._hosts
+        host_ids = self._host_ids
+        ends = self._ends
+        index = 0
+        for chunk in self._chunks:
+            start = 0
+            for _ in range(CHUNK_SIZE):
+                rest_end = ends[index * 2]
+                title_end = ends[index * 2 + 1]
+                yield hosts[host_ids[index]] + chunk[start:rest_end], chunk[rest_end:title_end]
+                start = title_end
+                index += 1
+        for rest, title in list(self._pending):
+            yield hosts[host_ids[index]] + rest, title
+            index += 1
+
+    def __repr__(self):
+        return f"UrlList({len(self)} 条, {len(self._hosts)} 个主机)"
+
+    def hosts(self):
+        """返回出现过的 "协议://主机" 前缀"""
+        return list(self._hosts)
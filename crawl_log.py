@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import atexit
+import time
+import queue
+import logging
+import logging.handlers
+from datetime import datetime
+
+from colorama import Fore
+
+# ====================== 日志配置 ======================
+LOGGER_NAME = 'edgeurl'
+LOG_DIR = os.path.join('results', 'logs')  # 默认的结构化日志目录
+LOG_BUFFER = 200  # 文件日志缓冲的事件条数，缓冲满或出现 ERROR 时写盘
+PROGRESS_INTERVAL = 5  # 进度视图的刷新间隔（秒）
+PROGRESS_DOMAINS = 4  # 进度视图中列出的进行中域名数
+LEVEL_COLORS = {
+    logging.DEBUG: Fore.WHITE,
+    logging.INFO: Fore.GREEN,
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED,
+}
+
+logger = logging.getLogger(LOGGER_NAME)
+_listener = None
+
+
+def log_event(event, level=logging.INFO, message=None, **fields):
+    """记录一条结构化事件：控制台显示 message，JSON 日志记录 event 和全部字段"""
+    logger.log(level, message or event, extra={'event': event, 'fields': fields})
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON：时间、级别、事件名、线程、事件字段和消息"""
+
+    def format(self, record):
+        data = {
+            'ts': round(record.created, 3),
+            'time': self.formatTime(record, '%Y-%m-%d %H:%M:%S'),
+            'level': record.levelname,
+            'event': getattr(record, 'event', 'message'),
+            'thread': record.threadName,
+        }
+        data.update(getattr(record, 'fields', {}))
+        data['msg'] = record.getMessage()
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """按级别着色，与原有 colorama 输出风格一致"""
+
+    def format(self, record):
+        return LEVEL_COLORS.get(record.levelno, '') + record.getMessage()
+
+
+class ProgressView(logging.Handler):
+    """
+    紧凑的控制台进度视图：从事件中统计各域名的页数、URL 数，每隔 interval 秒输出一行
+    （总页数、URL、速度、预计剩余时间和进行中的域名），代替逐条打印 URL。
+    """
+
+    def __init__(self, total_domains=0, total_pages=None, interval=PROGRESS_INTERVAL, stream=None):
+        super().__init__(logging.DEBUG)
+        self.total_domains = total_domains
+        self.total_pages = total_pages
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self.domains = {}  # 域名 -> {'pages', 'urls', 'active'}
+        self.finished = set()
+        self.started_at = None
+        self._last_render = 0.0
+
+    def emit(self, record):
+        event = getattr(record, 'event', None)
+        fields = getattr(record, 'fields', {})
+        domain = fields.get('domain')
+        if domain is None or event not in ('crawl_start', 'page_fetched', 'urls_added', 'crawl_done'):
+            return
+        if self.started_at is None:
+            self.started_at = record.created
+        entry = self.domains.setdefault(domain, {'pages': 0, 'urls': 0, 'active': True})
+        if event == 'crawl_start':
+            entry['active'] = True
+            self.finished.discard(domain)
+        elif event == 'page_fetched':
+            entry['pages'] += 1
+        elif event == 'urls_added':
+            entry['urls'] += fields.get('normal', 0) + fields.get('doc', 0)
+        elif event == 'crawl_done':
+            entry['active'] = False
+            self.finished.add(domain)
+        if record.created - self._last_render >= self.interval:
+            self.render()
+
+    def line(self):
+        now = time.time()
+        pages = sum(entry['pages'] for entry in self.domains.values())
+        urls = sum(entry['urls'] for entry in self.domains.values())
+        elapsed = now - self.started_at if self.started_at else 0.0
+        rate = pages / elapsed * 60 if elapsed > 0 else 0.0
+        parts = [f"域名 {len(self.finished)}/{max(self.total_domains, len(self.domains))} 完成",
+                 f"{pages} 页 · {urls} URL", f"{rate:.1f} 页/分钟"]
+
+        eta = None
+        if self.total_pages and rate > 0:
+            eta = max(0, self.total_pages - pages) / rate * 60
+        elif self.finished and self.total_domains:
+            eta = elapsed / len(self.finished) * max(0, self.total_domains - len(self.finished))
+        if eta is not None:
+            parts.append(f"预计剩余 {eta / 60:.0f} 分" if eta >= 60 else f"预计剩余 {eta:.0f} 秒")
+
+        active = [(d, e) for d, e in self.domains.items() if e['active']][:PROGRESS_DOMAINS]
+        if active:
+            parts.append(', '.join(f"{d} {e['pages']}页/{e['urls']}" for d, e in active))
+        return "[进度] " + " | ".join(parts)
+
+    def render(self):
+        self._last_render = time.time()
+        self.stream.write(Fore.CYAN + self.line() + '\n')
+        self.stream.flush()
+
+
+def default_log_file():
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(LOG_DIR, f'edgeurl_{timestamp}.jsonl')
+
+
+def setup_logging(level='INFO', log_file=None, progress=None):
+    """
+    配置日志：控制台按 level 输出；log_file 非空时另由后台线程把全部事件（含 DEBUG）
+    以 JSON 行写入文件，写盘前先在内存中缓冲；progress 为 ProgressView 时接收事件刷新进度。
+    """
+    global _listener
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers.clear()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(getattr(logging, level.upper()))
+    console.setFormatter(ConsoleFormatter())
+    logger.addHandler(console)
+    if progress is not None:
+        logger.addHandler(progress)
+
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+        file_handler.setFormatter(JsonFormatter())
+        buffered = logging.handlers.MemoryHandler(LOG_BUFFER, flushLevel=logging.ERROR, target=file_handler)
+        # 爬取线程只把记录放入队列，格式化和写盘都在监听线程中完成
+        records = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(records))
+        _listener = logging.handlers.QueueListener(records, buffered)
+        _listener.start()
+        atexit.register(shutdown_logging)
+    return logger
+
+
+def shutdown_logging():
+    """停止后台写入线程并把缓冲中的事件全部写盘"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            target = handler.target
+            handler.close()
+            target.close()
+        _listener = None
@@ -0,0 +1,63 @@
+import heapq
+import itertools
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit
+
+from domain_planner import is_under, registrable_domain
+
+# ====================== 子域名发现配置 ======================
+DISCOVERY_DEPTH = 2  # 发现的最大层数（种子域名为第 0 层）
+DISCOVERY_BUDGET = 50  # 本次运行最多追加的 site: 查询次数
+
+
+class DiscoveryQueue:
+    """
+    子域名发现队列：爬取结果中出现的、属于种子注册域名的新主机名按出现次数排队，
+    出现越多越先爬取，受层数和总次数预算限制。
+    """
+
+    def __init__(self, seeds, max_depth=DISCOVERY_DEPTH, budget=DISCOVERY_BUDGET):
+        self.parents = {registrable_domain(host) for host in seeds}
+        self.known = set(seeds)  # 已计划或已爬取的主机名
+        self.max_depth = max_depth
+        self.budget = budget
+        self.counts = Counter()
+        self.found = OrderedDict()  # 主机名 -> {'origin', 'depth', 'crawled'}
+        self._heap = []
+        self._seq = itertools.count()
+
+    def observe(self, url_list, origin, origin_depth):
+        """统计一次爬取结果中的新主机名，origin 为产生这些结果的查询域名"""
+        depth = origin_depth + 1
+        for url, _title in url_list:
+            try:
+                host = (urlsplit(url).hostname or '').lower()
+            except ValueError:
+                continue
+            if not host or host in self.known:
+                continue
+            if not any(is_under(host, parent) for parent in self.parents):
+                continue
+            self.counts[host] += 1
+            if host not in self.found:
+                self.found[host] = {'origin': origin, 'depth': depth, 'crawled': False}
+            if self.found[host]['depth'] <= self.max_depth:
+                # 懒惰更新：旧条目出队时按计数比对后丢弃
+                heapq.heappush(self._heap, (-self.counts[host], next(self._seq), host))
+
+    def pop(self):
+        """取出下一个待爬取的主机名，返回 (host, depth)，队列为空或预算耗尽时返回 None"""
+        while self._heap and self.budget > 0:
+            neg_count, _, host = heapq.heappop(self._heap)
+            if host in self.known or -neg_count != self.counts[host]:
+                continue
+            self.known.add(host)
+            self.budget -= 1
+            self.found[host]['crawled'] = True
+            return host, self.found[host]['depth']
+        return None
+
+    def report(self):
+        """返回 [(host, 来源查询, 层数, 出现次数, 是否已爬取), ...]"""
+        return [(host, info['origin'], info['depth'], self.counts[host], info['crawled'])
+                for host, info in self.found.items()]
@@ -0,0 +1,116 @@
+from collections import namedtuple, OrderedDict
+from urllib.parse import urlsplit
+
+# ====================== 规划配置 ======================
+# 父域名一次查询预计能翻到的结果上限，超过后改为逐个子域名爬取
+PARENT_RESULT_LIMIT = 500
+# 同一注册域名下至少有几个条目才考虑合并为父域名查询
+MIN_GROUP_SIZE = 2
+# 常见的多级公共后缀（未引入 tldextract，按需补充）
+MULTI_LEVEL_SUFFIXES = {
+    'com.cn', 'net.cn', 'org.cn', 'gov.cn', 'edu.cn', 'ac.cn', 'mil.cn',
+    'com.hk', 'com.tw', 'org.tw', 'edu.tw', 'gov.tw', 'idv.tw',
+    'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'co.jp', 'ne.jp', 'or.jp', 'ac.jp',
+    'co.kr', 'or.kr', 'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+    'com.sg', 'com.my', 'co.in', 'co.nz', 'com.br', 'com.mx', 'co.za',
+}
+
+# query: 实际执行 site: 查询的域名；targets: 结果需要拆分保存的目标域名
+CrawlTask = namedtuple('CrawlTask', ['query', 'targets', 'reason'])
+
+
+def normalize_entry(entry):
+    """规范化 domain.txt 中的一行：去掉协议、路径、端口、site: 前缀和通配符"""
+    entry = entry.strip().lower()
+    if not entry or entry.startswith('#'):
+        return ''
+    if entry.startswith('site:'):
+        entry = entry[5:]
+    if '://' not in entry:
+        entry = 'http://' + entry
+    try:
+        host = urlsplit(entry).hostname or ''
+    except ValueError:
+        return ''
+    host = host.strip('.')
+    if host.startswith('*.'):
+        host = host[2:]
+    return host
+
+
+def registrable_domain(host):
+    """返回主机名对应的注册域名（如 ky.msxf.com -> msxf.com）"""
+    parts = host.split('.')
+    if len(parts) <= 2 or host.replace('.', '').isdigit():
+        return host
+    if '.'.join(parts[-2:]) in MULTI_LEVEL_SUFFIXES:
+        return '.'.join(parts[-3:])
+    return '.'.join(parts[-2:])
+
+
+def is_under(host, domain):
+    """判断主机名是否等于域名或属于其子域名"""
+    return host == domain or host.endswith('.' + domain)
+
+
+def dedup_entries(lines):
+    """规范化并去重（保持原有顺序）"""
+    seen = OrderedDict()
+    for line in lines:
+        host = normalize_entry(line)
+        if host:
+            seen.setdefault(host, None)
+    return list(seen)
+
+
+def plan_domains(lines, observed_counts=None, limit=PARENT_RESULT_LIMIT):
+    """
+    生成爬取计划：按注册域名分组，历史结果表明规模较小（不足 limit）的组合并为一次父域名查询，
+    没有历史数据或达到 limit 的组逐个子域名查询。observed_counts 为 {主机名: 历史URL数量}，缺失视为未知。
+    未知规模时不合并：合并查询同样受最大页数限制，大组一旦被合并，之后的历史结果也会偏小而无法再拆分。
+    """
+    observed_counts = observed_counts or {}
+    groups = OrderedDict()
+    for host in dedup_entries(lines):
+        groups.setdefault(registrable_domain(host), []).append(host)
+
+    tasks = []
+    for parent, hosts in groups.items():
+        if len(hosts) < MIN_GROUP_SIZE:
+            tasks.append(CrawlTask(hosts[0], hosts, '单独条目'))
+            continue
+        known = [count for host, count in observed_counts.items() if is_under(host, parent)]
+        observed = sum(known)
+        if not known:
+            for host in hosts:
+                tasks.append(CrawlTask(host, [host], '无历史数据，逐个查询'))
+        elif observed >= limit:
+            for host in hosts:
+                tasks.append(CrawlTask(host, [host], f'历史结果 {observed} 条达到上限 {limit}'))
+        else:
+            tasks.append(CrawlTask(parent, hosts, f'合并 {len(hosts)} 个条目（历史结果 {observed} 条）'))
+    return tasks
+
+
+def split_by_target(url_list, task, container=list):
+    """
+    把父域名查询的结果 [(url, title), ...] 按目标域名拆分，未命中任何目标的归入查询域名。
+    container 为各分组使用的容器类型（如 compact_store.UrlList）。
+    """
+    # 更具体（更长）的目标优先匹配
+    targets = sorted(task.targets, key=len, reverse=True)
+    buckets = OrderedDict((target, container()) for target in task.targets)
+    for url, title in url_list:
+        try:
+            host = (urlsplit(url).hostname or '').lower()
+        except ValueError:
+            host = ''
+        for target in targets:
+            if is_under(host, target):
+                buckets[target].append((url, title))
+                break
+        else:
+            if task.query not in buckets:
+                buckets[task.query] = container()
+            buckets[task.query].append((url, title))
+    return buckets
@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import socketserver
+from datetime import datetime
+
+from colorama import Fore
+
+from crawl_log import log_event
+
+# ====================== 通知配置 ======================
+NOTIFY_CONFIG = 'notify.json'  # 默认配置文件，不存在时只读取环境变量
+NOTIFY_QUEUE_SIZE = 100  # 待发送通知的队列上限，满时丢弃新通知而不是阻塞爬取
+NOTIFY_CLOSE_TIMEOUT = 30  # 运行结束时等待通知发送完毕的最长时间（秒）
+SMTP_TIMEOUT = 20  # SMTP 连接/发送超时（秒）
+WEBHOOK_TIMEOUT = 10  # Webhook 请求超时（秒）
+SENDER_NAME = 'EdgeURL 爬虫助手'
+# 环境变量 -> 配置项（优先于配置文件）
+ENV_SETTINGS = {
+    'EDGEURL_SMTP_HOST': ('smtp', 'host'),
+    'EDGEURL_SMTP_PORT': ('smtp', 'port'),
+    'EDGEURL_SMTP_SSL': ('smtp', 'ssl'),
+    'EDGEURL_SMTP_STARTTLS': ('smtp', 'starttls'),
+    'EDGEURL_SMTP_USER': ('smtp', 'user'),
+    'EDGEURL_SMTP_PASSWORD': ('smtp', 'password'),
+    'EDGEURL_SMTP_SENDER': ('smtp', 'sender'),
+    'EDGEURL_MAIL_TO': ('smtp', 'to'),
+    'EDGEURL_WEBHOOKS': (None, 'webhooks'),
+    'EDGEURL_NOTIFY_FILE': (None, 'file'),
+    'EDGEURL_NOTIFY_PROGRESS': (None, 'progress'),
+}
+
+_STOP = object()
+
+
+def _parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def load_notify_config(path=None, environ=None):
+    """
+    读取通知配置：先读 JSON 配置文件（未指定时使用 notify.json，不存在则跳过），再用环境变量覆盖。
+    返回 {'smtp': {...}, 'webhooks': [...], 'file': 路径, 'progress': 是否发送每个域名的进度}
+    """
+    environ = os.environ if environ is None else environ
+    config = {}
+    path = path or (NOTIFY_CONFIG if os.path.exists(NOTIFY_CONFIG) else None)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    smtp = dict(config.get('smtp') or {})
+    for env, (section, key) in ENV_SETTINGS.items():
+        if env not in environ:
+            continue
+        if section == 'smtp':
+            smtp[key] = environ[env]
+        else:
+            config[key] = environ[env]
+
+    if isinstance(smtp.get('to'), str):
+        smtp['to'] = [addr.strip() for addr in smtp['to'].split(',') if addr.strip()]
+    for key in ('ssl', 'starttls'):
+        if key in smtp and isinstance(smtp[key], str):
+            smtp[key] = _parse_bool(smtp[key])
+    if 'port' in smtp:
+        smtp['port'] = int(smtp['port'])
+    webhooks = config.get('webhooks') or []
+    if isinstance(webhooks, str):
+        webhooks = [url.strip() for url in webhooks.split(',') if url.strip()]
+    progress = config.get('progress', False)
+    return {
+        'smtp': smtp,
+        'webhooks': webhooks,
+        'file': config.get('file'),
+        'progress': _parse_bool(progress) if isinstance(progress, str) else bool(progress),
+    }
+
+
+class SmtpSink:
+    """SMTP 邮件：连接在多封邮件之间复用，断开后自动重连一次"""
+
+    name = 'smtp'
+
+    def __init__(self, host, to, user=None, password=None, sender=None, port=None, ssl=True, starttls=False):
+        self.host = host
+        self.port = port or (465 if ssl else 25)
+        self.ssl = ssl
+        self.starttls = starttls
+        self.user = user
+        self.password = password
+        self.to = list(to)
+        self.sender = sender or user or self.to[0]
+        self._server = None
+
+    def _connect(self):
+        import smtplib
+
+        if self.ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            if self.starttls:
+                server.starttls()
+        if self.user:
+            server.login(self.user, self.password or '')
+        return server
+
+    def send(self, message):
+        import smtplib
+        from email.header import Header
+        from email.mime.text import MIMEText
+        from email.utils import formataddr
+
+        mail = MIMEText(message['content'], 'plain', 'utf-8')
+        mail['From'] = formataddr((str(Header(SENDER_NAME, 'utf-8')), self.sender))
+        mail['To'] = ', '.join(self.to)
+        mail['Subject'] = Header(message['subject'], 'utf-8')
+        for attempt in range(2):
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.sendmail(self.sender, self.to, mail.as_string())
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # 复用的连接被服务器关闭：重连后再试一次
+                self._server = None
+                if attempt:
+                    raise
+
+    def close(self):
+        import smtplib
+
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            # 部分服务器（如 QQ 邮箱）在 QUIT 时返回异常响应，邮件此前已发送成功
+            pass
+        self._server = None
+
+
+class WebhookSink:
+    """Webhook：POST JSON {event, subject, text, time, ...字段}，兼容只读取 text 字段的机器人接口"""
+
+    name = 'webhook'
+
+    def __init__(self, url):
+        self.url = url
+
+    def send(self, message):
+        from urllib.request import Request, urlopen
+
+        body = {'event': message['event'], 'subject': message['subject'], 'text': message['content'],
+                'time': message['time'], **message['fields']}
+        request = Request(self.url, data=json.dumps(body, ensure_ascii=False, default=str).encode('utf-8'),
+                          headers={'Content-Type': 'application/json; charset=utf-8'}, method='POST')
+        with urlopen(request, timeout=WEBHOOK_TIMEOUT) as response:
+            response.read()
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """文件：每条通知追加一行 JSON"""
+
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def send(self, message):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(message, ensure_ascii=False, default=str) + '\n')
+
+    def close(self):
+        pass
+
+
+class Notifier:
+    """
+    后台通知线程：notify() 只把消息放入有界队列后立即返回，由后台线程依次发往各个渠道，
+    单个渠道失败不影响其他渠道，也不影响爬取。
+    """
+
+    def __init__(self, sinks, progress=False, maxsize=NOTIFY_QUEUE_SIZE):
+        self.sinks = list(sinks)
+        self.progress = progress
+        self.queue = queue.Queue(maxsize)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._thread = None
+        if self.sinks:
+            self._thread = threading.Thread(target=self._run, name='notifier', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            message = self.queue.get()
+            if message is _STOP:
+                break
+            for sink in self.sinks:
+                try:
+                    sink.send(message)
+                    self.sent += 1
+                except Exception as e:
+                    self.failed += 1
+                    log_event('error', logging.ERROR, f"[-] {sink.name} 通知发送失败: {e}",
+                              stage='notify', sink=sink.name, subject=message['subject'])
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+    def notify(self, subject, content, event='message', **fields):
+        """放入发送队列，不等待发送；队列已满或未配置任何渠道时直接丢弃"""
+        if not self.sinks:
+            return False
+        message = {'event': event, 'subject': subject, 'content': content,
+                   'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'fields': fields}
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def domain_done(self, domain, stat, elapsed):
+        """单个域名完成时的进度通知（配置 progress 为 true 时发送）"""
+        if not self.progress:
+            return False
+        content = (f"{domain} 爬取完成：{stat.get('pages', 0)} 页，普通 URL {stat.get('normal_urls', 0)} 个，"
+                   f"文档 URL {stat.get('doc_urls', 0)} 个，耗时 {elapsed:.0f} 秒")
+        return self.notify(f"EdgeURL 进度：{domain} 完成", content, event='domain_done', domain=domain,
+                           pages=stat.get('pages', 0), normal_urls=stat.get('normal_urls', 0),
+                           doc_urls=stat.get('doc_urls', 0))
+
+    def close(self, timeout=NOTIFY_CLOSE_TIMEOUT):
+        """等待队列中的通知发送完毕（最多 timeout 秒），返回是否全部发送成功"""
+        if self._thread is None:
+            return False
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return False
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(Fore.YELLOW + f"[!] 通知在 {timeout} 秒内未发送完毕，已放弃等待")
+            return False
+        return self.failed == 0 and self.dropped == 0
+
+    def describe(self):
+        return ', '.join(sink.name for sink in self.sinks) or '无'
+
+
+def build_notifier(config):
+    """按配置创建各通知渠道，SMTP 需要 host 和收件人"""
+    sinks = []
+    smtp = config.get('smtp') or {}
+    if smtp.get('host') and smtp.get('to'):
+        sinks.append(SmtpSink(smtp['host'], smtp['to'], smtp.get('user'), smtp.get('password'), smtp.get('sender'),
+                              smtp.get('port'), smtp.get('ssl', True), smtp.get('starttls', False)))
+    sinks.extend(WebhookSink(url) for url in config.get('webhooks') or [])
+    if config.get('file'):
+        sinks.append(FileSink(config['file']))
+    return Notifier(sinks, config.get('progress', False))
+
+
+class StandInSmtp:
+    """本地替身 SMTP 服务器（明文，接受任意账号），收到的邮件保存在 messages 中，用于测试通知"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.messages = []  # [(发件人, [收件人], 原始邮件), ...]
+        self.connections = 0
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stand-in-smtp', daemon=True)
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def _handler(self):
+        smtp = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write((line + '\r\n').encode('utf-8'))
+
+            def handle(self):
+                smtp.connections += 1
+                self.reply('220 stand-in ESMTP')
+                sender, recipients = None, []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.reply('250-stand-in')
+                        self.reply('250 AUTH PLAIN LOGIN')
+                    elif verb == 'AUTH':
+                        self.reply('235 2.7.0 Authentication successful')
+                    elif verb == 'MAIL':
+                        sender, recipients = command.split(':', 1)[1].strip(' <>'), []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[1].strip(' <>'))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        lines = []
+                        while True:
+                            data = self.rfile.readline()
+                            if not data or data in (b'.\r\n', b'.\n'):
+                                break
+                            lines.append(data[1:] if data.startswith(b'..') else data)
+                        smtp.messages.append((sender, recipients, b''.join(lines).decode('utf-8', 'replace')))
+                        self.reply('250 OK queued')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('250 OK')
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class StandInWebhook:
+    """本地替身 Webhook 接收端，收到的 JSON 保存在 payloads 中"""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        from http.server import ThreadingHTTPServer
+
+        self.payloads = []
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stand-in-webhook', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/hook"
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                webhook.payloads.append(json.loads(body.decode('utf-8')))
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def self_test():
+    """启动本地替身 SMTP/Webhook，连发两条通知，检查连接复用和各渠道是否收到"""
+    smtp = StandInSmtp().start()
+    webhook = StandInWebhook().start()
+    host, port = smtp.address
+    notifier = build_notifier({
+        'smtp': {'host': host, 'port': port, 'ssl': False, 'user': 'test@example.com', 'password': 'x',
+                 'to': ['ops@example.com']},
+        'webhooks': [webhook.url],
+        'progress': True,
+    })
+    started = time.perf_counter()
+    notifier.domain_done('example.com', {'pages': 3, 'normal_urls': 25, 'doc_urls': 2}, 12.5)
+    notifier.notify('📧 EdgeURL 爬取完成！', '测试报告', event='report')
+    enqueue_time = time.perf_counter() - started
+    ok = notifier.close()
+    smtp.stop()
+    webhook.stop()
+    print(f"入队耗时: {enqueue_time * 1000:.2f} ms | 发送成功: {notifier.sent} | 失败: {notifier.failed}")
+    print(f"SMTP: {len(smtp.messages)} 封邮件，{smtp.connections} 个连接 | Webhook: {len(webhook.payloads)} 条")
+    passed = ok and len(smtp.messages) == 2 and smtp.connections == 1 and len(webhook.payloads) == 2
+    print((Fore.GREEN + "[√] 自检通过") if passed else (Fore.RED + "[-] 自检失败"))
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EdgeURL 通知渠道测试')
+    parser.add_argument('--config', type=str, default=None, help=f'通知配置文件，默认为 {NOTIFY_CONFIG}')
+    parser.add_argument('--self-test', action='store_true', help='使用本地替身 SMTP/Webhook 自检，不发送真实通知')
+    args = parser.parse_args()
+
+    if args.self_test:
+        raise SystemExit(0 if self_test() else 1)
+    notifier = build_notifier(load_notify_config(args.config))
+    print(f"[+] 通知渠道: {notifier.describe()}")
+    notifier.notify('EdgeURL 通知测试', '这是一条测试通知。', event='test')
+    print("[√] 测试通知已发送" if notifier.close() else "[-] 测试通知发送失败")
+
+
+if __name__ == "__main__":
+    main()
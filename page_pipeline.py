@@ -0,0 +1,93 @@
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+
+from crawl_log import log_event
+
+# ====================== 流水线配置 ======================
+PIPELINE_QUEUE_SIZE = 4  # 待处理页面快照的队列上限，满时翻页线程等待（背压）
+
+# 主线程采集的原始页面快照：页码、SERP 地址、未过滤的 [(url, title), ...]
+PageSnapshot = namedtuple('PageSnapshot', ['page_num', 'serp_url', 'results'])
+
+_STOP = object()
+
+
+class StageTimer:
+    """按阶段累计耗时（秒）"""
+
+    def __init__(self):
+        self.totals = OrderedDict()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+
+    def total(self):
+        return sum(self.totals.values())
+
+
+class PagePipeline:
+    """
+    页面处理流水线：主线程只负责滚动、采集快照和翻页，快照放入有界队列，
+    由后台线程完成过滤、分类、打印和入库，使处理与下一页的加载重叠进行。
+    """
+
+    def __init__(self, process, maxsize=PIPELINE_QUEUE_SIZE, name='pipeline', domain=None):
+        self.process = process  # process(snapshot, timer)
+        self.domain = domain  # 日志事件中标记所属域名
+        self.queue = queue.Queue(maxsize)
+        self.main_timer = StageTimer()  # 主线程各阶段
+        self.worker_timer = StageTimer()  # 后台线程各阶段
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            snapshot = self.queue.get()
+            if snapshot is _STOP:
+                return
+            try:
+                self.process(snapshot, self.worker_timer)
+            except Exception as e:
+                self.errors += 1
+                log_event('error', logging.ERROR, f"[-] 第 {snapshot.page_num} 页结果处理失败: {e}",
+                          domain=self.domain, page=snapshot.page_num, stage='process')
+
+    def submit(self, snapshot):
+        """提交快照，队列已满时阻塞，阻塞时间计入背压"""
+        with self.main_timer.stage('背压等待'):
+            self.queue.put(snapshot)
+
+    def close(self):
+        """等待队列处理完毕并结束后台线程"""
+        with self.main_timer.stage('收尾等待'):
+            self.queue.put(_STOP)
+            self._thread.join()
+
+    def overlap_saved(self):
+        """估算重叠节省的时间：后台处理总耗时减去主线程为其等待的时间"""
+        waited = self.main_timer.totals.get('背压等待', 0.0) + self.main_timer.totals.get('收尾等待', 0.0)
+        return max(0.0, self.worker_timer.total() - waited)
+
+    def log_timings(self):
+        """以 DEBUG 级别的 pipeline_timings 事件记录主线程和处理线程各阶段耗时"""
+        main = " | ".join(f"{name} {sec:.2f}s" for name, sec in self.main_timer.totals.items())
+        worker = " | ".join(f"{name} {sec:.2f}s" for name, sec in self.worker_timer.totals.items())
+        saved = self.overlap_saved()
+        log_event('pipeline_timings', logging.DEBUG,
+                  f"[+] {self.domain} 阶段耗时 | 主线程: {main} | 处理线程: {worker} | 流水线重叠节省约 {saved:.2f} 秒",
+                  domain=self.domain, errors=self.errors, overlap_saved=round(saved, 3),
+                  main={name: round(sec, 3) for name, sec in self.main_timer.totals.items()},
+                  worker={name: round(sec, 3) for name, sec in self.worker_timer.totals.items()})
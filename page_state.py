@@ -0,0 +1,159 @@
+import time
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+
+from colorama import Fore
+
+# ====================== 页面检测配置 ======================
+PAGE_NORMAL = 'normal'  # 正常结果页
+PAGE_EMPTY = 'empty'  # 无结果页
+PAGE_CHALLENGE = 'challenge'  # 验证码/人机验证页
+PAGE_ERROR = 'error'  # 浏览器错误页或空白页
+PAGE_LOADING = 'loading'  # 还没有任何标记：结果区尚未渲染，需要继续等待
+PAGE_LABELS = {PAGE_NORMAL: '正常', PAGE_EMPTY: '无结果', PAGE_CHALLENGE: '验证页面', PAGE_ERROR: '错误页面',
+               PAGE_LOADING: '未渲染'}
+
+CHALLENGE_POLL = 2  # 出现验证页面时的检测间隔（秒），期间其他标签页暂停，浏览器停留在验证页面
+CHALLENGE_TIMEOUT = 600  # 单次验证最长等待时间（秒），超时后放弃当前域名
+RENDER_POLL = 0.5  # 结果区尚未渲染时的检测间隔（秒），期间该标签页让出给其他标签页
+# 验证页面的 DOM 标记（Bing 自有验证码、Cloudflare Turnstile、通用 captcha 容器）
+CHALLENGE_SELECTORS = (
+    '#b_captcha', '#turingcaptcha', 'iframe[src*="challenges.cloudflare.com"]',
+    'iframe[src*="captcha"]', 'form[action*="captcha"]', '.captcha',
+)
+CHALLENGE_URL_MARKERS = ('/turing/captcha', '/challenge', 'captcha')  # 只匹配路径，不匹配查询词
+# 结果项和无结果页的 DOM 标记（Bing，其他搜索引擎由 search_backends 中的后端传入）
+RESULT_SELECTOR = '#b_results > li.b_algo'
+EMPTY_SELECTORS = ('#b_results > li.b_no', '#b_results .b_no')
+# 浏览器网络错误页的 DOM 标记（Edge/Chromium）
+ERROR_SELECTORS = ('#main-frame-error', 'body.neterror')
+
+# 一次 execute_script 取回全部标记，避免多次 WebDriver 往返
+CLASSIFY_SCRIPT = """
+const any = (selectors) => selectors.some((s) => document.querySelector(s) !== null);
+return {
+    results: document.querySelectorAll(arguments[3]).length,
+    challenge: any(arguments[0]),
+    empty: any(arguments[1]),
+    error: any(arguments[2]) || !document.body || document.body.children.length === 0,
+};
+"""
+
+
+def classify_page(driver, result_selector=RESULT_SELECTOR, challenge_selectors=CHALLENGE_SELECTORS,
+                  empty_selectors=EMPTY_SELECTORS, url_markers=CHALLENGE_URL_MARKERS):
+    """根据 DOM 标记判断当前页面类型，返回 PAGE_* 之一"""
+    try:
+        url = driver.current_url or ''
+        markers = driver.execute_script(CLASSIFY_SCRIPT, list(challenge_selectors), list(empty_selectors),
+                                        list(ERROR_SELECTORS), result_selector)
+    except Exception:
+        return PAGE_ERROR
+    if not isinstance(markers, dict):
+        return PAGE_ERROR
+    return page_kind(markers, url, url_markers)
+
+
+def page_kind(markers, url, url_markers=CHALLENGE_URL_MARKERS):
+    """由页面标记 {results, challenge, empty, error} 和页面地址判断页面类型（浏览器内检测与离线解析共用）"""
+    path = urlsplit(url).path.lower()
+    if markers.get('results'):
+        # 有结果时即使页面带有 captcha 相关元素也按正常页处理
+        return PAGE_NORMAL
+    if markers.get('challenge') or any(marker in path for marker in url_markers):
+        return PAGE_CHALLENGE
+    if markers.get('error'):
+        return PAGE_ERROR
+    if markers.get('empty'):
+        return PAGE_EMPTY
+    # 没有结果也没有明确标记：多为结果区尚未渲染，由调用方继续等待
+    return PAGE_LOADING
+
+
+class HoldTab(float):
+    """
+    需要停留在当前标签页的等待秒数：标签页调度器在此期间不切换到其他标签页，
+    用于等待用户在浏览器中手动完成验证，避免其他标签页被切到前台打断验证。
+    """
+
+
+def wait_for_render(driver, classify=classify_page, timeout=10, poll=RENDER_POLL):
+    """
+    生成器：页面还没有任何标记（结果区尚未渲染）时每隔 poll 秒 yield 一次，直到出现确定的页面类型
+    或超时。超时仍没有标记时按无结果处理。通过 StopIteration.value 返回页面类型。
+    """
+    started = time.time()
+    kind = classify(driver)
+    while kind == PAGE_LOADING and time.time() - started < timeout:
+        yield poll
+        kind = classify(driver)
+    return PAGE_EMPTY if kind == PAGE_LOADING else kind
+
+
+class ChallengeMonitor:
+    """
+    统计各域名遇到的页面类型，出现验证页面时暂停爬取并停留在该标签页等待手动验证（其他标签页同时暂停），
+    验证通过后立即继续。notify(domain, url) 为可选的通知回调，在后台线程中调用，不阻塞爬取。
+    """
+
+    def __init__(self, notify=None, poll=CHALLENGE_POLL, timeout=CHALLENGE_TIMEOUT):
+        self.notify = notify
+        self.poll = poll
+        self.timeout = timeout
+        self.counts = {}  # 域名 -> Counter(页面类型)
+        self.waited = Counter()  # 域名 -> 等待验证的总秒数
+        self._lock = threading.Lock()
+
+    def record(self, domain, kind):
+        with self._lock:
+            self.counts.setdefault(domain, Counter())[kind] += 1
+
+    def challenges(self, domain):
+        return self.counts.get(domain, Counter())[PAGE_CHALLENGE]
+
+    def wait_for_clearance(self, driver, domain, settle=0, classify=classify_page, render_timeout=10):
+        """
+        生成器：检测当前页面，验证页面期间每隔 poll 秒 yield 一次 HoldTab，直到页面不再是验证页面或超时，
+        验证通过后再等待 settle 秒让页面跳转完成。通过 StopIteration.value 返回最终的页面类型。
+        classify(driver) 为页面检测函数，默认按 Bing 的 DOM 标记检测（见 search_backends）；
+        结果区尚未渲染时最多等待 render_timeout 秒，不把加载较慢的页面误判为无结果。
+        """
+        kind = yield from wait_for_render(driver, classify, render_timeout)
+        self.record(domain, kind)
+        if kind != PAGE_CHALLENGE:
+            return kind
+
+        print(Fore.RED + f"[!] {domain} 出现验证页面，请在浏览器中手动完成验证（最长等待 {self.timeout} 秒）")
+        print('\a', end='', flush=True)
+        if self.notify is not None:
+            threading.Thread(target=self._notify, args=(domain, driver.current_url),
+                             name='challenge-notify', daemon=True).start()
+        started = time.time()
+        while kind == PAGE_CHALLENGE and time.time() - started < self.timeout:
+            yield HoldTab(self.poll)
+            kind = classify(driver)
+        self.waited[domain] += time.time() - started
+        if kind == PAGE_CHALLENGE:
+            print(Fore.RED + f"[-] {domain} 验证等待超时，放弃当前域名")
+        else:
+            print(Fore.GREEN + f"[+] {domain} 验证已通过（等待 {time.time() - started:.0f} 秒），继续爬取")
+            if settle:
+                yield settle
+            kind = yield from wait_for_render(driver, classify, render_timeout)
+        return kind
+
+    def _notify(self, domain, url):
+        try:
+            self.notify(domain, url)
+        except Exception as e:
+            print(Fore.RED + f"[-] 验证页面通知发送失败: {e}")
+
+    def report(self):
+        """返回 [(域名, 验证次数, 等待秒数, 无结果页, 错误页), ...]，只列出有异常页面的域名"""
+        rows = []
+        for domain, counter in self.counts.items():
+            if counter[PAGE_CHALLENGE] or counter[PAGE_EMPTY] or counter[PAGE_ERROR]:
+                rows.append((domain, counter[PAGE_CHALLENGE], self.waited[domain],
+                             counter[PAGE_EMPTY], counter[PAGE_ERROR]))
+        return rows
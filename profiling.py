@@ -0,0 +1,126 @@
+import os
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from colorama import Fore
+
+# ====================== 性能分析配置 ======================
+TRACEMALLOC_FRAMES = 10  # tracemalloc 记录的调用栈深度
+TOP_ALLOCATIONS = 30  # 内存分配报告的条数
+TOP_FUNCTIONS = 30  # 控制台/报告中列出的耗时函数条数
+
+
+def start_tracemalloc():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+
+def _snapshot():
+    """内存快照，排除分析工具自身的分配"""
+    import cProfile
+
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+
+
+def install_command_counter(driver, counts):
+    """
+    替换 driver.execute，按命令类型统计 WebDriver 请求次数和耗时。
+    counts 为 Counter，键为命令名，另以 "命令名:耗时" 累计秒数。只在 --profile 时安装。
+    """
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            counts[driver_command] += 1
+            counts[f"{driver_command}:耗时"] += time.perf_counter() - start
+
+    driver.execute = execute
+    return driver
+
+
+class DomainProfiler:
+    """
+    单个域名的性能分析：cProfile 统计 Python 侧耗时，tracemalloc 前后快照对比统计新增内存分配，
+    并记录期间的 WebDriver 命令次数。报告写入 results/<domain>/。
+    """
+
+    def __init__(self, base_domain, command_counts=None):
+        import cProfile
+
+        self.base_domain = base_domain
+        self.profile = cProfile.Profile()
+        self.command_counts = command_counts
+        self.commands_at_start = Counter(command_counts) if command_counts is not None else Counter()
+        self.snapshot_at_start = _snapshot() if tracemalloc.is_tracing() else None
+        self.started_at = time.time()
+
+    @contextmanager
+    def active(self):
+        self.profile.enable()
+        try:
+            yield
+        finally:
+            self.profile.disable()
+
+    def wrap(self, crawl):
+        """包装 iter_crawl_domain() 生成器：只在生成器实际执行时开启 cProfile，等待期间不计入"""
+        while True:
+            with self.active():
+                try:
+                    delay = next(crawl)
+                except StopIteration as stop:
+                    return stop.value
+            yield delay
+
+    def command_delta(self):
+        if self.command_counts is None:
+            return Counter()
+        delta = Counter(self.command_counts)
+        delta.subtract(self.commands_at_start)
+        return Counter({k: v for k, v in delta.items() if v})
+
+    def save(self):
+        """写出 .pstats、内存分配报告和 WebDriver 命令统计，返回 (pstats 路径, 报告路径)"""
+        import pstats
+
+        result_dir = os.path.join('results', self.base_domain)
+        os.makedirs(result_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stats_file = os.path.join(result_dir, f'profile_{timestamp}.pstats')
+        report_file = os.path.join(result_dir, f'profile_{timestamp}.txt')
+        self.profile.dump_stats(stats_file)
+
+        lines = [f"域名: {self.base_domain}",
+                 f"耗时: {time.time() - self.started_at:.2f} 秒", ""]
+
+        commands = self.command_delta()
+        names = sorted((k for k in commands if not k.endswith(':耗时')), key=lambda k: -commands[k])
+        lines.append(f"WebDriver 命令（共 {sum(commands[k] for k in names)} 次）：")
+        for name in names:
+            lines.append(f"  {name:<32}{commands[name]:>8} 次{commands[name + ':耗时']:>10.2f} 秒")
+        lines.append("")
+
+        if self.snapshot_at_start is not None:
+            top = _snapshot().compare_to(self.snapshot_at_start, 'lineno')[:TOP_ALLOCATIONS]
+            lines.append(f"新增内存分配 Top {TOP_ALLOCATIONS}：")
+            lines.extend(f"  {stat}" for stat in top)
+            lines.append("")
+
+        with open(report_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+            f.write(f"\ncProfile 累计耗时 Top {TOP_FUNCTIONS}：\n")
+            stats = pstats.Stats(self.profile, stream=f)
+            stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+
+        print(Fore.CYAN + f"[+] 性能分析已保存: {stats_file} | {report_file}")
+        return stats_file, report_file
@@ -0,0 +1,255 @@
+import time
+import random
+import select
+import socket
+import argparse
+import threading
+
+from colorama import Fore
+
+# ====================== 代理池配置 ======================
+INITIAL_SCORE = 1.0  # 新代理的初始健康分（0~1）
+SCORE_DECAY = 0.3  # 每个新样本在健康分中的权重（指数滑动平均）
+SLOW_LATENCY = 10  # 页面加载达到该耗时（秒）时延迟扣分达到上限
+LATENCY_PENALTY = 0.5  # 延迟扣分上限：成功但很慢的页面最低得 1 - LATENCY_PENALTY 分
+ROTATE_SCORE = 0.5  # 健康分低于该值时切换代理
+MIN_SAMPLES = 3  # 切换到某个代理后，至少积累这么多样本才判断是否需要再切换
+PROXY_COOLDOWN = 600  # 被换下的代理冷却时间（秒），冷却期间不再选用
+RECOVERY_SCORE = 0.6  # 冷却结束后健康分至少恢复到该值，给代理重新证明的机会
+
+
+def normalize_proxy(line):
+    """去掉注释和空白，host:port 补全为 http://host:port"""
+    line = line.split('#', 1)[0].strip()
+    if not line:
+        return None
+    return line if '://' in line else f'http://{line}'
+
+
+def load_proxies(path):
+    """读取代理列表文件：每行一个代理（host:port 或 scheme://host:port），# 开头为注释，重复的只保留一个"""
+    proxies = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            proxy = normalize_proxy(line)
+            if proxy and proxy not in proxies:
+                proxies.append(proxy)
+    return proxies
+
+
+class ProxyPool:
+    """
+    代理池：按页面成功率、加载延迟和验证页面比例为每个代理维护健康分（指数滑动平均），
+    当前代理健康分过低时由调用方在任务间隙重启浏览器切换到健康分最高的可用代理。
+    """
+
+    def __init__(self, proxies, rotate_score=ROTATE_SCORE, cooldown=PROXY_COOLDOWN):
+        if not proxies:
+            raise ValueError("代理列表为空")
+        self.rotate_score = rotate_score
+        self.cooldown = cooldown
+        self.stats = {proxy: {
+            'score': INITIAL_SCORE, 'pages': 0, 'failures': 0, 'challenges': 0, 'latency': 0.0,
+            'rotations': 0, 'uses': 0, 'cooldown_until': 0.0, 'samples_since_acquire': 0,
+        } for proxy in proxies}
+        self.current = None
+        self._lock = threading.Lock()
+
+    def _available(self, now):
+        candidates = [p for p, s in self.stats.items() if s['cooldown_until'] <= now and p != self.current]
+        if not candidates:
+            # 全部在冷却中：选最早结束冷却的
+            candidates = [min(self.stats, key=lambda p: self.stats[p]['cooldown_until'])]
+        return candidates
+
+    def acquire(self):
+        """选出健康分最高（同分时使用次数最少）的可用代理作为当前代理"""
+        with self._lock:
+            now = time.time()
+            for stat in self.stats.values():
+                if stat['cooldown_until'] and stat['cooldown_until'] <= now:
+                    stat['score'] = max(stat['score'], RECOVERY_SCORE)
+                    stat['cooldown_until'] = 0.0
+            if self.current is not None and len(self.stats) == 1:
+                candidates = [self.current]
+            else:
+                candidates = self._available(now)
+            proxy = max(candidates, key=lambda p: (self.stats[p]['score'], -self.stats[p]['uses'], random.random()))
+            self.stats[proxy]['uses'] += 1
+            self.stats[proxy]['samples_since_acquire'] = 0
+            self.current = proxy
+            return proxy
+
+    def record(self, proxy, ok, latency, challenge=False):
+        """记录一次页面加载：ok 为是否成功加载，latency 为加载耗时（秒），challenge 为是否遇到验证页面"""
+        if proxy not in self.stats:
+            return
+        with self._lock:
+            stat = self.stats[proxy]
+            if challenge:
+                stat['challenges'] += 1
+            if ok:
+                stat['pages'] += 1
+                stat['latency'] += latency
+                sample = 1.0 - LATENCY_PENALTY * min(latency / SLOW_LATENCY, 1.0)
+                if challenge:
+                    # 验证通过后成功加载仍算半个失败
+                    sample /= 2
+            else:
+                stat['failures'] += 1
+                sample = 0.0
+            stat['score'] = SCORE_DECAY * sample + (1 - SCORE_DECAY) * stat['score']
+            stat['samples_since_acquire'] += 1
+
+    def should_rotate(self):
+        """当前代理健康分低于阈值且样本足够，并且有其他代理可换时返回 True"""
+        if self.current is None or len(self.stats) < 2:
+            return False
+        stat = self.stats[self.current]
+        return stat['samples_since_acquire'] >= MIN_SAMPLES and stat['score'] < self.rotate_score
+
+    def rotate(self):
+        """换下当前代理（进入冷却）并选出新代理，返回新代理"""
+        with self._lock:
+            old = self.current
+            if old is not None:
+                self.stats[old]['rotations'] += 1
+                self.stats[old]['cooldown_until'] = time.time() + self.cooldown
+        proxy = self.acquire()
+        if old is not None:
+            print(Fore.YELLOW + f"[!] 代理 {old} 健康分 {self.stats[old]['score']:.2f} 过低，切换到 {proxy}")
+        return proxy
+
+    def report(self):
+        """返回 [(代理, 健康分, 成功页数, 失败次数, 验证次数, 平均加载秒数, 被换下次数), ...]"""
+        rows = []
+        for proxy, stat in self.stats.items():
+            avg = stat['latency'] / stat['pages'] if stat['pages'] else 0.0
+            rows.append((proxy, stat['score'], stat['pages'], stat['failures'], stat['challenges'],
+                         avg, stat['rotations']))
+        return sorted(rows, key=lambda row: -row[1])
+
+
+class StandInProxy:
+    """
+    本地替身代理（HTTP 正向代理，支持 CONNECT 隧道），可注入延迟和失败率，
+    用于在不依赖真实代理的情况下测试代理池的健康评分和切换。
+    """
+
+    def __init__(self, latency=0.0, fail_rate=0.0, host='127.0.0.1', port=0):
+        from http.server import ThreadingHTTPServer
+
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.requests = 0
+        self.failures = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stand-in-proxy', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+        from urllib.request import Request, urlopen
+
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _inject(self):
+                """按配置延迟，按失败率返回 502，返回 True 表示已按失败处理"""
+                proxy.requests += 1
+                if proxy.latency:
+                    time.sleep(proxy.latency)
+                if random.random() < proxy.fail_rate:
+                    proxy.failures += 1
+                    self.send_error(502, 'stand-in proxy injected failure')
+                    return True
+                return False
+
+            def do_CONNECT(self):
+                if self._inject():
+                    return
+                host, _, port = self.path.partition(':')
+                try:
+                    upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+                except OSError as e:
+                    self.send_error(502, str(e))
+                    return
+                self.send_response(200, 'Connection Established')
+                self.end_headers()
+                sockets = [self.connection, upstream]
+                try:
+                    while True:
+                        readable, _, errored = select.select(sockets, [], sockets, 30)
+                        if errored or not readable:
+                            break
+                        for sock in readable:
+                            data = sock.recv(65536)
+                            if not data:
+                                return
+                            (upstream if sock is self.connection else self.connection).sendall(data)
+                finally:
+                    upstream.close()
+
+            def do_GET(self):
+                if self._inject():
+                    return
+                headers = {k: v for k, v in self.headers.items() if k.lower() not in ('proxy-connection', 'connection')}
+                try:
+                    with urlopen(Request(self.path, headers=headers), timeout=30) as resp:
+                        body = resp.read()
+                        self.send_response(resp.status)
+                        for key, value in resp.getheaders():
+                            if key.lower() not in ('transfer-encoding', 'connection', 'content-length'):
+                                self.send_header(key, value)
+                except Exception as e:
+                    status = getattr(e, 'code', 502)
+                    body = str(e).encode('utf-8')
+                    self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        print(Fore.CYAN + f"[+] 替身代理已启动: {self.url} | 延迟 {self.latency} 秒 | 失败率 {self.fail_rate:.0%}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        print(Fore.CYAN + f"[+] 替身代理 {self.url} 共处理 {self.requests} 个请求，注入失败 {self.failures} 次")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EdgeURL 本地替身代理')
+    parser.add_argument('-n', '--count', type=int, default=1, help='启动的替身代理数量')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求注入的延迟（秒）')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='按该比例返回 502')
+    parser.add_argument('-o', '--output', type=str, default=None, help='把代理地址写入该文件，供 --proxy-file 使用')
+    args = parser.parse_args()
+
+    proxies = [StandInProxy(args.latency, args.fail_rate).start() for _ in range(args.count)]
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(proxy.url for proxy in proxies) + '\n')
+        print(Fore.GREEN + f"[+] 代理列表已写入: {args.output}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for proxy in proxies:
+            proxy.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import os
+import time
+import sqlite3
+import threading
+import argparse
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# ====================== 结果数据库配置 ======================
+DEFAULT_DB_PATH = os.path.join('results', 'edgeurl.db')  # 默认数据库位置
+BUSY_TIMEOUT = 30  # 数据库加锁时的等待时间（秒）
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  REAL NOT NULL,
+    finished_at REAL,
+    args        TEXT
+);
+CREATE TABLE IF NOT EXISTS domains (
+    id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id     INTEGER NOT NULL REFERENCES runs(id),
+    domain_id  INTEGER NOT NULL REFERENCES domains(id),
+    page_num   INTEGER NOT NULL,
+    serp_url   TEXT,
+    url_count  INTEGER NOT NULL DEFAULT 0,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    page_id   INTEGER NOT NULL REFERENCES pages(id),
+    run_id    INTEGER NOT NULL REFERENCES runs(id),
+    domain_id INTEGER NOT NULL REFERENCES domains(id),
+    url       TEXT NOT NULL,
+    title     TEXT,
+    host      TEXT,
+    ext       TEXT,
+    kind      TEXT NOT NULL,
+    seen_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_host ON urls(host);
+CREATE INDEX IF NOT EXISTS idx_urls_ext ON urls(ext);
+CREATE INDEX IF NOT EXISTS idx_urls_seen ON urls(seen_at);
+CREATE INDEX IF NOT EXISTS idx_urls_domain_run ON urls(domain_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_pages_run ON pages(run_id, domain_id);
+"""
+
+
+def url_host(url):
+    """返回URL的主机名（小写，不含端口）"""
+    try:
+        return (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+def url_ext(url):
+    """返回URL路径的扩展名（小写，含点号），无扩展名时返回空字符串"""
+    try:
+        path = urlsplit(url).path
+    except ValueError:
+        return ''
+    name = path.rsplit('/', 1)[-1]
+    if '.' not in name:
+        return ''
+    return '.' + name.rsplit('.', 1)[-1].lower()
+
+
+class ResultStore:
+    """基于 SQLite（WAL 模式）的爬取结果库，每页结果一次性批量写入"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        db_dir = os.path.dirname(path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._domain_ids = {}
+        # 多个标签页的处理线程共用一个连接，写入时串行化
+        self._lock = threading.Lock()
+
+    def start_run(self, args_text=''):
+        """登记一次新的爬取任务，返回 run_id"""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (started_at, args) VALUES (?, ?)", (time.time(), args_text)
+            )
+        return cur.lastrowid
+
+    def finish_run(self, run_id):
+        """标记爬取任务结束时间"""
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def domain_id(self, name):
+        """返回域名对应的ID（不存在时自动创建）。不单独提交，须在调用方的事务内调用"""
+        if name in self._domain_ids:
+            return self._domain_ids[name]
+        self.conn.execute("INSERT OR IGNORE INTO domains (name) VALUES (?)", (name,))
+        return self.conn.execute("SELECT id FROM domains WHERE name = ?", (name,)).fetchone()[0]
+
+    def add_page(self, run_id, domain, page_num, serp_url, entries):
+        """在一个事务内写入一页结果，entries 格式：[(url, title, kind), ...]"""
+        now = time.time()
+        entries = list(entries)
+        with self._lock, self.conn:
+            domain_id = self.domain_id(domain)
+            cur = self.conn.execute(
+                "INSERT INTO pages (run_id, domain_id, page_num, serp_url, url_count, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, domain_id, page_num, serp_url, len(entries), now)
+            )
+            page_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO urls (page_id, run_id, domain_id, url, title, host, ext, kind, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(page_id, run_id, domain_id, url, title, url_host(url), url_ext(url), kind, now)
+                 for url, title, kind in entries]
+            )
+        # 事务提交后才缓存，回滚时新建的域名ID不会残留在缓存中
+        self._domain_ids[domain] = domain_id
+        return page_id
+
+    def latest_run_id(self, domain=None):
+        """返回最近一次（可限定域名）的 run_id，不存在时返回 None"""
+        if domain is None:
+            row = self.conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT MAX(p.run_id) FROM pages p JOIN domains d ON d.id = p.domain_id WHERE d.name = ?",
+                (domain,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def query_urls(self, domain=None, kind=None, ext=None, host=None, days=None, run_id=None):
+        """按条件查询去重后的URL，返回 [(url, title, domain, kind, 最后出现时间), ...]"""
+        clauses = []
+        params = []
+        if domain:
+            clauses.append("d.name = ?")
+            params.append(domain)
+        if kind:
+            clauses.append("u.kind = ?")
+            params.append(kind)
+        if ext:
+            clauses.append("u.ext = ?")
+            params.append(ext.lower() if ext.startswith('.') else '.' + ext.lower())
+        if host:
+            clauses.append("u.host = ?")
+            params.append(host.lower())
+        if days is not None:
+            clauses.append("u.seen_at >= ?")
+            params.append(time.time() - days * 86400)
+        if run_id is not None:
+            clauses.append("u.run_id = ?")
+            params.append(run_id)
+        where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+        sql = (
+            "SELECT u.url, MAX(u.title), d.name, u.kind, MAX(u.seen_at) "
+            "FROM urls u JOIN domains d ON d.id = u.domain_id "
+            f"{where} GROUP BY u.url, d.name, u.kind ORDER BY d.name, u.url"
+        )
+        return self.conn.execute(sql, params).fetchall()
+
+    def host_counts(self, parent):
+        """统计 parent 及其子域名在历史结果中的去重URL数量，返回 {主机名: 数量}"""
+        rows = self.conn.execute(
+            "SELECT host, COUNT(DISTINCT url) FROM urls WHERE host = ? OR host LIKE ? GROUP BY host",
+            (parent, '%.' + parent)
+        ).fetchall()
+        return dict(rows)
+
+    def fetch_urls(self, domain, kind, run_id=None):
+        """返回可直接交给 save_to_excel() 的 [(url, title), ...] 列表"""
+        rows = self.query_urls(domain=domain, kind=kind, run_id=run_id)
+        return [(url, title) for url, title, _, _, _ in rows]
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def cmd_query(store, args):
+    """query 子命令：按条件打印URL"""
+    rows = store.query_urls(domain=args.domain, kind=args.kind, ext=args.ext,
+                            host=args.host, days=args.days)
+    for url, title, domain, kind, seen_at in rows:
+        seen = datetime.fromtimestamp(seen_at).strftime("%Y-%m-%d %H:%M")
+        print(f"{seen}\t{domain}\t{kind}\t{url}\t{title or ''}")
+    print(f"[+] 共 {len(rows)} 条")
+
+
+def cmd_export(store, args):
+    """export 子命令：把数据库中的结果导出为与爬取时相同结构的Excel"""
+    from EdgeURL import save_to_excel
+
+    if args.domain:
+        domains = [args.domain]
+    else:
+        domains = [row[0] for row in store.conn.execute("SELECT name FROM domains ORDER BY name")]
+    for domain in domains:
+        run_id = None if args.all_runs else store.latest_run_id(domain)
+        normal_urls = store.fetch_urls(domain, 'normal', run_id)
+        doc_urls = store.fetch_urls(domain, 'doc', run_id)
+        if normal_urls:
+            save_to_excel(normal_urls, domain, is_document=False)
+        if doc_urls:
+            save_to_excel(doc_urls, domain, is_document=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EdgeURL 结果数据库查询/导出')
+    parser.add_argument('--db', type=str, default=DEFAULT_DB_PATH, help=f'数据库路径，默认为 {DEFAULT_DB_PATH}')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    q = sub.add_parser('query', help='查询URL，如：query --ext .sql --days 30')
+    q.add_argument('--domain', type=str, default=None, help='限定爬取时的目标域名')
+    q.add_argument('--host', type=str, default=None, help='限定URL主机名')
+    q.add_argument('--ext', type=str, default=None, help='限定扩展名，如 .sql')
+    q.add_argument('--kind', type=str, choices=('normal', 'doc'), default=None, help='限定URL类型')
+    q.add_argument('--days', type=float, default=None, help='只看最近 N 天出现过的URL')
+    q.set_defaults(func=cmd_query)
+
+    e = sub.add_parser('export', help='导出为Excel（默认每个域名取最近一次爬取）')
+    e.add_argument('--domain', type=str, default=None, help='只导出指定域名')
+    e.add_argument('--all-runs', action='store_true', help='合并导出该域名历次爬取的结果')
+    e.set_defaults(func=cmd_export)
+
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"[-] 未找到数据库: {args.db}")
+        return
+    store = ResultStore(args.db)
+    try:
+        args.func(store, args)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+import argparse
+from collections import namedtuple
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, quote_plus, urljoin, urlsplit
+
+from colorama import Fore
+
+from crawl_log import log_event
+from page_state import (
+    CHALLENGE_SELECTORS,
+    CHALLENGE_URL_MARKERS,
+    EMPTY_SELECTORS,
+    ERROR_SELECTORS,
+    PAGE_EMPTY,
+    PAGE_LABELS,
+    PAGE_LOADING,
+    RESULT_SELECTOR,
+    classify_page,
+    page_kind
+)
+
+# ====================== 搜索引擎配置 ======================
+DEFAULT_ENGINES = 'bing'  # --engines 的默认值，逗号分隔
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'serp')  # 各后端的离线 HTML 样例
+# 一次 execute_script 取回本页全部结果的链接和标题，避免逐个元素的 WebDriver 往返
+EXTRACT_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0]), (item) => {
+    const link = item.querySelector(arguments[1]);
+    return link && link.href ? [link.href, link.innerText || link.textContent || ''] : null;
+}).filter((row) => row !== null);
+"""
+# 结果区文字，用于判断翻页后内容是否变化
+CONTENT_SCRIPT = "return Array.from(document.querySelectorAll(arguments[0]), (e) => e.innerText).join(' ');"
+
+# kind: PAGE_* 页面类型；results: [(url, title), ...]；has_next: 是否有下一页
+SerpPage = namedtuple('SerpPage', ['kind', 'results', 'has_next'])
+
+
+# ====================== 离线 HTML 解析 ======================
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+SKIP_TEXT_TAGS = {'script', 'style', 'template'}
+COMPOUND_RE = re.compile(r'(?:[a-zA-Z][a-zA-Z0-9]*|\*|#[\w-]+|\.[\w-]+|\[[^\]]*\])+')
+SIMPLE_RE = re.compile(r'([a-zA-Z][a-zA-Z0-9]*|\*)|#([\w-]+)|\.([\w-]+)|\[\s*([\w-]+)\s*(?:([*^$]?=)\s*["\']?([^"\'\]]*)["\']?\s*)?\]')
+
+
+class Node:
+    __slots__ = ('tag', 'attrs', 'parent', 'children')
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.children = []  # Node 或文本
+
+    def iter(self):
+        """深度优先遍历全部后代元素（不含自身）"""
+        stack = [child for child in reversed(self.children) if isinstance(child, Node)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if isinstance(child, Node))
+
+    def text(self):
+        """元素内的可见文字，空白折叠为单个空格"""
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            elif node.tag not in SKIP_TEXT_TAGS:
+                stack.extend(reversed(node.children))
+        return ' '.join(''.join(parts).split())
+
+
+class _TreeBuilder(HTMLParser):
+    """容错的 DOM 树构建：未闭合的元素在父元素结束时一并闭合"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document')
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or '' for name, value in attrs}, self.stack[-1])
+        self.stack[-1].children.append(node)
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].children.append(Node(tag, {name: value or '' for name, value in attrs}, self.stack[-1]))
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+def parse_html(html):
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def _parse_selector(selector):
+    """
+    把 CSS 选择器解析为 [(组合符, [简单选择器, ...]), ...]，组合符为 ' '（后代）或 '>'（子元素）。
+    只支持后端用到的子集：标签、#id、.class、[attr]、[attr=v]、[attr*=v]、[attr^=v]、[attr$=v]。
+    """
+    steps = []
+    combinator = ' '
+    pos = 0
+    while pos < len(selector):
+        if selector[pos].isspace():
+            pos += 1
+            continue
+        if selector[pos] == '>':
+            combinator = '>'
+            pos += 1
+            continue
+        match = COMPOUND_RE.match(selector, pos)
+        if not match:
+            raise ValueError(f"不支持的选择器: {selector}")
+        steps.append((combinator, [m.groups() for m in SIMPLE_RE.finditer(match.group())]))
+        combinator = ' '
+        pos = match.end()
+    return steps
+
+
+def _matches(node, simples):
+    for tag, node_id, cls, attr, op, value in simples:
+        if tag and tag != '*' and node.tag != tag.lower():
+            return False
+        if node_id and node.attrs.get('id') != node_id:
+            return False
+        if cls and cls not in node.attrs.get('class', '').split():
+            return False
+        if attr:
+            actual = node.attrs.get(attr.lower())
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and value not in actual:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+    return True
+
+
+def _matches_steps(node, steps):
+    """从右向左匹配：node 匹配最后一步，其祖先依次匹配前面各步"""
+    combinator, simples = steps[-1]
+    if not _matches(node, simples):
+        return False
+    if len(steps) == 1:
+        return True
+    parent = node.parent
+    while parent is not None:
+        if _matches_steps(parent, steps[:-1]):
+            return True
+        if combinator == '>':
+            return False
+        parent = parent.parent
+    return False
+
+
+def select(scope, selector):
+    """返回 scope 的后代中匹配选择器的元素（文档顺序），与浏览器中 scope.querySelectorAll 一致"""
+    steps = _parse_selector(selector)
+    return [node for node in scope.iter() if _matches_steps(node, steps)]
+
+
+# ====================== 搜索引擎后端 ======================
+class SearchBackend:
+    """
+    搜索引擎后端：构造查询地址、提取结果、查找下一页、检测验证页面。
+    选择器同时用于浏览器内查询（querySelector）和离线 HTML 解析（fixtures 自检），
+    新增搜索引擎时声明选择器，结果链接为跳转地址时覆盖 result_url()。
+    """
+
+    name = ''
+    label = ''
+    search_url = ''
+    page_param = ''  # 翻页参数名
+    results_per_page = 10
+    result_selector = ''  # 每个结果项
+    link_selector = 'a'  # 结果项内的标题链接
+    next_selectors = ()  # 下一页按钮（CSS）
+    next_texts = ()  # 文字包含这些内容的链接也视为下一页
+    challenge_selectors = CHALLENGE_SELECTORS
+    challenge_url_markers = CHALLENGE_URL_MARKERS
+    empty_selectors = ()
+    home_url = ''  # 预热配置档时先打开的首页（处理 Cookie 同意横幅），为空时直接执行首次查询
+    consent_selectors = ()  # Cookie 同意横幅中的"接受"按钮
+    replayable = False  # 是否支持 --record/--replay（回放服务器只实现了 Bing 的 GET 翻页）
+
+    def __init__(self, search_url=None):
+        if search_url:
+            self.search_url = search_url
+
+    def build_url(self, query, page=1):
+        """第 page 页的查询地址"""
+        url = f"{self.search_url}?q={quote_plus(query, safe=':')}"
+        if page > 1:
+            url += f"&{self.page_param}={self.page_offset(page)}"
+        return url
+
+    def page_offset(self, page):
+        return (page - 1) * self.results_per_page + 1
+
+    def result_url(self, href):
+        """把结果链接转换为目标地址（搜索引擎的跳转链接在这里解包），无法识别时返回 None"""
+        return href or None
+
+    # ---------- 浏览器内 ----------
+    def classify(self, driver):
+        """检测当前页面类型，返回 PAGE_* 之一"""
+        return classify_page(driver, self.result_selector, self.challenge_selectors,
+                             self.empty_selectors, self.challenge_url_markers)
+
+    def wait_for_results(self, driver, timeout):
+        """等待结果项出现，最多 timeout 秒，超时返回 False"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        try:
+            WebDriverWait(driver, timeout).until(lambda d: d.find_elements(By.CSS_SELECTOR, self.result_selector))
+            return True
+        except TimeoutException:
+            log_event('extract_timeout', logging.WARNING, f"[!] {timeout} 秒内未等到搜索结果",
+                      stage='extract', engine=self.name, timeout=timeout)
+            return False
+
+    def extract_results(self, driver, timeout=0):
+        """提取当前页的 [(url, title), ...]（不过滤，过滤由处理阶段完成），timeout 秒内先等待结果项出现"""
+        if timeout:
+            self.wait_for_results(driver, timeout)
+        try:
+            rows = driver.execute_script(EXTRACT_SCRIPT, self.result_selector, self.link_selector) or []
+        except Exception as e:
+            log_event('error', logging.ERROR, f"[-] 提取搜索结果失败: {e}", stage='extract', engine=self.name)
+            return []
+        results = []
+        for href, title in rows:
+            url = self.result_url(href)
+            if url:
+                results.append((url, ' '.join(title.split())))
+        return results
+
+    def content_hash(self, driver):
+        """结果区内容的哈希值（用于判断翻页后内容是否变化）"""
+        try:
+            text = driver.execute_script(CONTENT_SCRIPT, self.result_selector) or ''
+        except Exception as e:
+            log_event('error', logging.ERROR, f"[-] 获取页面内容哈希失败: {e}", stage='content_hash', engine=self.name)
+            text = driver.page_source
+        return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+    def find_next_page(self, driver):
+        """查找可点击的下一页元素，没有时返回 None"""
+        from selenium.webdriver.common.by import By
+
+        locators = [(By.CSS_SELECTOR, selector) for selector in self.next_selectors]
+        locators += [(By.XPATH, f'//a[contains(text(), "{text}")]') for text in self.next_texts]
+        for by, selector in locators:
+            try:
+                btns = driver.find_elements(by, selector)
+                if btns:
+                    return btns[0]
+            except Exception as e:
+                log_event('error', logging.ERROR, f"[-] 查找下一页按钮失败（{selector}）: {e}",
+                          stage='find_next_page', engine=self.name)
+        return None
+
+    # ---------- 离线解析 ----------
+    def parse(self, html, url=''):
+        """解析已保存的 SERP 页面，返回 SerpPage（与浏览器内的检测/提取/翻页使用同一套选择器）"""
+        doc = parse_html(html)
+        items = select(doc, self.result_selector)
+        results = []
+        for item in items:
+            links = [link for link in select(item, self.link_selector) if link.attrs.get('href')]
+            if not links:
+                continue
+            target = self.result_url(urljoin(url, links[0].attrs['href']))
+            if target:
+                results.append((target, links[0].text()))
+
+        def present(selectors):
+            return any(select(doc, selector) for selector in selectors)
+
+        has_next = present(self.next_selectors) or any(
+            text in link.text() for link in select(doc, 'a') for text in self.next_texts)
+        markers = {
+            'results': len(items),
+            'challenge': present(self.challenge_selectors),
+            'empty': present(self.empty_selectors),
+            'error': present(ERROR_SELECTORS),
+        }
+        kind = page_kind(markers, url, self.challenge_url_markers)
+        # 已保存的页面不会再渲染，没有任何标记时按无结果处理
+        return SerpPage(PAGE_EMPTY if kind == PAGE_LOADING else kind, results, has_next)
+
+
+class BingBackend(SearchBackend):
+    name = 'bing'
+    label = 'Bing'
+    search_url = 'https://www.bing.com/search'
+    page_param = 'first'
+    result_selector = RESULT_SELECTOR
+    link_selector = 'h2 a'
+    next_selectors = ('a[title="Next page"]', 'a[aria-label="Next page"]', 'a.sb_pagN')
+    next_texts = ('下一页', 'Next')
+    empty_selectors = EMPTY_SELECTORS
+    home_url = 'https://www.bing.com/'
+    consent_selectors = ('#bnp_btn_accept', '#bnp_container button[id*="accept"]')
+    replayable = True
+
+    def result_url(self, href):
+        """部分地区的结果链接为 bing.com/ck/a?...&u=a1<base64url> 跳转地址，解出其中的目标地址"""
+        if not href:
+            return None
+        parts = urlsplit(href)
+        if parts.path != '/ck/a' or not (parts.hostname or '').endswith('bing.com'):
+            return href
+        encoded = parse_qs(parts.query).get('u', [''])[0]
+        if encoded.startswith('a1'):
+            encoded = encoded[2:]
+            try:
+                return base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+            except ValueError:
+                pass
+        return href
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """
+    DuckDuckGo 无脚本版（html.duckduckgo.com）：结果链接为 duckduckgo.com/l/?uddg= 跳转地址，
+    下一页为表单提交按钮。每页约 30 条，按页码起始时的 s 参数为近似值。
+    """
+
+    name = 'duckduckgo'
+    label = 'DuckDuckGo'
+    search_url = 'https://html.duckduckgo.com/html/'
+    page_param = 's'
+    results_per_page = 30
+    result_selector = '#links .web-result'
+    link_selector = 'a.result__a'
+    next_selectors = ('.nav-link input[type="submit"][value="Next"]',)
+    challenge_selectors = CHALLENGE_SELECTORS + ('#challenge-form', '.anomaly-modal__modal')
+    empty_selectors = ('.no-results',)
+
+    def page_offset(self, page):
+        return (page - 1) * self.results_per_page
+
+    def result_url(self, href):
+        if not href:
+            return None
+        parts = urlsplit(href)
+        if parts.path.startswith('/l/') and (parts.hostname or '').endswith('duckduckgo.com'):
+            return parse_qs(parts.query).get('uddg', [None])[0]
+        if (parts.hostname or '').endswith('duckduckgo.com'):
+            # 广告（y.js）等站内链接
+            return None
+        return href
+
+
+BACKENDS = {backend.name: backend for backend in (BingBackend, DuckDuckGoBackend)}
+
+
+def get_backends(names=DEFAULT_ENGINES):
+    """按逗号分隔的名称创建后端列表（去重并保持顺序），未知名称抛出 ValueError"""
+    backends = []
+    for name in (part.strip().lower() for part in names.split(',')):
+        if not name or name in (backend.name for backend in backends):
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"未知的搜索引擎: {name}（可选 {', '.join(BACKENDS)}）")
+        backends.append(BACKENDS[name]())
+    if not backends:
+        raise ValueError("未指定搜索引擎")
+    return backends
+
+
+# ====================== 离线样例自检 ======================
+def check_fixtures(root=FIXTURE_DIR):
+    """
+    用 fixtures/serp/<引擎>/<样例>.html 检查各后端的解析结果，期望值在同名 .json 中：
+    {"url": 页面地址, "kind": 页面类型, "has_next": 是否有下一页, "results": [[url, title], ...]}。
+    返回 (通过数, 失败信息列表)
+    """
+    passed = 0
+    failures = []
+    for name, backend_class in BACKENDS.items():
+        backend = backend_class()
+        directory = os.path.join(root, name)
+        cases = sorted(f[:-5] for f in os.listdir(directory) if f.endswith('.html')) if os.path.isdir(directory) else []
+        if not cases:
+            failures.append(f"{name}: 缺少离线样例（{directory}）")
+            continue
+        for case in cases:
+            with open(os.path.join(directory, case + '.html'), 'r', encoding='utf-8') as f:
+                html = f.read()
+            with open(os.path.join(directory, case + '.json'), 'r', encoding='utf-8') as f:
+                expected = json.load(f)
+            page = backend.parse(html, expected.get('url', ''))
+            problems = []
+            if page.kind != expected['kind']:
+                problems.append(f"页面类型 {page.kind}，期望 {expected['kind']}")
+            if page.has_next != expected['has_next']:
+                problems.append(f"下一页 {page.has_next}，期望 {expected['has_next']}")
+            results = [list(row) for row in page.results]
+            if results != expected['results']:
+                problems.append(f"结果 {len(results)} 条与期望的 {len(expected['results'])} 条不一致: "
+                                f"{[row for row in results if row not in expected['results']][:3]}")
+            if problems:
+                failures.append(f"{name}/{case}: {'；'.join(problems)}")
+            else:
+                passed += 1
+                print(Fore.GREEN + f"[√] {name}/{case}: {PAGE_LABELS[page.kind]} | {len(results)} 条结果 | "
+                                   f"{'有' if page.has_next else '无'}下一页")
+    return passed, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='搜索引擎后端：离线样例自检与 SERP 解析')
+    parser.add_argument('--self-test', action='store_true', help='用 fixtures/serp/ 下的离线样例检查各后端的解析')
+    parser.add_argument('--parse', type=str, default=None, help='解析已保存的 SERP 页面（HTML 文件）并打印结果')
+    parser.add_argument('--engine', type=str, default='bing', choices=sorted(BACKENDS), help='--parse 使用的后端')
+    parser.add_argument('--url', type=str, default='', help='--parse 页面的原始地址（用于补全相对链接）')
+    args = parser.parse_args()
+
+    if args.parse:
+        with open(args.parse, 'r', encoding='utf-8') as f:
+            page = BACKENDS[args.engine]().parse(f.read(), args.url)
+        print(Fore.GREEN + f"[+] {PAGE_LABELS[page.kind]} | {len(page.results)} 条结果 | "
+                           f"{'有' if page.has_next else '无'}下一页")
+        for idx, (url, title) in enumerate(page.results, 1):
+            print(Fore.CYAN + f"    {idx}. {url}")
+            print(Fore.WHITE + f"       标题: {title}")
+        return
+
+    passed, failures = check_fixtures()
+    for failure in failures:
+        print(Fore.RED + f"[×] {failure}")
+    if failures:
+        raise SystemExit(1)
+    print(Fore.GREEN + f"[√] 自检通过（{passed} 个样例）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import os
+import re
+import glob
+import gzip
+import json
+import time
+import threading
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from colorama import Fore
+
+# ====================== 录制/回放配置 ======================
+ARCHIVE_PATTERN = 'serp_*.jsonl.gz'  # 每个域名目录下的录制文件名
+SCRIPT_RE = re.compile(r'<script\b[^>]*>.*?</script\s*>', re.IGNORECASE | re.DOTALL)
+BASE_RE = re.compile(r'<base\b[^>]*>', re.IGNORECASE)
+# 浏览器会自动加载的资源：这些标签内的全部外部地址以及 <style> 块、style 属性中的 url()
+RESOURCE_TAG_RE = re.compile(r'<(?:img|image|link|iframe|frame|source|video|audio|track|embed|object|input)\b[^>]*>',
+                             re.IGNORECASE)
+STYLE_BLOCK_RE = re.compile(r'<style\b[^>]*>.*?</style\s*>', re.IGNORECASE | re.DOTALL)
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)\s*(?:https?:)?//', re.IGNORECASE)
+ORIGIN_RE = re.compile(r'(?:https?:)?//(?=[a-z0-9-]+(?:\.[a-z0-9-]+)+)', re.IGNORECASE)
+STATIC_PREFIX = '/static/'  # 外部资源改写到回放服务器的这个路径下，返回空响应
+RUN_STAMP = datetime.now().strftime("%Y%m%d_%H%M%S")  # 本次运行的录制文件时间戳，同一次运行共用
+
+
+def page_key(url):
+    """SERP 页面的回放键：(小写查询词, first 参数)，其余参数（FORM 等）忽略"""
+    params = parse_qs(urlsplit(url).query)
+    query = params.get('q', [''])[0].strip().lower()
+    try:
+        first = int(params.get('first', ['1'])[0])
+    except ValueError:
+        first = 1
+    return query, max(first, 1)
+
+
+class SerpRecorder:
+    """
+    把浏览器访问过的 SERP 页面（地址、HTML、加载耗时）写入 results/<domain>/serp_<运行时间>.jsonl.gz。
+    同一次运行中多次爬取同一域名（预算分块、队列分片、重启后重试）时追加到同一个文件，回放时可以取回全部页面。
+    """
+
+    def __init__(self, base_domain, run_stamp=None):
+        result_dir = os.path.join('results', base_domain)
+        os.makedirs(result_dir, exist_ok=True)
+        self.path = os.path.join(result_dir, ARCHIVE_PATTERN.replace('*', run_stamp or RUN_STAMP))
+        # 追加模式写入新的 gzip 成员，读取时多个成员按顺序连续解压
+        self._file = gzip.open(self.path, 'at', encoding='utf-8')
+        self.pages = 0
+
+    def record(self, url, html, elapsed, page_num):
+        self._file.write(json.dumps({
+            'url': url, 'page_num': page_num, 'elapsed': round(elapsed, 4),
+            'recorded_at': time.time(), 'html': html,
+        }, ensure_ascii=False))
+        self._file.write('\n')
+        self.pages += 1
+
+    def close(self):
+        self._file.close()
+        print(Fore.CYAN + f"[+] 已录制 {self.pages} 个 SERP 页面: {self.path}")
+
+
+def offline_html(html):
+    """
+    去掉录制页面中会访问外网的内容：脚本、<base>，以及图片/样式表/框架等资源和 CSS url() 中的
+    绝对地址（https://r.bing.com/... 或 //th.bing.com/...，改写为回放服务器的 /static/ 路径）。
+    结果链接 <a href> 保持不变，不影响提取。
+    """
+    def localize(match):
+        return ORIGIN_RE.sub(STATIC_PREFIX, match.group(0))
+
+    html = BASE_RE.sub('', SCRIPT_RE.sub('', html))
+    html = RESOURCE_TAG_RE.sub(localize, html)
+    html = STYLE_BLOCK_RE.sub(localize, html)
+    return CSS_URL_RE.sub(lambda m: f"url({m.group(1)}{STATIC_PREFIX}", html)
+
+
+def load_archive(path):
+    """读取录制文件，返回 [记录, ...]"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_archives(spec=None):
+    """spec 为文件时直接使用；为目录或空时取 results/ 下每个域名最近一次运行的录制文件"""
+    if spec and os.path.isfile(spec):
+        return [spec]
+    root = spec or 'results'
+    archives = []
+    for domain_dir in sorted(glob.glob(os.path.join(root, '*'))):
+        candidates = sorted(glob.glob(os.path.join(domain_dir, ARCHIVE_PATTERN)))
+        if candidates:
+            archives.append(candidates[-1])
+    return archives
+
+
+class ReplayServer:
+    """
+    本地回放服务器：按 (查询词, first) 返回录制的 SERP 页面，去掉页面脚本并把外部资源地址改写到本地，避免访问线上 Bing。
+    simulate_latency=True 时按录制的加载耗时延迟响应，否则全速返回。
+    """
+
+    def __init__(self, archives, simulate_latency=False, host='127.0.0.1', port=0):
+        self.pages = {}
+        for path in archives:
+            for record in load_archive(path):
+                # 同一页面录制多次时保留最后一次
+                self.pages[page_key(record['url'])] = record
+        from http.server import ThreadingHTTPServer
+
+        self.simulate_latency = simulate_latency
+        self.hits = 0
+        self.misses = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, name='serp-replay', daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self):
+        return self.url + '/search'
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not self.path.startswith('/search'):
+                    # 静态资源（包括 offline_html() 改写到 /static/ 的外部资源）一律空响应
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                record = replay.pages.get(page_key(self.path))
+                if record is None:
+                    replay.misses += 1
+                    body = '<html><body><ol id="b_results"></ol></body></html>'
+                    status = 404
+                else:
+                    replay.hits += 1
+                    if replay.simulate_latency:
+                        time.sleep(record.get('elapsed', 0))
+                    body = offline_html(record['html'])
+                    status = 200
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        print(Fore.CYAN + f"[+] 回放服务器已启动: {self.url} | 页面 {len(self.pages)} 个 | "
+                          f"{'模拟录制延迟' if self.simulate_latency else '全速'}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        print(Fore.CYAN + f"[+] 回放命中 {self.hits} 次，未命中 {self.misses} 次")
@@ -0,0 +1,212 @@
+import time
+import random
+import logging
+
+from colorama import Fore
+
+from crawl_log import log_event
+from page_state import HoldTab
+
+try:
+    import psutil
+except ImportError:  # 可选依赖，仅用于统计浏览器内存
+    psutil = None
+
+# ====================== 多标签页配置 ======================
+NEXT_TASK_DELAY = (3, 7)  # 同一标签页切换到下一个域名前的随机等待（秒）
+TAB_STAGGER = (1, 3)  # 各标签页首次查询的错开间隔（秒），避免同时请求触发验证
+MEMORY_SAMPLE_INTERVAL = 5  # 内存采样间隔（秒）
+CRASH_RESTARTS = 2  # 浏览器故障后连续重启的次数上限，超过后放弃本次调度
+
+
+def browser_memory_mb(driver):
+    """统计驱动及其全部子进程（浏览器各进程）的常驻内存总和（MB），未安装 psutil 时返回 None"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+    except Exception:
+        return None
+    total = 0
+    for proc in procs:
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / 1024 / 1024
+
+
+class TabPool:
+    """
+    在同一个浏览器实例中用多个标签页（window handle）并发爬取多个域名。
+    每个标签页运行一个 iter_crawl_domain() 生成器，某个标签页等待（翻页间隔、页面加载）时
+    调度器切换到已就绪的其他标签页继续工作；生成器 yield HoldTab（等待手动验证）时停留在该标签页，
+    其他标签页暂停到验证结束。tabs=1 时与逐个域名串行爬取等价。
+    """
+
+    def __init__(self, driver, tabs=1, next_task_delay=NEXT_TASK_DELAY, needs_restart=None, restart=None,
+                 describe=str):
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.next_task_delay = next_task_delay
+        # needs_restart() 为 True 时停止派发新任务，待全部标签页结束后调用 restart(旧driver) 换用新浏览器（如切换代理）；
+        # 浏览器故障时也通过 restart() 恢复
+        self.needs_restart = needs_restart
+        self.restart = restart
+        self.describe = describe  # describe(task) 返回日志事件中标记该任务的域名
+        self.restarts = 0
+        self.pages = 0
+        self.crawls = 0
+        self.max_concurrent = 0
+        self.peak_memory_mb = None
+        self.started_at = None
+        self.finished_at = None
+        self._last_sample = 0
+
+    def _open_tabs(self):
+        handles = [self.driver.current_window_handle]
+        for _ in range(self.tabs - 1):
+            self.driver.switch_to.new_window('tab')
+            handles.append(self.driver.current_window_handle)
+        return handles
+
+    def _sample_memory(self, force=False):
+        now = time.time()
+        if not force and now - self._last_sample < MEMORY_SAMPLE_INTERVAL:
+            return
+        self._last_sample = now
+        memory = browser_memory_mb(self.driver)
+        if memory is not None and (self.peak_memory_mb is None or memory > self.peak_memory_mb):
+            self.peak_memory_mb = memory
+
+    def run(self, next_task, start_crawl, on_done):
+        """
+        next_task() 返回下一个任务（无任务时返回 None）；start_crawl(task) 返回爬取生成器；
+        on_done(task, result, started_at) 在某个任务结束时回调，result 为 crawl_domain() 的返回值。
+        浏览器级故障（WebDriverException，如浏览器崩溃、会话失效）时所有标签页一同中断：
+        有 restart 时重启浏览器并重新派发被中断的任务，否则（或连续故障过多时）向上抛出，不会把中断当作空结果回调。
+        """
+        from selenium.common.exceptions import WebDriverException
+
+        self.started_at = time.time()
+        handles = self._open_tabs()
+        current = handles[-1]
+        active = []
+        idle = list(handles)
+        held = []  # 等待浏览器重启后再派发的任务
+        crashes = 0  # 上次有任务正常结束以来的浏览器故障次数
+
+        def fill_idle(delay_range):
+            while idle:
+                task = held.pop(0) if held else next_task()
+                if task is None:
+                    return
+                if self.needs_restart is not None and self.needs_restart():
+                    held.append(task)
+                    return
+                delay = 0
+                if delay_range and max(delay_range) > 0:
+                    delay = random.uniform(*delay_range)
+                    print(Fore.YELLOW + f"[+] 准备爬取下一个域名，{delay:.1f} 秒后继续...")
+                active.append({'handle': idle.pop(0), 'task': task, 'crawl': None,
+                               'ready_at': time.time() + delay, 'started_at': None})
+
+        def restart_browser():
+            nonlocal handles, current
+            driver = self.restart(self.driver)
+            if driver is None:
+                log_event('error', logging.ERROR, "[-] 浏览器重启失败，停止派发任务",
+                          stage='restart', held=[self.describe(task) for task in held])
+                return False
+            self.driver = driver
+            self.restarts += 1
+            handles = self._open_tabs()
+            current = handles[-1]
+            idle[:] = handles
+            fill_idle(None)
+            return True
+
+        fill_idle(None)
+        # 首轮各标签页错开启动
+        for i, slot in enumerate(active[1:], 1):
+            slot['ready_at'] += sum(random.uniform(*TAB_STAGGER) for _ in range(i))
+
+        while active:
+            holding = [s for s in active if s.get('hold')]
+            slot = holding[0] if holding else min(active, key=lambda s: s['ready_at'])
+            wait = slot['ready_at'] - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self.max_concurrent = max(self.max_concurrent, len(active))
+
+            try:
+                if slot['handle'] != current:
+                    self.driver.switch_to.window(slot['handle'])
+                    current = slot['handle']
+                if slot['crawl'] is None:
+                    slot['crawl'] = start_crawl(slot['task'])
+                    slot['started_at'] = time.time()
+                delay = next(slot['crawl'])
+                slot['hold'] = isinstance(delay, HoldTab)
+                slot['ready_at'] = time.time() + delay
+                self._sample_memory()
+                continue
+            except StopIteration as stop:
+                result = stop.value
+            except WebDriverException as e:
+                # 浏览器已不可用，其余标签页也无法继续：中断全部爬取，重启后从各任务的起始页重新爬取
+                crashes += 1
+                log_event('error', logging.ERROR, f"[-] 浏览器故障，中断全部标签页的爬取: {e}",
+                          domain=self.describe(slot['task']), stage='tab', crashes=crashes,
+                          interrupted=[self.describe(other['task']) for other in active])
+                if self.restart is None or crashes > CRASH_RESTARTS:
+                    raise
+                for other in active:
+                    if other['crawl'] is not None:
+                        other['crawl'].close()
+                    held.append(other['task'])
+                active.clear()
+                if not restart_browser():
+                    break
+                continue
+
+            crashes = 0
+            active.remove(slot)
+            idle.append(slot['handle'])
+            self.crawls += 1
+            self.pages += result[2]
+            self._sample_memory(force=True)
+            on_done(slot['task'], result, slot['started_at'] or time.time())
+            # 任务结束后可能产生新任务（如子域名发现），所有空闲标签页都尝试领取
+            fill_idle(self.next_task_delay)
+            if not active and held and not restart_browser():
+                break
+
+        self.finished_at = time.time()
+
+    def report(self):
+        """返回本次调度的吞吐和内存统计"""
+        elapsed = (self.finished_at or time.time()) - (self.started_at or time.time())
+        concurrent = max(1, self.max_concurrent)
+        return {
+            'tabs': self.tabs,
+            'crawls': self.crawls,
+            'restarts': self.restarts,
+            'pages': self.pages,
+            'elapsed': elapsed,
+            'pages_per_min': self.pages / elapsed * 60 if elapsed > 0 else 0.0,
+            'peak_memory_mb': self.peak_memory_mb,
+            'memory_per_crawl_mb': self.peak_memory_mb / concurrent if self.peak_memory_mb else None,
+        }
+
+    def print_report(self):
+        stats = self.report()
+        line = (f"[+] 标签页: {stats['tabs']} | 域名: {stats['crawls']} | 页数: {stats['pages']} | "
+                f"速度: {stats['pages_per_min']:.1f} 页/分钟")
+        if stats['restarts']:
+            line += f" | 浏览器重启: {stats['restarts']} 次"
+        if stats['peak_memory_mb'] is not None:
+            line += (f" | 浏览器内存峰值: {stats['peak_memory_mb']:.0f} MB"
+                     f"（每个并发爬取约 {stats['memory_per_crawl_mb']:.0f} MB）")
+        print(Fore.GREEN + line)
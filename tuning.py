@@ -0,0 +1,129 @@
+import json
+import math
+from collections import deque
+
+from colorama import Fore
+
+# ====================== 调优配置 ======================
+# 预设：safe 为原 EdgeURL.py 的参数，fast 为原 EdgeURL(Quickly).py 的参数
+PRESETS = {
+    'safe': {
+        'scroll_pause': 1,  # 滚动等待时间
+        'scroll_settle': 1,  # 滚动到底后的稳定等待
+        'retry_limit': 10,  # 元素重试次数
+        'verification_time': 1,  # 验证码处理时间（秒）
+        'content_timeout': 10,  # 内容加载超时时间
+        'page_delay': (2, 5),  # 翻页后的随机等待区间（秒）
+        'html_bucket': False,  # 是否把 .htm/.html 结果单独保存
+    },
+    'fast': {
+        'scroll_pause': 0.1,
+        'scroll_settle': 0.25,
+        'retry_limit': 5,
+        'verification_time': 0.1,
+        'content_timeout': 2.5,
+        'page_delay': (1, 3),
+        'html_bucket': True,
+    },
+}
+DEFAULT_PRESET = 'safe'
+AUTOTUNE_PERCENTILE = 95  # 按观测值的该百分位设置等待时间
+AUTOTUNE_MARGIN = 1.5  # 在百分位上再乘的余量系数
+AUTOTUNE_MIN_SAMPLES = 5  # 样本数达到该值后才开始调整
+AUTOTUNE_WINDOW = 50  # 只保留最近的样本，适应网络状况变化
+AUTOTUNE_MIN_CHANGE = 0.1  # 推荐值与当前值相差超过该比例才调整，避免频繁抖动
+AUTOTUNE_POLL = 0.05  # 自动调优时检测滚动加载的轮询间隔（秒）
+# 自动调优的取值范围 (最小, 最大)
+CONTENT_TIMEOUT_BOUNDS = (2, 30)
+SCROLL_PAUSE_BOUNDS = (0.1, 2)
+
+
+def load_tuning(preset=None, config_path=None, default=DEFAULT_PRESET):
+    """
+    返回调优参数字典：先取预设（未指定时为 default），再用配置文件（JSON）中的同名键覆盖。
+    配置文件可用 "preset" 键指定基础预设，例如 {"preset": "fast", "content_timeout": 5}。
+    """
+    overrides = {}
+    if config_path:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            overrides = json.load(f)
+        preset = preset or overrides.pop('preset', None)
+        overrides.pop('preset', None)
+    preset = preset or default
+    if preset not in PRESETS:
+        raise ValueError(f"未知的调优预设: {preset}（可选 {', '.join(PRESETS)}）")
+    unknown = set(overrides) - set(PRESETS[preset])
+    if unknown:
+        raise ValueError(f"配置文件包含未知参数: {', '.join(sorted(unknown))}")
+
+    settings = dict(PRESETS[preset], **overrides)
+    settings['page_delay'] = tuple(settings['page_delay'])
+    settings['name'] = preset if not overrides else f'{preset}+{config_path}'
+    return settings
+
+
+def percentile(samples, pct):
+    """最近邻法百分位"""
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def clamp(value, bounds):
+    return min(max(value, bounds[0]), bounds[1])
+
+
+class LatencyTuner:
+    """
+    运行中观测页面加载耗时（翻页点击到内容变化）和渲染耗时（滚动后页面高度增长），
+    按百分位乘余量推荐 CONTENT_TIMEOUT 和滚动等待时间。
+    """
+
+    def __init__(self, percentile_value=AUTOTUNE_PERCENTILE, margin=AUTOTUNE_MARGIN,
+                 min_samples=AUTOTUNE_MIN_SAMPLES, window=AUTOTUNE_WINDOW):
+        self.percentile = percentile_value
+        self.margin = margin
+        self.min_samples = min_samples
+        self.samples = {'load': deque(maxlen=window), 'render': deque(maxlen=window)}
+        self.counts = {'load': 0, 'render': 0}
+        self.timeouts = 0
+        self.history = []  # [(样本数, 参数名, 旧值, 新值), ...]
+
+    def observe(self, kind, seconds):
+        self.samples[kind].append(seconds)
+        self.counts[kind] += 1
+
+    def observe_timeout(self, timeout):
+        """加载超时按超时值计入样本，使下次推荐放宽"""
+        self.timeouts += 1
+        self.observe('load', timeout)
+
+    def recommend(self, current):
+        """根据已有样本返回需要修改的参数 {参数名: 新值}，样本不足时返回空字典"""
+        changes = {}
+        load = self.samples['load']
+        if len(load) >= self.min_samples:
+            timeout = clamp(percentile(load, self.percentile) * self.margin, CONTENT_TIMEOUT_BOUNDS)
+            changes['content_timeout'] = round(timeout, 2)
+        render = self.samples['render']
+        if len(render) >= self.min_samples:
+            pause = clamp(percentile(render, self.percentile) * self.margin, SCROLL_PAUSE_BOUNDS)
+            changes['scroll_pause'] = round(pause, 2)
+            changes['scroll_settle'] = round(pause, 2)
+        changes = {k: v for k, v in changes.items()
+                   if not current.get(k) or abs(v - current[k]) / current[k] > AUTOTUNE_MIN_CHANGE}
+        for key, value in changes.items():
+            self.history.append((self.counts['load'] + self.counts['render'], key, current.get(key), value))
+        return changes
+
+    def print_report(self):
+        for kind, label in (('load', '页面加载'), ('render', '滚动渲染')):
+            samples = self.samples[kind]
+            if samples:
+                print(Fore.CYAN + f"[+] 自动调优 | {label}: {self.counts[kind]} 个样本 | "
+                                  f"P50 {percentile(samples, 50):.2f} 秒 | "
+                                  f"P{self.percentile} {percentile(samples, self.percentile):.2f} 秒")
+        if self.timeouts:
+            print(Fore.CYAN + f"[+] 自动调优 | 加载超时 {self.timeouts} 次")
+        for count, key, old, new in self.history:
+            print(Fore.CYAN + f"    第 {count} 个样本后: {key} {old} -> {new}")
@@ -0,0 +1,49 @@
+import re
+from urllib.parse import urlsplit, parse_qsl
+
+# ====================== 聚类配置 ======================
+UUID_RE = re.compile(r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}')
+HEX_RE = re.compile(r'(?<![0-9a-zA-Z])(?=[0-9a-fA-F]*[a-fA-F])(?=[0-9a-fA-F]*[0-9])[0-9a-fA-F]{16,}(?![0-9a-zA-Z])')
+NUM_RE = re.compile(r'\d+')
+
+
+def mask_segment(segment):
+    """把路径段中的 UUID、长十六进制串、数字替换为占位符"""
+    segment = UUID_RE.sub('{uuid}', segment)
+    segment = HEX_RE.sub('{hex}', segment)
+    return NUM_RE.sub('{num}', segment)
+
+
+def url_template(url):
+    """
+    把URL转换为路径模板：主机保留，路径中的数字/十六进制/UUID 段被掩码，
+    查询参数只保留排序后的参数名，如 https://a.com/news/12345.html?id=9 -> a.com/news/{num}.html?id=
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    host = (parts.hostname or '').lower()
+    path = '/'.join(mask_segment(seg) for seg in parts.path.split('/'))
+    template = host + path
+    if parts.query:
+        names = sorted({name for name, _ in parse_qsl(parts.query, keep_blank_values=True)})
+        template += '?' + '&'.join(f"{name}=" for name in names)
+    return template
+
+
+def cluster_urls(url_list):
+    """
+    按模板分组 [(url, title), ...]，单次遍历完成。
+    返回按数量降序的 [(模板, 数量, 代表URL, 代表标题), ...]，代表URL取该模板第一次出现的记录。
+    """
+    clusters = {}
+    for url, title in url_list:
+        template = url_template(url)
+        entry = clusters.get(template)
+        if entry is None:
+            clusters[template] = [1, url, title]
+        else:
+            entry[0] += 1
+    return sorted(((template, count, url, title) for template, (count, url, title) in clusters.items()),
+                  key=lambda item: (-item[1], item[0]))
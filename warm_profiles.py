@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+
+from colorama import Fore
+
+from crawl_log import log_event
+from page_state import PAGE_CHALLENGE, PAGE_LABELS, PAGE_NORMAL
+
+# ====================== 预热配置档配置 ======================
+PROFILE_ROOT = 'profiles'  # 可复用的浏览器用户数据目录所在目录
+PROFILE_PREFIX = 'warm_'  # 配置档目录名前缀：profiles/warm_00、warm_01 ...
+PROFILE_META = 'edgeurl_profile.json'  # 配置档内记录预热时间、使用次数等信息的文件
+PROFILE_LOCK = 'edgeurl_profile.lock'  # 配置档占用锁，进程退出时由系统自动释放
+PROFILE_MAX_AGE = 12 * 3600  # 预热有效期（秒），超过后开始爬取前重新预热
+WARM_QUERY = 'microsoft edge'  # 预热时执行的首次查询（与爬取目标无关的普通查询）
+WARM_TIMEOUT = 30  # 预热/基准测试时等待首个结果页的最长时间（秒）
+WARM_POLL = 0.25  # 等待首个结果页时的检测间隔（秒）
+CONSENT_SETTLE = 1  # 点击 Cookie 同意按钮后等待写入 Cookie 的时间（秒）
+
+# 点击第一个存在的 Cookie 同意按钮，返回命中的选择器，没有横幅时返回 null
+CONSENT_SCRIPT = """
+for (const selector of arguments[0]) {
+    const button = document.querySelector(selector);
+    if (button) { button.click(); return selector; }
+}
+return null;
+"""
+
+
+def _lock_file(path):
+    """以非阻塞方式独占锁定文件，成功返回打开的文件对象，已被占用时返回 None"""
+    handle = open(path, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def _unlock_file(handle):
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+    handle.close()
+
+
+def wait_first_result(driver, backend, timeout=WARM_TIMEOUT):
+    """
+    轮询当前页面直到出现结果（或验证页面、超时），返回 (页面类型, 耗时秒数)。
+    结果区尚未渲染时检测为 PAGE_LOADING，继续等待；无结果页和错误页同样继续轮询到超时
+    （预热时可能仍在跳转或等待 Cookie 同意后的重新加载），超时时返回最后一次检测到的类型。
+    """
+    started = time.time()
+    kind = backend.classify(driver)
+    while kind not in (PAGE_NORMAL, PAGE_CHALLENGE) and time.time() - started < timeout:
+        time.sleep(WARM_POLL)
+        kind = backend.classify(driver)
+    return kind, time.time() - started
+
+
+def warm_up(driver, backends, query=WARM_QUERY, monitor=None):
+    """
+    在浏览器中完成预热：打开各搜索引擎首页点击 Cookie 同意横幅，再执行一次首次查询。
+    出现验证页面且传入 monitor 时等待人工完成验证，使验证通过的 Cookie 保存在配置档中。
+    返回 {引擎名: (页面类型, 首次查询出结果的秒数)}。
+    """
+    outcome = {}
+    for backend in backends:
+        if backend.home_url:
+            driver.get(backend.home_url)
+            if backend.consent_selectors:
+                try:
+                    if driver.execute_script(CONSENT_SCRIPT, list(backend.consent_selectors)):
+                        time.sleep(CONSENT_SETTLE)
+                except Exception as e:
+                    log_event('error', logging.ERROR, f"[-] 点击 Cookie 同意按钮失败: {e}",
+                              stage='warm_consent', engine=backend.name)
+        started = time.time()
+        driver.get(backend.build_url(query))
+        kind, _ = wait_first_result(driver, backend)
+        if kind == PAGE_CHALLENGE and monitor is not None:
+            clearance = monitor.wait_for_clearance(driver, f'预热 {backend.label}', classify=backend.classify)
+            try:
+                while True:
+                    time.sleep(next(clearance))
+            except StopIteration as stop:
+                kind = stop.value
+        outcome[backend.name] = (kind, time.time() - started)
+    return outcome
+
+
+class WarmProfilePool:
+    """
+    预热配置档池：在 profiles/ 下维护若干可复用的 Edge 用户数据目录，开始爬取前把过期或未预热的
+    配置档预热（同意 Cookie、完成首次查询），之后启动或重启浏览器时优先交出最近预热的空闲配置档，
+    省去冷启动时的 Cookie/同意横幅处理，降低首次查询遇到验证页面的概率。
+    配置档以文件锁独占，多个进程（如多台队列节点共享同一目录）不会同时使用同一个配置档。
+    launch(proxy, profile_dir) 为启动浏览器的函数（EdgeURL.setup_driver）。
+    """
+
+    def __init__(self, launch, root=PROFILE_ROOT, count=2, max_age=PROFILE_MAX_AGE):
+        if count < 1:
+            raise ValueError("预热配置档数量至少为 1")
+        self.launch_driver = launch
+        self.root = os.path.abspath(root)
+        self.max_age = max_age
+        self.dirs = [os.path.join(self.root, f'{PROFILE_PREFIX}{i:02d}') for i in range(count)]
+        self.engines = None  # 预热时使用的搜索引擎，启动浏览器时优先选择覆盖这些引擎的配置档
+        self.active = {}  # id(driver) -> (配置档目录, 锁文件)
+        self.stats = {path: {'launches': 0, 'startup': 0.0, 'warm_launches': 0} for path in self.dirs}
+        self.cold_launches = 0
+        self._lock = threading.Lock()
+        for path in self.dirs:
+            os.makedirs(path, exist_ok=True)
+
+    # ---------- 配置档信息 ----------
+    def load_meta(self, path):
+        try:
+            with open(os.path.join(path, PROFILE_META), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_meta(self, path, meta):
+        with open(os.path.join(path, PROFILE_META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def is_warm(self, meta, engines=None, now=None):
+        """预热成功、未过期且覆盖了全部所需搜索引擎"""
+        now = now or time.time()
+        if not meta.get('warm') or now - meta.get('warmed_at', 0) > self.max_age:
+            return False
+        return not engines or set(engines) <= set(meta.get('engines', []))
+
+    def _try_acquire(self, path):
+        handle = _lock_file(os.path.join(path, PROFILE_LOCK))
+        return (path, handle) if handle is not None else None
+
+    def _acquire(self, engines=None):
+        """锁定一个空闲配置档：已预热的优先（最近预热的在前），返回 (目录, 锁文件)，全部被占用时返回 None"""
+        now = time.time()
+        metas = {path: self.load_meta(path) for path in self.dirs}
+        order = sorted(self.dirs, key=lambda p: (not self.is_warm(metas[p], engines, now),
+                                                 -metas[p].get('warmed_at', 0)))
+        for path in order:
+            held = self._try_acquire(path)
+            if held is not None:
+                return held
+        return None
+
+    # ---------- 预热 ----------
+    def prewarm(self, backends, proxy=None, query=WARM_QUERY, monitor=None, force=False):
+        """
+        开始爬取前预热全部空闲且未预热（或已过期）的配置档，依次进行以免同一 IP 短时间内集中发出查询。
+        返回 (已可用的配置档数, 本次预热的配置档数)。
+        """
+        engines = self.engines = [backend.name for backend in backends]
+        ready = warmed = 0
+        for path in self.dirs:
+            meta = self.load_meta(path)
+            if not force and self.is_warm(meta, engines):
+                ready += 1
+                continue
+            held = self._try_acquire(path)
+            if held is None:
+                print(Fore.YELLOW + f"[!] 配置档 {os.path.basename(path)} 正被其他进程使用，跳过预热")
+                continue
+            print(Fore.CYAN + f"[+] 正在预热配置档 {os.path.basename(path)}...")
+            driver = None
+            try:
+                started = time.time()
+                driver = self.launch_driver(proxy, path)
+                if not driver:
+                    continue
+                startup = time.time() - started
+                outcome = warm_up(driver, backends, query, monitor)
+            except Exception as e:
+                log_event('error', logging.ERROR, f"[-] 预热配置档 {os.path.basename(path)} 失败: {e}",
+                          stage='prewarm', profile=path)
+                continue
+            finally:
+                if driver:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                _unlock_file(held[1])
+            ok = all(kind == PAGE_NORMAL for kind, _ in outcome.values())
+            first_result = {name: round(seconds, 3) for name, (_, seconds) in outcome.items()}
+            meta.update(warm=ok, warmed_at=time.time() if ok else meta.get('warmed_at', 0),
+                        engines=engines if ok else meta.get('engines', []), proxy=proxy,
+                        cold_startup=round(startup, 3), first_result=first_result)
+            self.save_meta(path, meta)
+            details = ' | '.join(f"{name} {PAGE_LABELS.get(kind, kind)} {seconds:.1f} 秒"
+                                 for name, (kind, seconds) in outcome.items())
+            log_event('profile_warmed', logging.INFO if ok else logging.WARNING,
+                      ("[+] " if ok else "[!] ") + f"配置档 {os.path.basename(path)} {'预热完成' if ok else '预热未完成'}："
+                      f"启动 {startup:.1f} 秒 | {details}",
+                      profile=path, ok=ok, startup=round(startup, 3), first_result=first_result)
+            warmed += ok
+            ready += ok
+        return ready, warmed
+
+    # ---------- 交给爬取使用 ----------
+    def launch(self, proxy=None):
+        """用空闲配置档启动浏览器（优先已预热的），全部被占用时退回冷启动；浏览器结束后须调用 release()"""
+        with self._lock:
+            held = self._acquire(self.engines)
+        if held is None:
+            print(Fore.YELLOW + "[!] 预热配置档均被占用，使用临时配置档冷启动浏览器")
+            self.cold_launches += 1
+            return self.launch_driver(proxy, None)
+        path, handle = held
+        warm = self.is_warm(self.load_meta(path), self.engines)
+        started = time.time()
+        driver = self.launch_driver(proxy, path)
+        startup = time.time() - started
+        if not driver:
+            _unlock_file(handle)
+            return None
+        with self._lock:
+            self.active[id(driver)] = held
+            stat = self.stats[path]
+            stat['launches'] += 1
+            stat['warm_launches'] += warm
+            stat['startup'] += startup
+        log_event('driver_start', logging.INFO,
+                  f"[+] 使用{'已预热' if warm else '未预热'}配置档 {os.path.basename(path)} 启动浏览器"
+                  f"（{startup:.1f} 秒）", profile=path, warm=warm, startup=round(startup, 3))
+        return driver
+
+    def release(self, driver):
+        """浏览器退出后释放其配置档，记录使用次数"""
+        with self._lock:
+            held = self.active.pop(id(driver), None)
+        if held is None:
+            return
+        path, handle = held
+        meta = self.load_meta(path)
+        meta['uses'] = meta.get('uses', 0) + 1
+        meta['last_used'] = time.time()
+        self.save_meta(path, meta)
+        _unlock_file(handle)
+
+    def report(self):
+        """返回 [(配置档, 是否已预热, 预热距今秒数, 本次启动次数, 其中预热启动次数, 平均启动秒数, 累计使用次数), ...]"""
+        rows = []
+        now = time.time()
+        for path in self.dirs:
+            meta = self.load_meta(path)
+            stat = self.stats[path]
+            avg = stat['startup'] / stat['launches'] if stat['launches'] else 0.0
+            age = now - meta['warmed_at'] if meta.get('warmed_at') else None
+            rows.append((os.path.basename(path), self.is_warm(meta), age, stat['launches'],
+                         stat['warm_launches'], avg, meta.get('uses', 0)))
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查看预热配置档状态')
+    parser.add_argument('--root', type=str, default=PROFILE_ROOT, help=f'配置档目录，默认为 {PROFILE_ROOT}')
+    args = parser.parse_args()
+
+    names = sorted(name for name in os.listdir(args.root) if name.startswith(PROFILE_PREFIX)) \
+        if os.path.isdir(args.root) else []
+    if not names:
+        print(Fore.YELLOW + f"[!] {args.root} 下没有预热配置档")
+        return
+    now = time.time()
+    for name in names:
+        path = os.path.join(args.root, name)
+        try:
+            with open(os.path.join(path, PROFILE_META), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        handle = _lock_file(os.path.join(path, PROFILE_LOCK))
+        if handle is not None:
+            _unlock_file(handle)
+        state = '已预热' if meta.get('warm') else '未预热'
+        age = f"{(now - meta['warmed_at']) / 3600:.1f} 小时前" if meta.get('warmed_at') else '-'
+        print(f"{name} | {state} | 预热于 {age} | 引擎 {','.join(meta.get('engines', [])) or '-'} | "
+              f"使用 {meta.get('uses', 0)} 次 | {'使用中' if handle is None else '空闲'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+# ====================== 分布式队列配置 ======================
+LEASE_TIMEOUT = 600  # 租约可见性超时（秒），超时未续约的任务会被其他节点重新领取
+MAX_ATTEMPTS = 3  # 单个任务最多尝试次数
+BUSY_TIMEOUT = 30  # SQLite 加锁时的等待时间（秒）
+
+# domain: site: 查询的域名；targets: 结果拆分目标；start_page/end_page: 页码分片（end_page 为 0 表示不限）
+Job = namedtuple('Job', ['id', 'domain', 'targets', 'start_page', 'end_page', 'attempts', 'token'])
+
+
+def default_worker_id():
+    """默认节点标识：主机名-进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Broker(ABC):
+    """任务队列接口：入队、租用、续约、完成、失败、统计"""
+
+    @abstractmethod
+    def enqueue(self, domain, targets=None, start_page=1, end_page=0):
+        """加入一个任务，返回任务 id"""
+
+    @abstractmethod
+    def lease(self, worker_id, timeout=LEASE_TIMEOUT):
+        """领取一个任务，返回 Job，没有可领取的任务时返回 None"""
+
+    @abstractmethod
+    def heartbeat(self, job, timeout=LEASE_TIMEOUT):
+        """续约，租约已丢失（被其他节点接管）时返回 False"""
+
+    @abstractmethod
+    def complete(self, job, result):
+        """标记任务完成并保存汇报的结果"""
+
+    @abstractmethod
+    def fail(self, job, error):
+        """任务失败：未超过最大尝试次数时退回队列，否则标记为失败"""
+
+    @abstractmethod
+    def stats(self):
+        """返回 {状态: 数量}"""
+
+    @abstractmethod
+    def results(self):
+        """返回已完成任务的 [(domain, start_page, end_page, worker, result), ...]"""
+
+    def close(self):
+        pass
+
+
+class SQLiteBroker(Broker):
+    """基于 SQLite 文件的任务队列，可放在多台机器共享的存储上"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id            INTEGER PRIMARY KEY AUTOINCREMENT,
+        domain        TEXT NOT NULL,
+        targets       TEXT NOT NULL,
+        start_page    INTEGER NOT NULL DEFAULT 1,
+        end_page      INTEGER NOT NULL DEFAULT 0,
+        state         TEXT NOT NULL DEFAULT 'pending',
+        attempts      INTEGER NOT NULL DEFAULT 0,
+        max_attempts  INTEGER NOT NULL,
+        worker        TEXT,
+        lease_token   TEXT,
+        lease_expires REAL,
+        result        TEXT,
+        error         TEXT,
+        updated_at    REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, lease_expires);
+    """
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        db_dir = os.path.dirname(path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # isolation_level=None：手动控制事务，租用时用 BEGIN IMMEDIATE 加写锁
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                    check_same_thread=False)
+        # 共享存储（如 SMB/NFS）上 WAL 不可靠，保持默认的回滚日志模式
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, domain, targets=None, start_page=1, end_page=0):
+        with self._lock:
+            cur = self.conn.execute(
+                "INSERT INTO jobs (domain, targets, start_page, end_page, max_attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (domain, json.dumps(targets or [domain]), start_page, end_page,
+                 self.max_attempts, time.time())
+            )
+            return cur.lastrowid
+
+    def lease(self, worker_id, timeout=LEASE_TIMEOUT):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 超时且已用完尝试次数的租约直接判定失败
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'failed', error = COALESCE(error, '租约超时'), updated_at = ? "
+                    "WHERE state = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, now)
+                )
+                # 上次由本节点失败的任务排在最后，优先让其他节点重试
+                row = self.conn.execute(
+                    "SELECT id, domain, targets, start_page, end_page, attempts FROM jobs "
+                    "WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?)) "
+                    "AND attempts < max_attempts "
+                    "ORDER BY (COALESCE(worker, '') = ?), id LIMIT 1",
+                    (now, worker_id)
+                ).fetchone()
+                if row is None:
+                    self.conn.execute("COMMIT")
+                    return None
+                token = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'leased', worker = ?, lease_token = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (worker_id, token, now + timeout, now, row[0])
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        job_id, domain, targets, start_page, end_page, attempts = row
+        return Job(job_id, domain, json.loads(targets), start_page, end_page, attempts + 1, token)
+
+    def _update_leased(self, job, sql, params):
+        with self._lock:
+            cur = self.conn.execute(
+                sql + " WHERE id = ? AND lease_token = ? AND state = 'leased'",
+                params + (job.id, job.token)
+            )
+            return cur.rowcount == 1
+
+    def heartbeat(self, job, timeout=LEASE_TIMEOUT):
+        now = time.time()
+        return self._update_leased(job, "UPDATE jobs SET lease_expires = ?, updated_at = ?",
+                                   (now + timeout, now))
+
+    def complete(self, job, result):
+        return self._update_leased(
+            job, "UPDATE jobs SET state = 'done', result = ?, lease_token = NULL, updated_at = ?",
+            (json.dumps(result, ensure_ascii=False), time.time())
+        )
+
+    def fail(self, job, error):
+        # 尝试次数未用完时回到 pending，由其他节点重新领取
+        return self._update_leased(
+            job, "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                 "error = ?, lease_token = NULL, updated_at = ?",
+            (str(error), time.time())
+        )
+
+    def stats(self):
+        with self._lock:
+            return dict(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    def results(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT domain, start_page, end_page, worker, result FROM jobs "
+                "WHERE state = 'done' ORDER BY id"
+            ).fetchall()
+        return [(domain, start, end, worker, json.loads(result or '{}'))
+                for domain, start, end, worker, result in rows]
+
+    def close(self):
+        try:
+            self.conn.close()
+        except sqlite3.Error:
+            pass
+
+
+class MemoryBroker(Broker):
+    """进程内的本地替身，语义与 SQLiteBroker 一致，用于单机调试"""
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, domain, targets=None, start_page=1, end_page=0):
+        with self._lock:
+            self.jobs.append({
+                'id': len(self.jobs) + 1, 'domain': domain, 'targets': list(targets or [domain]),
+                'start_page': start_page, 'end_page': end_page, 'state': 'pending', 'attempts': 0,
+                'worker': None, 'token': None, 'expires': 0, 'result': None, 'error': None,
+            })
+            return len(self.jobs)
+
+    def lease(self, worker_id, timeout=LEASE_TIMEOUT):
+        now = time.time()
+        with self._lock:
+            candidates = []
+            for job in self.jobs:
+                expired = job['state'] == 'leased' and job['expires'] < now
+                if expired and job['attempts'] >= self.max_attempts:
+                    job['state'] = 'failed'
+                    job['error'] = job['error'] or '租约超时'
+                elif (job['state'] == 'pending' or expired) and job['attempts'] < self.max_attempts:
+                    candidates.append(job)
+            if not candidates:
+                return None
+            job = min(candidates, key=lambda j: (j['worker'] == worker_id, j['id']))
+            job.update(state='leased', worker=worker_id, token=uuid.uuid4().hex,
+                       expires=now + timeout, attempts=job['attempts'] + 1)
+            return Job(job['id'], job['domain'], list(job['targets']), job['start_page'],
+                       job['end_page'], job['attempts'], job['token'])
+
+    def _leased(self, job):
+        record = self.jobs[job.id - 1]
+        if record['state'] == 'leased' and record['token'] == job.token:
+            return record
+        return None
+
+    def heartbeat(self, job, timeout=LEASE_TIMEOUT):
+        with self._lock:
+            record = self._leased(job)
+            if record is None:
+                return False
+            record['expires'] = time.time() + timeout
+            return True
+
+    def complete(self, job, result):
+        with self._lock:
+            record = self._leased(job)
+            if record is None:
+                return False
+            record.update(state='done', result=result, token=None)
+            return True
+
+    def fail(self, job, error):
+        with self._lock:
+            record = self._leased(job)
+            if record is None:
+                return False
+            state = 'failed' if record['attempts'] >= self.max_attempts else 'pending'
+            record.update(state=state, error=str(error), token=None)
+            return True
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self.jobs:
+                counts[job['state']] = counts.get(job['state'], 0) + 1
+            return counts
+
+    def results(self):
+        with self._lock:
+            return [(j['domain'], j['start_page'], j['end_page'], j['worker'], j['result'] or {})
+                    for j in self.jobs if j['state'] == 'done']
+
+
+def open_broker(spec, max_attempts=MAX_ATTEMPTS):
+    """按参数打开队列：memory:// 为进程内替身，其余视为 SQLite 文件路径"""
+    if spec == 'memory://':
+        return MemoryBroker(max_attempts)
+    return SQLiteBroker(spec, max_attempts)
+
+
+class Heartbeat:
+    """后台续约线程：每 timeout/3 秒续约一次，租约丢失时置 lost 标志"""
+
+    def __init__(self, broker, job, timeout=LEASE_TIMEOUT):
+        self.broker = broker
+        self.job = job
+        self.timeout = timeout
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{job.id}", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.timeout / 3):
+            try:
+                if not self.broker.heartbeat(self.job, self.timeout):
+                    self.lost = True
+                    return
+            except Exception:
+                # 共享存储偶发错误时下一轮再试，真正超时由可见性超时兜底
+                continue
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False